@@ -42,7 +42,7 @@ class AzCli(CLI):
             register_ids_argument, register_global_subscription_argument)
         from azure.cli.core.cloud import get_active_cloud
         from azure.cli.core.commands.transform import register_global_transforms
-        from azure.cli.core._session import ACCOUNT, CONFIG, SESSION
+        from azure.cli.core._session import ACCOUNT, CONFIG, SESSION, INDEX
 
         from knack.util import ensure_dir
 
@@ -57,6 +57,7 @@ class AzCli(CLI):
         ACCOUNT.load(os.path.join(azure_folder, 'azureProfile.json'))
         CONFIG.load(os.path.join(azure_folder, 'az.json'))
         SESSION.load(os.path.join(azure_folder, 'az.sess'), max_age=3600)
+        INDEX.load(os.path.join(azure_folder, 'commandIndex.json'))
         self.cloud = get_active_cloud(self)
         logger.debug('Current cloud config:\n%s', str(self.cloud.name))
         self.local_context = AzCLILocalContext(self)
@@ -170,19 +171,22 @@ class MainCommandsLoader(CLICommandsLoader):
         from azure.cli.core.extension import (
             get_extensions, get_extension_path, get_extension_modname)
 
-        def _update_command_table_from_modules(args):
+        def _update_command_table_from_modules(args, command_modules=None):
             '''Loads command table(s)
-            When `module_name` is specified, only commands from that module will be loaded.
-            If the module is not found, all commands are loaded.
+            When `command_modules` is specified, only commands from those modules will be loaded.
+            Otherwise, all installed command modules are loaded.
             '''
-            installed_command_modules = []
-            try:
-                mods_ns_pkg = import_module('azure.cli.command_modules')
-                installed_command_modules = [modname for _, modname, _ in
-                                             pkgutil.iter_modules(mods_ns_pkg.__path__)
-                                             if modname not in BLACKLISTED_MODS]
-            except ImportError as e:
-                logger.warning(e)
+            if command_modules is not None:
+                installed_command_modules = command_modules
+            else:
+                installed_command_modules = []
+                try:
+                    mods_ns_pkg = import_module('azure.cli.command_modules')
+                    installed_command_modules = [modname for _, modname, _ in
+                                                 pkgutil.iter_modules(mods_ns_pkg.__path__)
+                                                 if modname not in BLACKLISTED_MODS]
+                except ImportError as e:
+                    logger.warning(e)
 
             logger.debug('Installed command modules %s', installed_command_modules)
             cumulative_elapsed_time = 0
@@ -209,7 +213,7 @@ class MainCommandsLoader(CLICommandsLoader):
                          "(note: there's always an overhead with the first module loaded)",
                          cumulative_elapsed_time)
 
-        def _update_command_table_from_extensions(ext_suppressions):
+        def _update_command_table_from_extensions(ext_suppressions, extension_names=None):
 
             from azure.cli.core.extension.operations import check_version_compatibility
 
@@ -225,13 +229,15 @@ class MainCommandsLoader(CLICommandsLoader):
                 return filtered_extensions
 
             extensions = get_extensions()
+            if extension_names is not None:
+                extensions = [ext for ext in extensions if ext.name in extension_names]
             if extensions:
                 logger.debug("Found %s extensions: %s", len(extensions), [e.name for e in extensions])
                 allowed_extensions = _handle_extension_suppressions(extensions)
                 module_commands = set(self.command_table.keys())
                 for ext in allowed_extensions:
                     try:
-                        check_version_compatibility(ext.get_metadata())
+                        check_version_compatibility(ext.metadata)
                     except CLIError as ex:
                         # issue warning and skip loading extensions that aren't compatible with the CLI core
                         logger.warning(ex)
@@ -295,6 +301,27 @@ class MainCommandsLoader(CLICommandsLoader):
                             res.append(sup)
             return res
 
+        command_index = None
+        if args and self.cli_ctx.config.getboolean('core', 'use_command_index', True):
+            command_index = CommandIndex(self.cli_ctx)
+            index_result = command_index.get(args)
+            if index_result:
+                index_modules, index_extensions = index_result
+                _update_command_table_from_modules(args, index_modules)
+                try:
+                    # Suppressed extensions never make it into the index, so there is nothing to filter here.
+                    _update_command_table_from_extensions([], index_extensions)
+                except Exception:  # pylint: disable=broad-except
+                    logger.warning("Unable to load extensions. Use --debug for more information.")
+                    logger.debug(traceback.format_exc())
+                if command_index.resolves(args, self.command_table, self.command_group_table):
+                    logger.debug("Loaded %d groups, %d commands from the command index.",
+                                 len(self.command_group_table), len(self.command_table))
+                    return self.command_table
+                logger.debug("The command index is outdated for '%s'. Loading all modules and extensions.",
+                             ' '.join(args))
+                self._reset_command_table()
+
         _update_command_table_from_modules(args)
         try:
             ext_suppressions = _get_extension_suppressions(self.loaders)
@@ -305,8 +332,17 @@ class MainCommandsLoader(CLICommandsLoader):
             logger.warning("Unable to load extensions. Use --debug for more information.")
             logger.debug(traceback.format_exc())
 
+        if command_index:
+            command_index.update(self.command_table)
+
         return self.command_table
 
+    def _reset_command_table(self):
+        self.command_table = {}
+        self.command_group_table = {}
+        self.cmd_to_loader_map = {}
+        self.loaders = []
+
     def load_arguments(self, command=None):
         from azure.cli.core.commands.parameters import (
             resource_group_name_type, get_location_type, deployment_name_type, vnet_name_type, subnet_name_type)
@@ -322,17 +358,19 @@ class MainCommandsLoader(CLICommandsLoader):
             command_loaders = self.cmd_to_loader_map.get(command, None)
 
         if command_loaders:
+            location_type = get_location_type(self.cli_ctx)
             for loader in command_loaders:
 
                 # register global args
                 with loader.argument_context('') as c:
                     c.argument('resource_group_name', resource_group_name_type)
-                    c.argument('location', get_location_type(self.cli_ctx))
+                    c.argument('location', location_type)
                     c.argument('vnet_name', vnet_name_type)
                     c.argument('subnet', subnet_name_type)
                     c.argument('deployment_name', deployment_name_type)
                     c.argument('cmd', ignore_type)
 
+                start_time = timeit.default_timer()
                 if command is None:
                     # load all arguments via reflection
                     for cmd in loader.command_table.values():
@@ -343,11 +381,126 @@ class MainCommandsLoader(CLICommandsLoader):
                     loader.command_name = command
                     self.command_table[command].load_arguments()  # this loads the arguments via reflection
                     loader.load_arguments(command)  # this adds entries to the argument registries
+                logger.debug("Loaded arguments of '%s' for '%s' in %.3f seconds.",
+                             loader.__module__, command or 'all commands', timeit.default_timer() - start_time)
                 self.argument_registry.arguments.update(loader.argument_registry.arguments)
                 self.extra_argument_registry.update(loader.extra_argument_registry)
                 loader._update_command_definitions()  # pylint: disable=protected-access
 
 
+class CommandIndex(object):
+    """ Persistent mapping of top-level command names to the command modules and extensions that provide them.
+
+    The index is stored in `commandIndex.json` under the config dir and is only trusted while the CLI core version,
+    the cloud profile and the set of installed extensions match the ones it was built with. On any mismatch or miss
+    the caller loads every module and rebuilds the index with `update`.
+    """
+
+    _COMMAND_INDEX = 'commandIndex'
+    _COMMAND_INDEX_VERSION = 'version'
+    _COMMAND_INDEX_CLOUD_PROFILE = 'cloudProfile'
+    _COMMAND_INDEX_EXTENSIONS = 'extensions'
+    _KEY_MODULES = 'modules'
+    _KEY_EXTENSIONS = 'extensions'
+
+    def __init__(self, cli_ctx=None):
+        from azure.cli.core._session import INDEX
+        self.INDEX = INDEX
+        self.version = __version__
+        self.cloud_profile = cli_ctx.cloud.profile if cli_ctx else None
+
+    @staticmethod
+    def _get_installed_extension_names():
+        from azure.cli.core.extension import get_extension_names
+        try:
+            return sorted(get_extension_names())
+        except Exception:  # pylint: disable=broad-except
+            logger.debug("Unable to list installed extensions for the command index.", exc_info=True)
+            return None
+
+    def get(self, args):
+        """ Return (command_modules, extension_names) owning the top-level command in `args`, or None on a miss. """
+        # `az`, `az --help` and friends need the full command table
+        if not args or args[0].startswith('-'):
+            return None
+
+        index_version = self.INDEX.get(self._COMMAND_INDEX_VERSION)
+        cloud_profile = self.INDEX.get(self._COMMAND_INDEX_CLOUD_PROFILE)
+        index_extensions = self.INDEX.get(self._COMMAND_INDEX_EXTENSIONS)
+        if not (index_version and index_version == self.version and
+                cloud_profile and cloud_profile == self.cloud_profile):
+            logger.debug("The command index version or cloud profile doesn't match the current CLI.")
+            return None
+        if index_extensions is None or index_extensions != self._get_installed_extension_names():
+            logger.debug("The installed extensions don't match the command index.")
+            return None
+
+        entry = self.INDEX.get(self._COMMAND_INDEX, {}).get(args[0].lower())
+        if not entry:
+            logger.debug("No command index entry for '%s'.", args[0])
+            return None
+        return entry.get(self._KEY_MODULES, []), entry.get(self._KEY_EXTENSIONS, [])
+
+    @staticmethod
+    def resolves(args, command_table, command_group_table):
+        """ Check that the partially loaded command table contains the command or group in `args`. """
+        positional = []
+        for arg in args:
+            if arg.startswith('-'):
+                break
+            positional.append(arg.lower())
+        # Positional arguments (e.g. `az find vm create`) follow the command name, so accept any leading match.
+        for length in range(len(positional), 0, -1):
+            name = ' '.join(positional[:length])
+            if name in command_table or name in command_group_table:
+                return True
+        return False
+
+    def update(self, command_table):
+        from azure.cli.core.commands import ExtensionCommandSource
+        start_time = timeit.default_timer()
+        extension_names = self._get_installed_extension_names()
+        if extension_names is None:
+            return
+
+        index = {}
+        for command_name, command in command_table.items():
+            top_command = command_name.split()[0]
+            entry = index.setdefault(top_command, {self._KEY_MODULES: [], self._KEY_EXTENSIONS: []})
+            source = getattr(command, 'command_source', None)
+            if isinstance(source, ExtensionCommandSource):
+                key, name = self._KEY_EXTENSIONS, source.extension_name
+            elif isinstance(source, six.string_types):
+                key, name = self._KEY_MODULES, source
+            else:
+                continue
+            if name not in entry[key]:
+                entry[key].append(name)
+
+        self.INDEX.data[self._COMMAND_INDEX_VERSION] = self.version
+        self.INDEX.data[self._COMMAND_INDEX_CLOUD_PROFILE] = self.cloud_profile
+        self.INDEX.data[self._COMMAND_INDEX_EXTENSIONS] = extension_names
+        self.INDEX.data[self._COMMAND_INDEX] = index
+        try:
+            self.INDEX.save_with_retry()
+        except (OSError, IOError):
+            logger.debug("Unable to save the command index.", exc_info=True)
+            return
+        logger.debug("Updated command index in %.3f seconds.", timeit.default_timer() - start_time)
+
+    def invalidate(self):
+        self.INDEX.data[self._COMMAND_INDEX_VERSION] = ""
+        self.INDEX.data[self._COMMAND_INDEX_CLOUD_PROFILE] = ""
+        self.INDEX.data[self._COMMAND_INDEX_EXTENSIONS] = None
+        self.INDEX.data[self._COMMAND_INDEX] = {}
+        try:
+            self.INDEX.save_with_retry()
+        except (OSError, IOError):
+            logger.debug("Unable to save the command index.", exc_info=True)
+            return
+        logger.debug("Command index has been invalidated.")
+
+
 class ModExtensionSuppress(object):  # pylint: disable=too-few-public-methods
 
     def __init__(self, mod_name, suppress_extension_name, suppress_up_to_version, reason=None, recommend_remove=False,
@@ -601,7 +754,7 @@ def get_default_cli():
     from azure.cli.core.parser import AzCliCommandParser
     from azure.cli.core._config import GLOBAL_CONFIG_DIR, ENV_VAR_PREFIX
     from azure.cli.core._help import AzCliHelp
-    from azure.cli.core._output import AzOutputProducer
+    from azure.cli.core._output import AzOutputProducer, AzCliQuery
 
     return AzCli(cli_name='az',
                  config_dir=GLOBAL_CONFIG_DIR,
@@ -611,4 +764,5 @@ def get_default_cli():
                  parser_cls=AzCliCommandParser,
                  logging_cls=AzCliLogging,
                  output_cls=AzOutputProducer,
+                 query_cls=AzCliQuery,
                  help_cls=AzCliHelp)
@@ -6,6 +6,7 @@
 from __future__ import print_function
 import argparse
 
+from azure.cli.core._help_store import HelpStore
 from azure.cli.core.commands import ExtensionCommandSource
 from azure.cli.core.commands.constants import (SURVEY_PROMPT, SURVEY_PROMPT_COLOR,
                                                UX_SURVEY_PROMPT, UX_SURVEY_PROMPT_COLOR)
@@ -162,6 +163,7 @@ class AzCliHelp(CLIPrintMixin, CLIHelp):
 
         self._register_help_loaders()
         self._name_to_content = {}
+        self.help_store = HelpStore(cli_ctx)
 
     def show_help(self, cli_name, nouns, parser, is_group):
         self.update_loaders_with_help_file_contents(nouns)
@@ -202,6 +204,8 @@ class AzCliHelp(CLIPrintMixin, CLIHelp):
         self.versioned_loaders = versioned_loaders
 
     def update_loaders_with_help_file_contents(self, nouns):
+        self._load_help_store(nouns)
+
         loader_file_names_dict = {}
         file_name_set = set()
         for ldr_cls_name, loader in self.versioned_loaders.items():
@@ -220,6 +224,15 @@ class AzCliHelp(CLIPrintMixin, CLIHelp):
                 file_contents[name] = self._name_to_content[name]
             self.versioned_loaders[ldr_cls_name].update_file_contents(file_contents)
 
+    def _load_help_store(self, nouns):
+        # the help of a group can be defined by any of the modules with commands in the group
+        command = ' '.join(nouns)
+        cmd_loader_map = self.cli_ctx.invocation.commands_loader.cmd_to_loader_map
+        self.help_store.load_modules({loader.__class__.__module__
+                                      for cmd_name, loaders in cmd_loader_map.items()
+                                      if not command or cmd_name == command or cmd_name.startswith(command + ' ')
+                                      for loader in loaders})
+
     # This method is meant to be a hook that can be overridden by an extension or module.
     @staticmethod
     def update_examples(help_file):
@@ -250,6 +263,12 @@ class CliHelpFile(KnackHelpFile):
 
         return True
 
+    # Needs to override base implementation to look up help in the help store rather than in knack's helps.
+    def _load_from_file(self):
+        file_data = self.help_ctx.help_store.get(self.delimiters)
+        if file_data:
+            self._load_from_data(file_data)
+
     # Needs to override base implementation to exclude unsupported examples.
     def _load_from_data(self, data):
         if not data:
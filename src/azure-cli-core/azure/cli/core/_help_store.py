@@ -0,0 +1,91 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import importlib
+import importlib.util
+import json
+import os
+import sys
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+HELP_STORE_DIR = 'commandHelp'
+
+
+class HelpStore(object):
+    """ Help entries of command modules, keyed by command path.
+
+    Command modules register their help as YAML strings into knack's `helps` from their `_help` module. Those modules
+    are only imported once help is requested for one of their commands. The parsed entries are then kept in the config
+    directory, one file per module, so later requests skip both importing the module and parsing the YAML. A file is
+    rebuilt whenever the `_help` module it was built from changes. """
+
+    def __init__(self, cli_ctx):
+        self._directory = os.path.join(cli_ctx.config.config_dir, HELP_STORE_DIR)
+        self._entries = {}
+        self._loaded_modules = set()
+
+    def load_modules(self, module_names):
+        """ Make the help of the given command (or extension) modules available. """
+        for module_name in module_names:
+            if module_name not in self._loaded_modules:
+                self._loaded_modules.add(module_name)
+                self._entries.update(self._load_module('{}._help'.format(module_name)))
+
+    def get(self, delimiters):
+        """ The parsed help entry of a command or group, or None. Entries registered into `helps` directly, e.g. by
+        extensions, take precedence. """
+        from knack.help_files import helps
+        if delimiters in helps:
+            import yaml
+            return yaml.safe_load(helps[delimiters])
+        return self._entries.get(delimiters)
+
+    def get_all(self):
+        """ The parsed help entries of the loaded modules and those registered into `helps`, keyed by command path. """
+        import yaml
+        from knack.help_files import helps
+        entries = dict(self._entries)
+        entries.update((k, yaml.safe_load(v)) for k, v in helps.items())
+        return entries
+
+    def _load_module(self, help_module_name):
+        from azure.cli.core.util import get_file_state, write_file_atomically
+        try:
+            spec = importlib.util.find_spec(help_module_name)
+        except (ImportError, AttributeError, ValueError):
+            spec = None
+        if not spec or not spec.origin or help_module_name in sys.modules:
+            # nothing to load, or its entries are in `helps` already
+            return {}
+
+        state = list(get_file_state(spec.origin) or [])
+        store_path = os.path.join(self._directory, help_module_name + '.json')
+        try:
+            with open(store_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('state') == state:
+                return data['entries']
+        except (OSError, ValueError, KeyError):
+            pass
+
+        logger.debug("Building help store for '%s'", help_module_name)
+        entries = self._parse_module(help_module_name)
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            write_file_atomically(store_path, json.dumps({'state': state, 'entries': entries}))
+        except OSError as ex:
+            logger.debug("Failed to save help store '%s': %s", store_path, ex)
+        return entries
+
+    @staticmethod
+    def _parse_module(help_module_name):
+        import yaml
+        from knack.help_files import helps
+        known = dict(helps)
+        importlib.import_module(help_module_name)
+        return {k: yaml.safe_load(v) for k, v in helps.items() if known.get(k) is not v}
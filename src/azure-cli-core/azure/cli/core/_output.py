@@ -3,14 +3,174 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import collections
+import errno
+import itertools
+import json
+
 import knack.output
+from knack.log import get_logger
+from knack.query import CLIQuery
+from knack.events import EVENT_INVOKER_FILTER_RESULT, EVENT_INVOKER_POST_PARSE_ARGS
+
+logger = get_logger(__name__)
+
+DEFAULT_STREAM_PAGE_SIZE = 100
+
+
+class StreamingResult(object):
+    """ The result of a paged list command that is transformed, queried and written out one page at a time,
+    so the first items are printed before the last page has been fetched and the full list is never held in memory.
+    """
+
+    def __init__(self, items, page_size=DEFAULT_STREAM_PAGE_SIZE):
+        self._items = items
+        self._page_size = page_size
+        self._transforms = []
+
+    def add_transform(self, transform):
+        """ Register a function applied to each page (a list of items) in the order of registration. """
+        self._transforms.append(transform)
+
+    def pages(self):
+        iterator = iter(self._items)
+        while True:
+            page = list(itertools.islice(iterator, self._page_size))
+            if not page:
+                return
+            for transform in self._transforms:
+                page = transform(page)
+            yield page
+
+    def __iter__(self):
+        for page in self.pages():
+            for item in page:
+                yield item
+
+    def materialize(self):
+        return list(self)
+
+
+def is_streamable_query(expression):
+    """ Whether a compiled JMESPath expression maps each element of a list independently, i.e. applying it to every
+    page and concatenating the results gives the same list as applying it once to the whole result. """
+    parsed = getattr(expression, 'parsed', None) or {}
+    if parsed.get('type') not in ('projection', 'filter_projection'):
+        return False
+    left = parsed['children'][0]
+    if left['type'] == 'flatten':
+        left = left['children'][0]
+    return left['type'] == 'identity'
+
+
+class AzCliQuery(CLIQuery):
+
+    @staticmethod
+    def handle_query_parameter(cli_ctx, **kwargs):
+        args = kwargs['args']
+        query_expression = args._jmespath_query  # pylint: disable=protected-access
+        del args._jmespath_query
+        if query_expression:
+            def filter_output(cli_ctx, **kwargs):
+                from jmespath import Options
+                result = kwargs['event_data']['result']
+                if isinstance(result, StreamingResult):
+                    if is_streamable_query(query_expression):
+                        result.add_transform(lambda page: query_expression.search(
+                            page, Options(collections.OrderedDict)))
+                    else:
+                        logger.debug("Query '%s' needs the whole result, streaming is disabled.",
+                                     query_expression.expression)
+                        kwargs['event_data']['result'] = query_expression.search(
+                            result.materialize(), Options(collections.OrderedDict))
+                else:
+                    kwargs['event_data']['result'] = query_expression.search(
+                        result, Options(collections.OrderedDict))
+                cli_ctx.unregister_event(EVENT_INVOKER_FILTER_RESULT, filter_output)
+            cli_ctx.register_event(EVENT_INVOKER_FILTER_RESULT, filter_output)
+            cli_ctx.invocation.data['query_active'] = True
+
+    def __init__(self, cli_ctx=None):
+        super(AzCliQuery, self).__init__(cli_ctx=cli_ctx)
+        self.cli_ctx.unregister_event(EVENT_INVOKER_POST_PARSE_ARGS, CLIQuery.handle_query_parameter)
+        self.cli_ctx.register_event(EVENT_INVOKER_POST_PARSE_ARGS, AzCliQuery.handle_query_parameter)
+
+
+def _dump_json_item(item):
+    # Same settings as knack.output.format_json, indented one level for the enclosing list
+    item = dict(item) if hasattr(item, '__dict__') else item
+    dumped = json.dumps(item, ensure_ascii=False, indent=2, sort_keys=True, cls=knack.output._ComplexEncoder,  # pylint: disable=protected-access
+                        separators=(',', ': '))
+    return '  ' + dumped.replace('\n', '\n  ')
+
+
+def _stream_json(result, colorize=False):
+    highlight_chunk = None
+    if colorize:
+        from pygments import highlight, lexers, formatters
+
+        def highlight_chunk(chunk):
+            return highlight(chunk, lexers.JsonLexer(), formatters.TerminalFormatter())  # pylint: disable=no-member
+
+    empty = True
+    for page in result.pages():
+        if not page:
+            continue
+        chunk = ',\n'.join(_dump_json_item(item) for item in page)
+        chunk = ('[\n' if empty else ',\n') + chunk
+        empty = False
+        yield highlight_chunk(chunk) if colorize else chunk
+    tail = '[]\n' if empty else '\n]\n'
+    yield highlight_chunk(tail) if colorize else tail
+
+
+def _stream_tsv(result):
+    for page in result.pages():
+        yield knack.output._TsvOutput.dump(page)  # pylint: disable=protected-access
+
+
+def _stream_none(result):
+    for _ in result.pages():
+        pass
+    return iter([])
 
 
 class AzOutputProducer(knack.output.OutputProducer):
 
+    _STREAM_FORMATTERS = {
+        knack.output.format_json: _stream_json,
+        knack.output.format_json_color: lambda result: _stream_json(result, colorize=True),
+        knack.output.format_tsv: _stream_tsv,
+        knack.output.format_none: _stream_none,
+    }
+
     def check_valid_format_type(self, format_type):
         return format_type in self._FORMAT_DICT
 
+    def out(self, obj, formatter=None, out_file=None):
+        if not isinstance(obj.result, StreamingResult):
+            return super(AzOutputProducer, self).out(obj, formatter=formatter, out_file=out_file)
+
+        stream_formatter = self._STREAM_FORMATTERS.get(formatter)
+        if stream_formatter is None:
+            # table and yaml lay out the whole result at once
+            obj.result = obj.result.materialize()
+            return super(AzOutputProducer, self).out(obj, formatter=formatter, out_file=out_file)
+
+        try:
+            for chunk in stream_formatter(obj.result):
+                try:
+                    print(chunk, file=out_file, end='')
+                except UnicodeEncodeError:
+                    logger.warning("Unable to encode the output with %s encoding. Unsupported characters are "
+                                   "discarded.", out_file.encoding)
+                    print(chunk.encode('ascii', 'ignore').decode('utf-8', 'ignore'), file=out_file, end='')
+                out_file.flush()
+        except IOError as ex:
+            if ex.errno != errno.EPIPE:
+                raise
+        return None
+
 
 def get_output_format(cli_ctx):
     return cli_ctx.invocation.data.get("output", None)
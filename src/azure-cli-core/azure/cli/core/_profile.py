@@ -19,7 +19,7 @@ from six.moves import BaseHTTPServer
 from azure.cli.core._environment import get_config_dir
 from azure.cli.core._session import ACCOUNT
 from azure.cli.core.util import get_file_json, in_cloud_console, open_page_in_browser, can_launch_browser,\
-    is_windows, is_wsl
+    is_windows, is_wsl, get_concurrency_config
 from azure.cli.core.cloud import get_active_cloud, set_cloud_subscription
 
 from knack.log import get_logger
@@ -68,6 +68,15 @@ TOKEN_FIELDS_EXCLUDED_FROM_PERSISTENCE = ['familyName',
                                           'tenantId']
 
 _CLIENT_ID = '04b07795-8ddb-461a-bbee-02f9e1bf7b46'
+
+# Access tokens of service principals, which ADAL doesn't cache, are kept next to the token file
+_SERVICE_PRINCIPAL_TOKENS_FILE_NAME = 'servicePrincipalAccessTokens.json'
+_SP_TOKEN_RESOURCE = 'resource'
+_SP_TOKEN_AUTHORITY = 'authority'
+_SP_TOKEN_EXPIRES_ON_TIMESTAMP = 'expiresOnTimestamp'
+_SP_TOKEN_ENTRY = 'tokenEntry'
+# a cached token is only reused while it is valid for at least this many seconds, like ADAL does
+_SP_TOKEN_EXPIRATION_MARGIN = 300
 _COMMON_TENANT = 'common'
 
 _TENANT_LEVEL_ACCOUNT_NAME = 'N/A(tenant level account)'
@@ -78,6 +87,8 @@ _ASSIGNED_IDENTITY_INFO = 'assignedIdentityInfo'
 
 _AZ_LOGIN_MESSAGE = "Please run 'az login' to setup account."
 
+DEFAULT_MAX_CONCURRENT_TENANTS = 8
+
 
 def load_subscriptions(cli_ctx, all_clouds=False, refresh=False):
     profile = Profile(cli_ctx=cli_ctx)
@@ -117,6 +128,14 @@ def _load_tokens_from_file(file_path):
     return []
 
 
+def _get_adal_token_key(entry):
+    return (entry.get('_authority'), entry.get('_clientId'), entry.get(_TOKEN_ENTRY_USER_ID), entry.get('resource'))
+
+
+def _get_service_principal_key(entry):
+    return entry[_SERVICE_PRINCIPAL_ID], entry.get(_SERVICE_PRINCIPAL_TENANT)
+
+
 def _delete_file(file_path):
     try:
         os.remove(file_path)
@@ -877,8 +896,27 @@ class SubscriptionFinder(object):
         token_cache = self._adal_token_cache if use_token_cache else None
         return self._auth_context_factory(self.cli_ctx, tenant, token_cache)
 
-    def _find_using_common_tenant(self, access_token, resource):
+    def _find_in_tenant(self, tenant, resource):
+        """ Acquire a token for the tenant and list its subscriptions. Runs on a worker thread, so it doesn't
+        touch the state of the finder. Returns the subscriptions, or the AdalError the token acquisition failed with.
+        """
+        import timeit
         import adal
+        start_time = timeit.default_timer()
+        temp_context = self._create_auth_context(tenant.tenant_id)
+        try:
+            temp_credentials = temp_context.acquire_token(resource, self.user_id, _CLIENT_ID)
+        except adal.AdalError as ex:
+            logger.debug("Failed to acquire a token for tenant %s in %.3f seconds.",
+                         tenant.tenant_id, timeit.default_timer() - start_time)
+            return None, ex
+        subscriptions = self._list_subscriptions(tenant.tenant_id, temp_credentials[_ACCESS_TOKEN])
+        logger.debug("Found %d subscriptions in tenant %s in %.3f seconds.",
+                     len(subscriptions), tenant.tenant_id, timeit.default_timer() - start_time)
+        return subscriptions, None
+
+    def _find_using_common_tenant(self, access_token, resource):
+        import timeit
         from msrest.authentication import BasicTokenAuthentication
 
         all_subscriptions = []
@@ -886,19 +924,31 @@ class SubscriptionFinder(object):
         mfa_tenants = []
         token_credential = BasicTokenAuthentication({'access_token': access_token})
         client = self._arm_client_factory(token_credential)
-        tenants = client.tenants.list()
+        tenants = list(client.tenants.list())
         for t in tenants:
-            tenant_id = t.tenant_id
             # display_name is available since /tenants?api-version=2018-06-01,
             # not available in /tenants?api-version=2016-06-01
             if not hasattr(t, 'display_name'):
                 t.display_name = None
             if hasattr(t, 'additional_properties'):  # Remove this line once SDK is fixed
                 t.display_name = t.additional_properties.get('displayName')
-            temp_context = self._create_auth_context(tenant_id)
-            try:
-                temp_credentials = temp_context.acquire_token(resource, self.user_id, _CLIENT_ID)
-            except adal.AdalError as ex:
+
+        # Tenants are queried concurrently, the results are processed in the order of the tenants
+        start_time = timeit.default_timer()
+        max_workers = get_concurrency_config(self.cli_ctx, 'core', 'max_concurrent_tenants',
+                                             DEFAULT_MAX_CONCURRENT_TENANTS)
+        max_workers = max(1, min(max_workers, len(tenants)))
+        if max_workers > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(lambda t: self._find_in_tenant(t, resource), tenants))
+        else:
+            results = [self._find_in_tenant(t, resource) for t in tenants]
+        logger.debug("Queried %d tenants with %d workers in %.3f seconds.",
+                     len(tenants), max_workers, timeit.default_timer() - start_time)
+
+        for t, (subscriptions, ex) in zip(tenants, results):
+            if ex is not None:
                 # because user creds went through the 'common' tenant, the error here must be
                 # tenant specific, like the account was disabled. For such errors, we will continue
                 # with other tenants.
@@ -909,9 +959,7 @@ class SubscriptionFinder(object):
                 else:
                     logger.warning("Failed to authenticate '%s' due to error '%s'", t, ex)
                 continue
-            subscriptions = self._find_using_specific_tenant(
-                tenant_id,
-                temp_credentials[_ACCESS_TOKEN])
+            self.tenants.append(t.tenant_id)
 
             if not subscriptions:
                 empty_tenants.append(t)
@@ -953,6 +1001,11 @@ class SubscriptionFinder(object):
         return all_subscriptions
 
     def _find_using_specific_tenant(self, tenant, access_token):
+        all_subscriptions = self._list_subscriptions(tenant, access_token)
+        self.tenants.append(tenant)
+        return all_subscriptions
+
+    def _list_subscriptions(self, tenant, access_token):
         from msrest.authentication import BasicTokenAuthentication
 
         token_credential = BasicTokenAuthentication({'access_token': access_token})
@@ -965,7 +1018,6 @@ class SubscriptionFinder(object):
                 setattr(s, 'home_tenant_id', s.tenant_id)
             setattr(s, 'tenant_id', tenant)
             all_subscriptions.append(s)
-        self.tenants.append(tenant)
         return all_subscriptions
 
 
@@ -979,8 +1031,15 @@ class CredsCache(object):
         self._token_file = (os.environ.get('AZURE_ACCESS_TOKEN_FILE', None) or
                             os.path.join(get_config_dir(), 'accessTokens.json'))
         self._service_principal_creds = []
+        self._sp_token_file = os.path.join(os.path.dirname(self._token_file), _SERVICE_PRINCIPAL_TOKENS_FILE_NAME)
+        self._service_principal_tokens = None
         self._auth_ctx_factory = auth_ctx_factory
         self._adal_token_cache_attr = None
+        # the state of the token file when it was last loaded or written
+        self._token_file_state = None
+        # what this process changed since, to be merged with what other processes wrote to the token file
+        self._removed_token_users = set()
+        self._changed_service_principals = set()
         self._should_flush_to_disk = False
         self._async_persist = async_persist
         self._ctx = cli_ctx
@@ -996,8 +1055,8 @@ class CredsCache(object):
 
     def flush_to_disk(self):
         if self._should_flush_to_disk:
-            with os.fdopen(os.open(self._token_file, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600),
-                           'w+') as cred_file:
+            from azure.cli.core.util import file_lock, get_file_state, write_file_atomically
+            with file_lock(self._token_file):
                 items = self.adal_token_cache.read_items()
                 all_creds = [entry for _, entry in items]
 
@@ -1006,8 +1065,51 @@ class CredsCache(object):
                     for key in TOKEN_FIELDS_EXCLUDED_FROM_PERSISTENCE:
                         i.pop(key, None)
 
-                all_creds.extend(self._service_principal_creds)
-                cred_file.write(json.dumps(all_creds))
+                sp_creds = self._service_principal_creds
+                if get_file_state(self._token_file) not in (None, self._token_file_state):
+                    all_creds, sp_creds = self._merge_with_token_file(all_creds, sp_creds)
+
+                # concurrent processes never read a partial token file
+                write_file_atomically(self._token_file, json.dumps(all_creds + sp_creds))
+
+                self._token_file_state = get_file_state(self._token_file)
+                self._should_flush_to_disk = False
+                self._removed_token_users.clear()
+                self._changed_service_principals.clear()
+
+    def _merge_with_token_file(self, adal_entries, sp_creds):
+        """ Merge the credentials of this process with what other processes wrote to the token file since it was
+        loaded. For the same ADAL token the one expiring last wins, so a token refreshed by another process isn't
+        refreshed again. Service principal credentials and logouts of this process are applied on top. """
+        try:
+            file_entries = _load_tokens_from_file(self._token_file)
+        except CLIError:
+            return adal_entries, sp_creds
+
+        merged_adal_entries = collections.OrderedDict()
+        for entry in file_entries:
+            if not entry.get(_SERVICE_PRINCIPAL_ID) and \
+                    entry.get(_TOKEN_ENTRY_USER_ID) not in self._removed_token_users:
+                merged_adal_entries[_get_adal_token_key(entry)] = entry
+        for entry in adal_entries:
+            key = _get_adal_token_key(entry)
+            if key not in merged_adal_entries or (entry.get('expiresOn') or '') >= \
+                    (merged_adal_entries[key].get('expiresOn') or ''):
+                merged_adal_entries[key] = entry
+
+        merged_sp_creds = collections.OrderedDict(
+            (_get_service_principal_key(x), x) for x in file_entries if x.get(_SERVICE_PRINCIPAL_ID) and
+            _get_service_principal_key(x) not in self._changed_service_principals)
+        for cred in sp_creds:
+            if _get_service_principal_key(cred) in self._changed_service_principals:
+                merged_sp_creds[_get_service_principal_key(cred)] = cred
+
+        adal_entries, sp_creds = list(merged_adal_entries.values()), list(merged_sp_creds.values())
+        # pick up the changes of the other processes
+        import adal
+        self._adal_token_cache_attr = adal.TokenCache(json.dumps(adal_entries))
+        self._service_principal_creds = sp_creds
+        return adal_entries, sp_creds
 
     def retrieve_token_for_user(self, username, tenant, resource):
         context = self._auth_ctx_factory(self._ctx, tenant, cache=self.adal_token_cache)
@@ -1049,13 +1151,83 @@ class CredsCache(object):
                            sp_id, tenant, matched[0][_SERVICE_PRINCIPAL_TENANT])
             cred = matched[0]
 
+        token_entry = self._get_cached_service_principal_token(sp_id, tenant, resource)
+        if token_entry:
+            return (token_entry[_TOKEN_ENTRY_TOKEN_TYPE], token_entry[_ACCESS_TOKEN], token_entry)
+
         context = self._auth_ctx_factory(self._ctx, tenant, None)
         sp_auth = ServicePrincipalAuth(cred.get(_ACCESS_TOKEN, None) or
                                        cred.get(_SERVICE_PRINCIPAL_CERT_FILE, None),
                                        use_cert_sn_issuer)
         token_entry = sp_auth.acquire_token(context, resource, sp_id)
+        self._cache_service_principal_token(sp_id, tenant, resource, token_entry)
         return (token_entry[_TOKEN_ENTRY_TOKEN_TYPE], token_entry[_ACCESS_TOKEN], token_entry)
 
+    def _load_service_principal_tokens(self):
+        try:
+            with open(self._sp_token_file, 'r') as token_file:
+                entries = json.load(token_file)
+            return entries if isinstance(entries, list) else []
+        except (OSError, IOError, ValueError):
+            # it's only a cache, a missing or corrupted file just means tokens are acquired again
+            return []
+
+    def _match_service_principal_token(self, entry, sp_id, tenant, resource):
+        return (entry.get(_SERVICE_PRINCIPAL_ID) == sp_id and entry.get(_SERVICE_PRINCIPAL_TENANT) == tenant and
+                entry.get(_SP_TOKEN_RESOURCE) == resource and
+                entry.get(_SP_TOKEN_AUTHORITY) == self._ctx.cloud.endpoints.active_directory)
+
+    def _get_cached_service_principal_token(self, sp_id, tenant, resource):
+        import time
+        if self._service_principal_tokens is None:
+            self._service_principal_tokens = self._load_service_principal_tokens()
+        for entry in self._service_principal_tokens:
+            if self._match_service_principal_token(entry, sp_id, tenant, resource):
+                expires_in = entry.get(_SP_TOKEN_EXPIRES_ON_TIMESTAMP, 0) - time.time()
+                if expires_in > _SP_TOKEN_EXPIRATION_MARGIN:
+                    logger.debug("Using the cached access token of service principal %s for %s", sp_id, resource)
+                    token_entry = dict(entry[_SP_TOKEN_ENTRY])
+                    token_entry['expiresIn'] = int(expires_in)
+                    return token_entry
+        return None
+
+    def _cache_service_principal_token(self, sp_id, tenant, resource, token_entry):
+        import time
+        if not token_entry.get('expiresIn'):
+            return
+        entry = {
+            _SERVICE_PRINCIPAL_ID: sp_id,
+            _SERVICE_PRINCIPAL_TENANT: tenant,
+            _SP_TOKEN_RESOURCE: resource,
+            _SP_TOKEN_AUTHORITY: self._ctx.cloud.endpoints.active_directory,
+            _SP_TOKEN_EXPIRES_ON_TIMESTAMP: time.time() + token_entry['expiresIn'],
+            _SP_TOKEN_ENTRY: token_entry
+        }
+        # Merge with what other processes cached in the meantime
+        self._save_service_principal_tokens(
+            lambda x: not self._match_service_principal_token(x, sp_id, tenant, resource), entry)
+
+    def _save_service_principal_tokens(self, keep, new_entry=None):
+        import time
+        from azure.cli.core.util import file_lock, write_file_atomically
+        try:
+            with file_lock(self._sp_token_file):
+                now = time.time()
+                entries = [x for x in self._load_service_principal_tokens()
+                           if x.get(_SP_TOKEN_EXPIRES_ON_TIMESTAMP, 0) > now and keep(x)]
+                if new_entry:
+                    entries.append(new_entry)
+                self._service_principal_tokens = entries
+                write_file_atomically(self._sp_token_file, json.dumps(entries))
+        except (OSError, IOError) as ex:
+            logger.debug("Failed to persist service principal access tokens: %s", ex)
+
+    def _remove_service_principal_tokens(self, sp_id):
+        if any(x.get(_SERVICE_PRINCIPAL_ID) == sp_id for x in self._load_service_principal_tokens()):
+            self._save_service_principal_tokens(lambda x: x.get(_SERVICE_PRINCIPAL_ID) != sp_id)
+        else:
+            self._service_principal_tokens = None
+
     def retrieve_secret_of_service_principal(self, sp_id):
         self.load_adal_token_cache()
         matched = [x for x in self._service_principal_creds if sp_id == x[_SERVICE_PRINCIPAL_ID]]
@@ -1069,9 +1241,15 @@ class CredsCache(object):
         return self.load_adal_token_cache()
 
     def load_adal_token_cache(self):
-        if self._adal_token_cache_attr is None:
+        from azure.cli.core.util import get_file_state
+        # Unless this process has changes to persist, pick up tokens refreshed by other processes in the meantime.
+        # Files that haven't changed aren't parsed again.
+        if self._adal_token_cache_attr is None or (not self._should_flush_to_disk and
+                                                   get_file_state(self._token_file) != self._token_file_state):
             import adal
+            self._token_file_state = get_file_state(self._token_file)
             all_entries = _load_tokens_from_file(self._token_file)
+            self._service_principal_creds = []
             self._load_service_principal_creds(all_entries)
             real_token = [x for x in all_entries if x not in self._service_principal_creds]
             self._adal_token_cache_attr = adal.TokenCache(json.dumps(real_token))
@@ -1095,6 +1273,9 @@ class CredsCache(object):
             state_changed = True
 
         if state_changed:
+            self._changed_service_principals.add(_get_service_principal_key(sp_entry))
+            # tokens acquired with the old secret or certificate
+            self._remove_service_principal_tokens(sp_entry[_SERVICE_PRINCIPAL_ID])
             self.persist_cached_creds()
 
     def _load_service_principal_creds(self, creds):
@@ -1110,6 +1291,7 @@ class CredsCache(object):
         if tokens:
             state_changed = True
             self.adal_token_cache.remove(tokens)
+            self._removed_token_users.add(user_or_sp)
 
         # clear service principal creds
         matched = [x for x in self._service_principal_creds
@@ -1118,6 +1300,8 @@ class CredsCache(object):
             state_changed = True
             self._service_principal_creds = [x for x in self._service_principal_creds
                                              if x not in matched]
+            self._changed_service_principals.update(_get_service_principal_key(x) for x in matched)
+            self._remove_service_principal_tokens(user_or_sp)
 
         if state_changed:
             self.persist_cached_creds()
@@ -1125,6 +1309,11 @@ class CredsCache(object):
     def remove_all_cached_creds(self):
         # we can clear file contents, but deleting it is simpler
         _delete_file(self._token_file)
+        self._service_principal_tokens = None
+        try:
+            os.remove(self._sp_token_file)
+        except OSError:
+            pass
 
 
 class ServicePrincipalAuth(object):
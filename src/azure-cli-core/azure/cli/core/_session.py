@@ -29,6 +29,9 @@ class Session(collections.MutableMapping):
 
     All direct modifications will save the file. Indirect modifications should
     be followed by a call to `save_with_retry` or `save`.
+
+    The file is shared by concurrent az processes: it is written atomically under a file lock, and direct
+    modifications only overwrite the modified key, keeping what other processes saved to the rest of the file.
     """
 
     def __init__(self, encoding=None):
@@ -36,17 +39,26 @@ class Session(collections.MutableMapping):
         self.filename = None
         self.data = {}
         self._encoding = encoding if encoding else 'utf-8-sig'
+        # the state of the file when it was last loaded or saved
+        self._file_state = None
 
     def load(self, filename, max_age=0):
+        from azure.cli.core.util import get_file_state
+        file_state = get_file_state(filename)
+        expired = max_age > 0 and file_state is not None and os.stat(filename).st_mtime + max_age < time.time()
+        if filename == self.filename and file_state is not None and file_state == self._file_state and not expired:
+            # unchanged since it was last loaded or saved
+            return
+
         self.filename = filename
         self.data = {}
         try:
-            if max_age > 0:
-                st = os.stat(self.filename)
-                if st.st_mtime + max_age < time.time():
-                    self.save()
+            if expired:
+                self.save()
+            file_state = get_file_state(self.filename)
             with codecs_open(self.filename, 'r', encoding=self._encoding) as f:
                 self.data = json.load(f)
+            self._file_state = file_state
         except (OSError, IOError, t_JSONDecodeError) as load_exception:
             # OSError / IOError should imply file not found issues which are expected on fresh runs (e.g. on build
             # agents or new systems). A parse error indicates invalid/bad data in the file. We do not wish to warn
@@ -61,19 +73,46 @@ class Session(collections.MutableMapping):
             self.save()
 
     def save(self):
+        self._save()
+
+    def _save(self, changed_keys=None):
+        """ Write the session to the file. With `changed_keys`, only those keys are written over what other
+        processes saved since the file was loaded, and their changes are picked up. """
         if self.filename:
-            with codecs_open(self.filename, 'w', encoding=self._encoding) as f:
-                json.dump(self.data, f)
+            from azure.cli.core.util import file_lock, get_file_state, write_file_atomically
+            with file_lock(self.filename):
+                if changed_keys is not None and get_file_state(self.filename) not in (None, self._file_state):
+                    self.data = self._merge_with_file(changed_keys)
+                write_file_atomically(self.filename, json.dumps(self.data), encoding=self._encoding)
+                self._file_state = get_file_state(self.filename)
+
+    def _merge_with_file(self, changed_keys):
+        try:
+            with codecs_open(self.filename, 'r', encoding=self._encoding) as f:
+                data = json.load(f)
+        except (OSError, IOError, t_JSONDecodeError):
+            return self.data
+        if not isinstance(data, dict):
+            return self.data
+        for key in changed_keys:
+            if key in self.data:
+                data[key] = self.data[key]
+            else:
+                data.pop(key, None)
+        return data
 
     def save_with_retry(self, retries=5):
+        self._save_with_retry(retries=retries)
+
+    def _save_with_retry(self, changed_keys=None, retries=5):
         for _ in range(retries - 1):
             try:
-                self.save()
+                self._save(changed_keys)
                 break
             except OSError:
                 time.sleep(0.1)
         else:
-            self.save()
+            self._save(changed_keys)
 
     def get(self, key, default=None):
         return self.data.get(key, default)
@@ -83,11 +122,11 @@ class Session(collections.MutableMapping):
 
     def __setitem__(self, key, value):
         self.data[key] = value
-        self.save_with_retry()
+        self._save_with_retry([key])
 
     def __delitem__(self, key):
         del self.data[key]
-        self.save_with_retry()
+        self._save_with_retry([key])
 
     def __iter__(self):
         return iter(self.data)
@@ -105,6 +144,9 @@ CONFIG = Session()
 # SESSION provides read-write session variables
 SESSION = Session()
 
+# INDEX contains {top-level command: [command_modules and extensions]} mapping index
+INDEX = Session()
+
 # VERSIONS provides local versions and pypi versions.
 # DO NOT USE it to get the current version of azure-cli,
 # it could be lagged behind and can be used to check whether
@@ -15,6 +15,7 @@ import os
 import re
 import sys
 import time
+import timeit
 import copy
 from importlib import import_module
 import six
@@ -26,7 +27,8 @@ from azure.cli.core.commands.constants import (
 from azure.cli.core.commands.parameters import (
     AzArgumentContext, patch_arg_make_required, patch_arg_make_optional)
 from azure.cli.core.extension import get_extension
-from azure.cli.core.util import get_command_type_kwarg, read_file_content, get_arg_list, poller_classes
+from azure.cli.core.util import (get_command_type_kwarg, read_file_content, get_arg_list, poller_classes,
+                                 get_throttling_retry_delay, get_concurrency_config)
 from azure.cli.core.local_context import LocalContextAction
 import azure.cli.core.telemetry as telemetry
 
@@ -49,6 +51,8 @@ except AttributeError:  # in Python 2.7
 
 logger = get_logger(__name__)
 DEFAULT_CACHE_TTL = '10'
+DEFAULT_MAX_CONCURRENT_IDS = 10
+IDS_THROTTLING_RETRIES = 3
 
 
 def _explode_list_args(args):
@@ -633,7 +637,8 @@ class AzCliCommandInvoker(CommandInvoker):
         for expanded_arg in _explode_list_args(parsed_args):
             cmd_copy = copy.copy(cmd)
             cmd_copy.cli_ctx = copy.copy(cmd.cli_ctx)
-            cmd_copy.cli_ctx.data = copy.deepcopy(cmd.cli_ctx.data)
+            # Jobs only ever (re)assign top-level keys, so the nested values can be shared
+            cmd_copy.cli_ctx.data = dict(cmd.cli_ctx.data)
             expanded_arg.cmd = expanded_arg._cmd = cmd_copy
 
             if hasattr(expanded_arg, '_subscription'):
@@ -642,11 +647,16 @@ class AzCliCommandInvoker(CommandInvoker):
             self._validation(expanded_arg)
             jobs.append((expanded_arg, cmd_copy))
 
+        # A single paged result can be written out page by page as it is fetched
+        self.data['stream_paged_output'] = len(jobs) == 1 and \
+            self.cli_ctx.config.getboolean('core', 'stream_paged_output', False)
+
         ids = getattr(parsed_args, '_ids', None) or [None] * len(jobs)
         if self.cli_ctx.config.getboolean('core', 'disable_concurrent_ids', False) or len(ids) < 2:
             results, exceptions = self._run_jobs_serially(jobs, ids)
         else:
-            results, exceptions = self._run_jobs_concurrently(jobs, ids)
+            max_workers = get_concurrency_config(self.cli_ctx, 'core', 'max_concurrent_ids', DEFAULT_MAX_CONCURRENT_IDS)
+            results, exceptions = self._run_jobs_concurrently(jobs, ids, max_workers=max_workers)
 
         # handle exceptions
         if len(exceptions) == 1 and not results:
@@ -698,6 +708,8 @@ class AzCliCommandInvoker(CommandInvoker):
             if _is_poller(result):
                 result = LongRunningOperation(cmd_copy.cli_ctx, 'Starting {}'.format(cmd_copy.name))(result)
             elif _is_paged(result):
+                if self.data.get('stream_paged_output'):
+                    return self._stream_paged_result(result, cmd_copy)
                 result = list(result)
 
             result = todict(result, AzCliCommandInvoker.remove_additional_prop_layer)
@@ -710,27 +722,80 @@ class AzCliCommandInvoker(CommandInvoker):
                 return CommandResultItem(None, exit_code=1, error=ex)
             six.reraise(*sys.exc_info())
 
+    @staticmethod
+    def _stream_paged_result(result, cmd_copy):
+        """ Defer fetching and transforming a paged result until the output producer asks for the next page. """
+        from azure.cli.core._output import StreamingResult
+
+        def _items():
+            try:
+                for item in result:
+                    yield item
+            except Exception as ex:  # pylint: disable=broad-except
+                # Items already written out can't be taken back, so the failure is only reported
+                if cmd_copy.exception_handler:
+                    cmd_copy.exception_handler(ex)
+                six.reraise(*sys.exc_info())
+
+        def _transform_page(page):
+            event_data = {'result': todict(page, AzCliCommandInvoker.remove_additional_prop_layer)}
+            cmd_copy.cli_ctx.raise_event(EVENT_INVOKER_TRANSFORM_RESULT, event_data=event_data)
+            return event_data['result']
+
+        streaming_result = StreamingResult(_items())
+        streaming_result.add_transform(_transform_page)
+        return streaming_result
+
+    def _run_timed_job(self, expanded_arg, cmd_copy, id_arg):
+        """ Run a single job, retrying it when the service throttles, and log its latency. """
+        start_time = timeit.default_timer()
+        attempt = 1
+        while True:
+            try:
+                result = self._run_job(expanded_arg, cmd_copy)
+                break
+            except (Exception, SystemExit) as ex:  # pylint: disable=broad-except
+                delay = get_throttling_retry_delay(ex, attempt) if attempt <= IDS_THROTTLING_RETRIES else None
+                if delay is None:
+                    logger.debug("'%s' failed in %.3f seconds after %d attempt(s).",
+                                 id_arg, timeit.default_timer() - start_time, attempt)
+                    raise
+                logger.debug("'%s' was throttled, retrying in %.1f seconds (attempt %d).", id_arg, delay, attempt)
+                time.sleep(delay)
+                attempt += 1
+        logger.debug("'%s' completed in %.3f seconds after %d attempt(s).",
+                     id_arg, timeit.default_timer() - start_time, attempt)
+        return result
+
     def _run_jobs_serially(self, jobs, ids):
         results, exceptions = [], []
         for job, id_arg in zip(jobs, ids):
             expanded_arg, cmd_copy = job
             try:
-                results.append(self._run_job(expanded_arg, cmd_copy))
+                if id_arg is None:
+                    results.append(self._run_job(expanded_arg, cmd_copy))
+                else:
+                    results.append(self._run_timed_job(expanded_arg, cmd_copy, id_arg))
             except(Exception, SystemExit) as ex:  # pylint: disable=broad-except
                 exceptions.append((ex, id_arg))
         return results, exceptions
 
-    def _run_jobs_concurrently(self, jobs, ids):
-        from concurrent.futures import ThreadPoolExecutor, as_completed
+    def _run_jobs_concurrently(self, jobs, ids, max_workers=DEFAULT_MAX_CONCURRENT_IDS):
+        from concurrent.futures import ThreadPoolExecutor
+        max_workers = max(1, min(max_workers, len(jobs)))
+        start_time = timeit.default_timer()
         tasks, results, exceptions = [], [], []
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            for expanded_arg, cmd_copy in jobs:
-                tasks.append(executor.submit(self._run_job, expanded_arg, cmd_copy))
-            for index, task in enumerate(as_completed(tasks)):
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for (expanded_arg, cmd_copy), id_arg in zip(jobs, ids):
+                tasks.append(executor.submit(self._run_timed_job, expanded_arg, cmd_copy, id_arg))
+            # Collect in submission order so that results and failures line up with the ids they came from
+            for task, id_arg in zip(tasks, ids):
                 try:
                     results.append(task.result())
                 except (Exception, SystemExit) as ex:  # pylint: disable=broad-except
-                    exceptions.append((ex, ids[index]))
+                    exceptions.append((ex, id_arg))
+        logger.debug("Ran %d jobs with %d workers in %.3f seconds: %d succeeded, %d failed.",
+                     len(jobs), max_workers, timeit.default_timer() - start_time, len(results), len(exceptions))
         return results, exceptions
 
     def resolve_warnings(self, cmd, parsed_args):
@@ -338,6 +338,7 @@ class AzArgumentContext(ArgumentsContext):
         super(AzArgumentContext, self).__init__(command_loader, scope)
         self.scope = scope  # this is called "command" in knack, but that is not an accurate name
         self.group_kwargs = merge_kwargs(kwargs, command_loader.module_kwargs, CLI_PARAM_KWARGS)
+        self._is_applicable = None
 
     def __enter__(self):
         return self
@@ -345,6 +346,19 @@ class AzArgumentContext(ArgumentsContext):
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.is_stale = True
 
+    def _applicable(self):
+        # Resolved once per context: every registration call in a block that doesn't apply to the
+        # command being invoked becomes a cheap no-op.
+        if self._is_applicable is None:
+            if self.command_loader.skip_applicability or not self.scope:
+                self._is_applicable = True
+            else:
+                command_string = self.command_loader.cli_ctx.invocation.data['command_string']
+                # Scopes are whole command words: 'vm' applies to 'vm create' but not to 'vmss create'
+                self._is_applicable = bool(command_string == self.scope or
+                                           command_string.startswith(self.scope + ' '))
+        return self._is_applicable
+
     def _flatten_kwargs(self, kwargs, arg_type):
         merged_kwargs = self._merge_kwargs(kwargs)
         if arg_type:
@@ -476,6 +490,9 @@ class AzArgumentContext(ArgumentsContext):
             super(AzArgumentContext, self).ignore(arg)
 
     def extra(self, dest, arg_type=None, **kwargs):
+        self._check_stale()
+        if not self._applicable():
+            return
 
         merged_kwargs = self._flatten_kwargs(kwargs, arg_type)
         resource_type = merged_kwargs.get('resource_type', None)
@@ -490,10 +507,6 @@ class AzArgumentContext(ArgumentsContext):
             # merged_kwargs.pop('dest', None)
             # super(AzArgumentContext, self).extra(dest, **merged_kwargs)
             from knack.arguments import CLICommandArgument
-            self._check_stale()
-            if not self._applicable():
-                return
-
             if self.command_scope in self.command_loader.command_group_table:
                 raise ValueError("command authoring error: extra argument '{}' cannot be registered to a group-level "
                                  "scope '{}'. It must be registered to a specific command.".format(
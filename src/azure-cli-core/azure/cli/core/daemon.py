@@ -0,0 +1,339 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Opt-in daemon mode for scripted workloads.
+
+A long-lived server process imports and warms up the CLI (command modules, arguments, SDK models, profile code)
+once and listens on a Unix socket in the config dir. For every invocation the server forks a child, which inherits
+the warm interpreter, adopts the client's argv, environment, working directory and stdin/stdout/stderr (passed as
+file descriptors over the socket) and runs the command exactly like `python -m azure.cli` would.
+
+Start the server with `python -m azure.cli.core.daemon` and turn the client on with `use_daemon = true` in the
+[core] section of the CLI config file (or `AZURE_CORE_USE_DAEMON=true`). When no compatible server is listening the
+client silently falls back to running the command in-process. So does a client whose config dir, extension dirs or
+cloud metadata URL differ from the daemon's, and every client once the CLI config file has changed, since those are
+read when the CLI is imported.
+"""
+
+import array
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+
+from knack.log import get_logger
+
+from azure.cli.core import __version__ as core_version
+from azure.cli.core._config import GLOBAL_CONFIG_DIR, GLOBAL_CONFIG_PATH, ENV_VAR_PREFIX
+
+logger = get_logger(__name__)
+
+DAEMON_DIR = os.path.join(GLOBAL_CONFIG_DIR, 'daemon')
+DAEMON_SOCKET_PATH = os.path.join(DAEMON_DIR, 'az.sock')
+
+_HEADER = struct.Struct('!I')
+_STD_FDS = [0, 1, 2]
+
+# Settings read into module level constants (config dir, extension dirs, clouds) when the CLI is imported. Forked
+# children keep the daemon's values, so clients which set them differently run the command in-process instead.
+_IMPORT_TIME_ENV_VARS = ['AZURE_CONFIG_DIR', 'AZURE_EXTENSION_DIR', 'AZURE_EXTENSION_SYS_DIR',
+                         'AZURE_EXTENSION_DEV_SOURCES', 'ARM_CLOUD_METADATA_URL']
+
+
+class DaemonError(Exception):
+    pass
+
+
+def is_daemon_supported():
+    return hasattr(socket, 'AF_UNIX') and hasattr(socket.socket, 'sendmsg') and hasattr(os, 'fork')
+
+
+def use_daemon():
+    """ Whether this invocation should be forwarded to a running daemon. """
+    from knack.completion import ARGCOMPLETE_ENV_NAME
+    from knack.config import CLIConfig
+    if not is_daemon_supported() or ARGCOMPLETE_ENV_NAME in os.environ:
+        # argcomplete talks to the shell over extra file descriptors that aren't forwarded
+        return False
+    config = CLIConfig(config_dir=GLOBAL_CONFIG_DIR, config_env_var_prefix=ENV_VAR_PREFIX)
+    return config.getboolean('core', 'use_daemon', False)
+
+
+def _send_message(sock, payload, fds=None):
+    data = json.dumps(payload).encode('utf-8')
+    buffers = [_HEADER.pack(len(data)) + data]
+    if fds:
+        sock.sendmsg(buffers, [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array('i', fds))])
+    else:
+        sock.sendall(buffers[0])
+
+
+def _recv_exactly(sock, size, fds=None):
+    chunks = []
+    remaining = size
+    while remaining:
+        if fds is not None:
+            max_fds = len(_STD_FDS)
+            chunk, ancdata, _, _ = sock.recvmsg(remaining, socket.CMSG_LEN(max_fds * array.array('i').itemsize))
+            for level, msg_type, msg_data in ancdata:
+                if level == socket.SOL_SOCKET and msg_type == socket.SCM_RIGHTS:
+                    received = array.array('i')
+                    received.frombytes(msg_data[:len(msg_data) - (len(msg_data) % received.itemsize)])
+                    fds.extend(received)
+        else:
+            chunk = sock.recv(remaining)
+        if not chunk:
+            raise DaemonError('Connection closed unexpectedly.')
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def _recv_message(sock, fds=None):
+    size, = _HEADER.unpack(_recv_exactly(sock, _HEADER.size, fds))
+    return json.loads(_recv_exactly(sock, size, fds).decode('utf-8'))
+
+
+def _get_import_time_settings(env):
+    return {name: env.get(name) for name in _IMPORT_TIME_ENV_VARS}
+
+
+def run_client(args, socket_path=None):
+    """ Forward an invocation to the daemon.
+
+    Returns the command's exit code, or None if no compatible daemon is listening and the command should run
+    in-process instead.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(socket_path or DAEMON_SOCKET_PATH)
+            _send_message(sock, {'version': core_version, 'argv': args, 'env': dict(os.environ), 'cwd': os.getcwd()},
+                          fds=_STD_FDS)
+            reply = _recv_message(sock)
+        except (OSError, DaemonError, ValueError):
+            return None
+        if 'error' in reply:
+            return None
+
+        # From here on the command is running in the daemon, so it owns the exit code.
+        pid = reply.get('pid')
+        while True:
+            try:
+                reply = _recv_message(sock)
+                return reply.get('exit_code', 1)
+            except KeyboardInterrupt:
+                # The command runs in another process group, so pass Ctrl+C on and keep waiting for it to stop
+                if pid:
+                    try:
+                        os.kill(pid, signal.SIGINT)
+                    except OSError:
+                        pass
+            except (OSError, DaemonError, ValueError):
+                return 1
+    finally:
+        sock.close()
+
+
+def _invoke_cli(args):
+    """ Run one command the same way azure/cli/__main__.py does and return its exit code. """
+    from knack.completion import ARGCOMPLETE_ENV_NAME
+    from azure.cli.core import get_default_cli
+    import azure.cli.core.telemetry as telemetry
+
+    az_cli = get_default_cli()
+    telemetry.set_application(az_cli, ARGCOMPLETE_ENV_NAME)
+    try:
+        telemetry.start()
+        exit_code = az_cli.invoke(args)
+        if exit_code and exit_code != 0:
+            if az_cli.result.error is not None and not telemetry.has_exceptions():
+                telemetry.set_exception(az_cli.result.error, fault_type='')
+            telemetry.set_failure()
+        else:
+            telemetry.set_success()
+    except KeyboardInterrupt:
+        telemetry.set_user_fault('keyboard interrupt')
+        exit_code = 1
+    except SystemExit as ex:
+        exit_code = ex.code if ex.code is not None else 1
+    finally:
+        telemetry.conclude()
+    return exit_code if isinstance(exit_code, int) else 1
+
+
+class AzDaemon(object):
+
+    def __init__(self, socket_path=None, idle_timeout=0):
+        from azure.cli.core.util import get_file_state
+        self.socket_path = socket_path or DAEMON_SOCKET_PATH
+        self.idle_timeout = idle_timeout
+        self._sock = None
+        # what the modules imported by this process were initialized with
+        self._import_time_settings = _get_import_time_settings(os.environ)
+        self._config_file_state = get_file_state(GLOBAL_CONFIG_PATH)
+
+    @staticmethod
+    def warm_up():
+        """ Import everything an invocation would otherwise import on its own. Forked children inherit it. """
+        import timeit
+        from azure.cli.core import get_default_cli
+        from azure.cli.core.file_util import create_invoker_and_load_cmds_and_args
+        import azure.cli.core._profile  # pylint: disable=unused-variable
+        import azure.cli.core.commands.client_factory  # pylint: disable=unused-variable
+
+        start_time = timeit.default_timer()
+        try:
+            create_invoker_and_load_cmds_and_args(get_default_cli())
+        except Exception:  # pylint: disable=broad-except
+            # Whatever got imported before the failure is still useful
+            logger.warning("Unable to load the entire command table. Use --debug for more information.")
+            logger.debug('Warm up failed.', exc_info=True)
+        logger.info('Loaded the command table in %.3f seconds.', timeit.default_timer() - start_time)
+
+    def _bind(self):
+        socket_dir = os.path.dirname(self.socket_path)
+        if not os.path.isdir(socket_dir):
+            os.makedirs(socket_dir)
+            os.chmod(socket_dir, 0o700)
+
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+            raise DaemonError('A daemon is already listening on {}.'.format(self.socket_path))
+        except (OSError, IOError):
+            pass
+        finally:
+            probe.close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            sock.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        sock.listen(16)
+        return sock
+
+    def serve_forever(self):
+        self._sock = self._bind()
+        # Children are never waited on
+        signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+        if self.idle_timeout:
+            self._sock.settimeout(self.idle_timeout)
+        print('Listening on {}'.format(self.socket_path), file=sys.stderr)
+        try:
+            while True:
+                try:
+                    conn, _ = self._sock.accept()
+                except socket.timeout:
+                    logger.warning('No requests for %s seconds, shutting down.', self.idle_timeout)
+                    return
+                conn.settimeout(None)
+                if os.fork() == 0:
+                    self._sock.close()
+                    self._sock = None
+                    try:
+                        self._handle(conn)
+                    finally:
+                        os._exit(0)  # pylint: disable=protected-access
+                conn.close()
+        finally:
+            self.close()
+
+    def close(self):
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def _handle(self, conn):
+        import logging
+        from azure.cli.core.util import get_file_state
+        fds = []
+        try:
+            request = _recv_message(conn, fds)
+        except (OSError, DaemonError, ValueError):
+            for fd in fds:
+                os.close(fd)
+            return 1
+
+        if request.get('version') != core_version or len(fds) != len(_STD_FDS):
+            for fd in fds:
+                os.close(fd)
+            _send_message(conn, {'error': 'Incompatible client version {}.'.format(request.get('version'))})
+            return 1
+
+        if _get_import_time_settings(request['env']) != self._import_time_settings or \
+                get_file_state(GLOBAL_CONFIG_PATH) != self._config_file_state:
+            for fd in fds:
+                os.close(fd)
+            logger.warning('The client settings differ from those the daemon was started with, the command runs '
+                           'in-process. Restart the daemon after changing the CLI config file.')
+            _send_message(conn, {'error': 'Incompatible client settings.'})
+            return 1
+
+        # Become the client's process: own process group so the client decides what to do with Ctrl+C
+        os.setpgid(0, 0)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        for stream in (sys.stdout, sys.stderr):
+            stream.flush()
+        for target_fd, client_fd in zip(_STD_FDS, fds):
+            os.dup2(client_fd, target_fd)
+            os.close(client_fd)
+        os.chdir(request['cwd'])
+        os.environ.clear()
+        os.environ.update(request['env'])
+        # The daemon's own log handlers must not leak into the command's output
+        logging.getLogger().handlers = []
+
+        _send_message(conn, {'pid': os.getpid()})
+        exit_code = _invoke_cli(request['argv'])
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except (OSError, IOError, ValueError):
+                pass
+        _send_message(conn, {'exit_code': exit_code})
+        return exit_code
+
+
+def main(args=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog='python -m azure.cli.core.daemon',
+                                     description='Serve az invocations from a warm, long-lived process.')
+    parser.add_argument('--socket', default=DAEMON_SOCKET_PATH, help='Path of the Unix socket to listen on.')
+    parser.add_argument('--idle-timeout', type=int, default=0,
+                        help='Shut down after this many seconds without requests. 0 means never.')
+    parser.add_argument('--debug', action='store_true', help='Increase logging verbosity.')
+    parsed = parser.parse_args(args)
+
+    if not is_daemon_supported():
+        print('The az daemon requires Unix domain sockets and fork().', file=sys.stderr)
+        return 1
+
+    import logging
+    logging.basicConfig(level=logging.DEBUG if parsed.debug else logging.WARNING,
+                        format='%(asctime)s %(levelname)s: %(message)s')
+    daemon = AzDaemon(parsed.socket, parsed.idle_timeout)
+    daemon.warm_up()
+    try:
+        daemon.serve_forever()
+    except DaemonError as ex:
+        print(str(ex), file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -26,6 +26,10 @@ EXTENSIONS_SYS_DIR = os.path.expanduser(_CUSTOM_EXT_SYS_DIR) if _CUSTOM_EXT_SYS_
 
 EXTENSIONS_MOD_PREFIX = 'azext_'
 
+EXTENSION_INDEX_FILE = os.path.join(GLOBAL_CONFIG_DIR, 'extensionIndex.json')
+# a directory modified this close to the time the index is built could be modified again without its mtime changing
+EXTENSION_INDEX_MTIME_SLACK = 2  # seconds
+
 AZEXT_METADATA_FILENAME = 'azext_metadata.json'
 
 EXT_METADATA_MINCLICOREVERSION = 'azext.minCliCoreVersion'
@@ -79,6 +83,8 @@ class Extension(object):
         """
         Lazy load metadata.
         Returns the metadata as a dictionary or None if not available.
+        Extensions read from the extension index only carry the metadata kept in the index, use get_metadata()
+        for all of it.
         """
         try:
             self._metadata = self._metadata or self.get_metadata()
@@ -182,6 +188,14 @@ class WheelExtension(Extension):
         """
         Returns all wheel-based extensions.
         """
+        exts = _load_extension_index()
+        if exts is None:
+            exts = WheelExtension._scan_all()
+            _save_extension_index(exts)
+        return exts
+
+    @staticmethod
+    def _scan_all():
         from glob import glob
         exts = []
         if os.path.isdir(EXTENSIONS_DIR):
@@ -270,6 +284,62 @@ class DevExtension(Extension):
 
 EXTENSION_TYPES = [WheelExtension, DevExtension]
 
+_EXTENSION_INDEX_METADATA_KEYS = ['name', 'version', EXT_METADATA_ISPREVIEW, EXT_METADATA_ISEXPERIMENTAL,
+                                  EXT_METADATA_MINCLICOREVERSION, EXT_METADATA_MAXCLICOREVERSION]
+
+
+def _get_dir_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _load_extension_index():
+    """
+    Returns the wheel extensions recorded in the extension index, or None if the index is missing or any of the
+    extension directories has changed since it was written.
+    """
+    try:
+        with open(EXTENSION_INDEX_FILE, 'r') as f:
+            index = json.load(f)
+        if index['dirs'] != [[d, _get_dir_mtime(d)] for d in [EXTENSIONS_DIR, EXTENSIONS_SYS_DIR]]:
+            return None
+        exts = []
+        for entry in index['extensions']:
+            if entry['mtime'] != _get_dir_mtime(entry['path']):
+                return None
+            ext = WheelExtension(entry['name'], entry['path'])
+            ext._metadata = entry['metadata']  # pylint: disable=protected-access
+            exts.append(ext)
+        return exts
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save_extension_index(exts):
+    import time
+    from azure.cli.core.util import write_file_atomically
+    dirs = [[d, _get_dir_mtime(d)] for d in [EXTENSIONS_DIR, EXTENSIONS_SYS_DIR]]
+    entries = [{'name': ext.name, 'path': ext.path, 'mtime': _get_dir_mtime(ext.path),
+                'metadata': {k: v for k, v in (ext.metadata or {}).items() if k in _EXTENSION_INDEX_METADATA_KEYS}}
+               for ext in exts]
+    mtimes = [d[1] for d in dirs] + [e['mtime'] for e in entries]
+    if any(m is not None and m > (time.time() - EXTENSION_INDEX_MTIME_SLACK) * 1e9 for m in mtimes):
+        logger.debug("Not writing the extension index as extensions were modified just now.")
+        return
+    try:
+        write_file_atomically(EXTENSION_INDEX_FILE, json.dumps({'dirs': dirs, 'extensions': entries}))
+    except (OSError, TypeError, ValueError):
+        logger.debug("Unable to save the extension index.", exc_info=True)
+
+
+def invalidate_extension_index():
+    try:
+        os.remove(EXTENSION_INDEX_FILE)
+    except OSError:
+        pass
+
 
 def ext_compat_with_cli(azext_metadata):
     from azure.cli.core import __version__ as core_version
@@ -2,8 +2,14 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
+import hashlib
+import json
+import os
+import time
+
 import requests
 
+from azure.cli.core._config import GLOBAL_CONFIG_DIR
 from knack.log import get_logger
 from knack.util import CLIError
 
@@ -11,6 +17,9 @@ logger = get_logger(__name__)
 
 DEFAULT_INDEX_URL = "https://aka.ms/azure-cli-extension-index-v1"
 
+INDEX_CACHE_DIR = os.path.join(GLOBAL_CONFIG_DIR, 'extensionIndexCache')
+DEFAULT_INDEX_CACHE_TTL = 10  # minutes
+
 ERR_TMPL_EXT_INDEX = 'Unable to get extension index.\n'
 ERR_TMPL_NON_200 = '{}Server returned status code {{}} for {{}}'.format(ERR_TMPL_EXT_INDEX)
 ERR_TMPL_NO_NETWORK = '{}Please ensure you have network connection. Error detail: {{}}'.format(ERR_TMPL_EXT_INDEX)
@@ -20,27 +29,92 @@ ERR_UNABLE_TO_GET_EXTENSIONS = 'Unable to get extensions from index. Improper in
 TRIES = 3
 
 
+class _IndexCache(object):
+    """ The last index downloaded from a url, kept for `[extension] index_cache_ttl` minutes and revalidated with
+    its ETag / Last-Modified after that. """
+
+    def __init__(self, index_url):
+        from azure.cli.core.extension import az_config
+        self.ttl = az_config.getint('extension', 'index_cache_ttl', DEFAULT_INDEX_CACHE_TTL) * 60
+        self.path = os.path.join(INDEX_CACHE_DIR, hashlib.sha256(index_url.encode('utf-8')).hexdigest() + '.json')
+        self.entry = None
+        if self.ttl > 0:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                self.entry = entry if isinstance(entry, dict) and 'index' in entry else None
+            except (OSError, ValueError):
+                pass
+
+    @property
+    def index(self):
+        return self.entry['index'] if self.entry else None
+
+    def is_fresh(self):
+        return bool(self.entry) and time.time() - self.entry.get('refreshed', 0) < self.ttl
+
+    def get_revalidation_headers(self):
+        headers = {}
+        if self.entry and self.entry.get('etag'):
+            headers['If-None-Match'] = self.entry['etag']
+        if self.entry and self.entry.get('lastModified'):
+            headers['If-Modified-Since'] = self.entry['lastModified']
+        return headers
+
+    def save(self, index, response_headers=None):
+        from azure.cli.core.util import write_file_atomically
+        if self.ttl <= 0:
+            return
+        # a revalidated index keeps its validators unless the server sent new ones
+        validators = self.entry if self.entry and index is self.index else {}
+        response_headers = response_headers or {}
+        self.entry = {'refreshed': time.time(),
+                      'etag': response_headers.get('ETag', validators.get('etag')),
+                      'lastModified': response_headers.get('Last-Modified', validators.get('lastModified')),
+                      'index': index}
+        try:
+            os.makedirs(INDEX_CACHE_DIR, exist_ok=True)
+            write_file_atomically(self.path, json.dumps(self.entry))
+        except (OSError, TypeError, ValueError) as ex:
+            logger.debug("Unable to save the extension index to '%s': %s", self.path, ex)
+
+    def fall_back(self, msg):
+        """ Use the cached index when a fresh one can't be downloaded. """
+        if self.entry is None:
+            raise CLIError(msg)
+        logger.warning("%s\nUsing the extension index downloaded at %s.", msg,
+                       time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.entry.get('refreshed', 0))))
+        return self.index
+
+
 # pylint: disable=inconsistent-return-statements
 def get_index(index_url=None):
     from azure.cli.core.util import should_disable_connection_verify
     index_url = index_url or DEFAULT_INDEX_URL
+    cache = _IndexCache(index_url)
+    if cache.is_fresh():
+        logger.debug("Using the cached extension index for %s", index_url)
+        return cache.index
 
     for try_number in range(TRIES):
         try:
-            response = requests.get(index_url, verify=(not should_disable_connection_verify()))
+            response = requests.get(index_url, verify=(not should_disable_connection_verify()),
+                                    headers=cache.get_revalidation_headers())
+            if response.status_code == 304 and cache.index is not None:
+                logger.debug("The cached extension index for %s is up to date", index_url)
+                cache.save(cache.index, response.headers)
+                return cache.index
             if response.status_code == 200:
-                return response.json()
-            msg = ERR_TMPL_NON_200.format(response.status_code, index_url)
-            raise CLIError(msg)
+                index = response.json()
+                cache.save(index, response.headers)
+                return index
+            return cache.fall_back(ERR_TMPL_NON_200.format(response.status_code, index_url))
         except (requests.exceptions.ConnectionError, requests.exceptions.HTTPError) as err:
-            msg = ERR_TMPL_NO_NETWORK.format(str(err))
-            raise CLIError(msg)
+            return cache.fall_back(ERR_TMPL_NO_NETWORK.format(str(err)))
         except ValueError as err:
             # Indicates that url is not redirecting properly to intended index url, we stop retrying after TRIES calls
             if try_number == TRIES - 1:
-                msg = ERR_TMPL_BAD_JSON.format(str(err))
-                raise CLIError(msg)
-            import time
+                return cache.fall_back(ERR_TMPL_BAD_JSON.format(str(err)))
             time.sleep(0.5)
             continue
 
@@ -18,9 +18,10 @@ from six.moves.urllib.parse import urlparse  # pylint: disable=import-error
 import requests
 from pkg_resources import parse_version
 
+from azure.cli.core import CommandIndex
 from azure.cli.core.util import CLIError, reload_module
 from azure.cli.core.extension import (extension_exists, build_extension_path, get_extensions, get_extension_modname,
-                                      get_extension, ext_compat_with_cli,
+                                      get_extension, ext_compat_with_cli, invalidate_extension_index,
                                       EXT_METADATA_ISPREVIEW, EXT_METADATA_ISEXPERIMENTAL,
                                       WheelExtension, DevExtension, ExtensionNotInstalledException, WHEEL_INFO_RE)
 from azure.cli.core.telemetry import set_extension_management_detail
@@ -236,6 +237,8 @@ def add_extension(cmd, source=None, extension_name=None, index_url=None, yes=Non
             logger.warning("The installed extension '%s' is in preview.", extension_name)
     except ExtensionNotInstalledException:
         pass
+    CommandIndex().invalidate()
+    invalidate_extension_index()
 
 
 def remove_extension(extension_name):
@@ -253,6 +256,8 @@ def remove_extension(extension_name):
         # We call this just before we remove the extension so we can get the metadata before it is gone
         _augment_telemetry_with_ext_info(extension_name, ext)
         shutil.rmtree(ext.path, onerror=log_err)
+        CommandIndex().invalidate()
+        invalidate_extension_index()
     except ExtensionNotInstalledException as e:
         raise CLIError(e)
 
@@ -269,7 +274,7 @@ def show_extension(extension_name):
         return {OUT_KEY_NAME: extension.name,
                 OUT_KEY_VERSION: extension.version,
                 OUT_KEY_TYPE: extension.ext_type,
-                OUT_KEY_METADATA: extension.metadata,
+                OUT_KEY_METADATA: extension.get_metadata(),
                 OUT_KEY_PATH: extension.path}
     except ExtensionNotInstalledException as e:
         raise CLIError(e)
@@ -299,6 +304,8 @@ def update_extension(cmd, extension_name, index_url=None, pip_extra_index_urls=N
             shutil.rmtree(backup_dir)
             # This gets the metadata for the extension *after* the update
             _augment_telemetry_with_ext_info(extension_name)
+            CommandIndex().invalidate()
+            invalidate_extension_index()
         except Exception as err:
             logger.error('An error occurred whilst updating.')
             logger.error(err)
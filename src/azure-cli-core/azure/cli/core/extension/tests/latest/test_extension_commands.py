@@ -42,8 +42,11 @@ class TestExtensionCommands(unittest.TestCase):
     def setUp(self):
         self.ext_dir = tempfile.mkdtemp()
         self.ext_sys_dir = tempfile.mkdtemp()
+        self.config_dir = tempfile.mkdtemp()
         self.patchers = [mock.patch('azure.cli.core.extension.EXTENSIONS_DIR', self.ext_dir),
-                         mock.patch('azure.cli.core.extension.EXTENSIONS_SYS_DIR', self.ext_sys_dir)]
+                         mock.patch('azure.cli.core.extension.EXTENSIONS_SYS_DIR', self.ext_sys_dir),
+                         mock.patch('azure.cli.core.extension.EXTENSION_INDEX_FILE',
+                                    os.path.join(self.config_dir, 'extensionIndex.json'))]
         for patcher in self.patchers:
             patcher.start()
         self.cmd = self._setup_cmd()
@@ -53,6 +56,7 @@ class TestExtensionCommands(unittest.TestCase):
             patcher.stop()
         shutil.rmtree(self.ext_dir, ignore_errors=True)
         shutil.rmtree(self.ext_sys_dir, ignore_errors=True)
+        shutil.rmtree(self.config_dir, ignore_errors=True)
 
     def test_no_extensions_dir(self):
         shutil.rmtree(self.ext_dir)
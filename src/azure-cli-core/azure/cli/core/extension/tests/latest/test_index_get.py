@@ -3,6 +3,9 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 import os
+import shutil
+import tempfile
+import time
 import mock
 import unittest
 from requests.exceptions import ConnectionError, HTTPError
@@ -13,9 +16,10 @@ from azure.cli.core.extension._index import (get_index, get_index_extensions, DE
 
 
 class MockResponse(object):
-    def __init__(self, status_code, data):
+    def __init__(self, status_code, data, headers=None):
         self.status_code = status_code
         self.data = data
+        self.headers = headers or {}
 
     def json(self):
         if isinstance(self.data, Exception):
@@ -24,7 +28,7 @@ class MockResponse(object):
 
 
 def mock_index_get_generator(index_url, index_data):
-    def mock_req_get(url, verify):
+    def mock_req_get(url, verify, headers=None):  # pylint: disable=unused-argument
         if url == index_url:
             return MockResponse(200, index_data)
         return MockResponse(404, None)
@@ -33,10 +37,69 @@ def mock_index_get_generator(index_url, index_data):
 
 class TestExtensionIndexGet(unittest.TestCase):
 
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        # the index is downloaded on every call unless a test turns the cache on
+        self.patchers = [mock.patch('azure.cli.core.extension._index.INDEX_CACHE_DIR', self.cache_dir),
+                         mock.patch('azure.cli.core.extension._index.DEFAULT_INDEX_CACHE_TTL', 0)]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _enable_cache(self):
+        patcher = mock.patch('azure.cli.core.extension._index.DEFAULT_INDEX_CACHE_TTL', 10)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _get_index_later(days):
+        with mock.patch('time.time', return_value=time.time() + days * 24 * 3600):
+            return get_index()
+
     def test_get_index(self):
         with mock.patch('requests.get', side_effect=mock_index_get_generator(DEFAULT_INDEX_URL, {})):
             self.assertEqual(get_index(), {})
 
+    def test_get_index_cached(self):
+        self._enable_cache()
+        data = {'extensions': {'myext': []}}
+        with mock.patch('requests.get', side_effect=mock_index_get_generator(DEFAULT_INDEX_URL, data)) as req_get:
+            self.assertEqual(get_index(), data)
+            # the index isn't downloaded again while it's fresh
+            self.assertEqual(get_index(), data)
+            self.assertEqual(req_get.call_count, 1)
+
+    def test_get_index_revalidated(self):
+        self._enable_cache()
+        data = {'extensions': {'myext': []}}
+        response = MockResponse(200, data, headers={'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jun 2020 00:00:00 GMT'})
+        with mock.patch('requests.get', return_value=response):
+            get_index()
+
+        with mock.patch('requests.get', return_value=MockResponse(304, None)) as req_get:
+            self.assertEqual(self._get_index_later(days=1), data)
+        self.assertEqual(req_get.call_args[1]['headers'], {'If-None-Match': '"v1"',
+                                                          'If-Modified-Since': 'Mon, 01 Jun 2020 00:00:00 GMT'})
+
+        # the cached index is used when there is no network
+        with mock.patch('requests.get', side_effect=ConnectionError('no network')), \
+                mock.patch('azure.cli.core.extension._index.logger.warning', autospec=True) as logger_mock:
+            self.assertEqual(self._get_index_later(days=2), data)
+            logger_mock.assert_called_once()
+
+    def test_get_index_cache_disabled(self):
+        self._enable_cache()
+        with mock.patch('azure.cli.core.extension.az_config.getint', return_value=0), \
+                mock.patch('requests.get', side_effect=mock_index_get_generator(DEFAULT_INDEX_URL, {})) as req_get:
+            get_index()
+            get_index()
+            self.assertEqual(req_get.call_count, 2)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
     def test_get_index_404(self):
         bad_index_url = 'http://contoso.com/cli-index'
         with mock.patch('requests.get', side_effect=mock_index_get_generator(DEFAULT_INDEX_URL, {})):
@@ -9,7 +9,8 @@ import mock
 import unittest
 from collections import namedtuple
 
-from azure.cli.core import AzCommandsLoader, MainCommandsLoader
+from azure.cli.core import AzCommandsLoader, MainCommandsLoader, CommandIndex
+from azure.cli.core._session import Session
 from azure.cli.core.commands import ExtensionCommandSource
 from azure.cli.core.extension import EXTENSIONS_MOD_PREFIX
 from azure.cli.core.mock import DummyCli
@@ -152,9 +153,9 @@ class TestCommandRegistration(unittest.TestCase):
         return ext_name
 
     def _mock_get_extensions():
-        MockExtension = namedtuple('Extension', ['name', 'preview', 'experimental', 'path', 'get_metadata'])
-        return [MockExtension(name=__name__ + '.ExtCommandsLoader', preview=False, experimental=False, path=None, get_metadata=lambda: {}),
-                MockExtension(name=__name__ + '.Ext2CommandsLoader', preview=False, experimental=False, path=None, get_metadata=lambda: {})]
+        MockExtension = namedtuple('Extension', ['name', 'preview', 'experimental', 'path', 'metadata'])
+        return [MockExtension(name=__name__ + '.ExtCommandsLoader', preview=False, experimental=False, path=None, metadata={}),
+                MockExtension(name=__name__ + '.Ext2CommandsLoader', preview=False, experimental=False, path=None, metadata={})]
 
     def _mock_load_command_loader(loader, args, name, prefix):
 
@@ -297,6 +298,33 @@ class TestCommandRegistration(unittest.TestCase):
             self.assertDictContainsSubset(some_expected_arguments[existing].settings,
                                           command_metadata.arguments[existing].options)
 
+    def test_argument_context_applicability(self):
+        from azure.cli.core.commands.parameters import AzArgumentContext
+
+        cli = DummyCli()
+        loader = AzCommandsLoader(cli)
+        loader.cli_ctx.invocation = mock.MagicMock()
+        loader.cli_ctx.invocation.data = {'command_string': 'vm create'}
+
+        def _applicable(scope):
+            with AzArgumentContext(loader, scope) as c:
+                return c._applicable()
+
+        self.assertTrue(_applicable(''))
+        self.assertTrue(_applicable('vm'))
+        self.assertTrue(_applicable('vm create'))
+        self.assertFalse(_applicable('vmss'))
+        self.assertFalse(_applicable('vm create-x'))
+        self.assertFalse(_applicable('network'))
+
+        # extra arguments outside of the command scope are skipped before any work is done
+        with AzArgumentContext(loader, 'vmss create') as c:
+            c.extra('added_param', options_list=['--added-param'])
+        self.assertNotIn('added_param', loader.extra_argument_registry['vmss create'])
+
+        loader.skip_applicability = True
+        self.assertTrue(_applicable('vmss'))
+
     def test_command_build_argument_help_text(self):
 
         def sample_sdk_method_with_weird_docstring(param_a, param_b, param_c):  # pylint: disable=unused-argument
@@ -416,5 +444,105 @@ class TestCommandRegistration(unittest.TestCase):
         self.assertFalse('help' in cmd_arg.options)
 
 
+class TestCommandIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index_session = Session()
+        patcher = mock.patch('azure.cli.core._session.INDEX', self.index_session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cli = DummyCli()
+
+    @staticmethod
+    def _mock_command_table():
+        MockCommand = namedtuple('Command', ['command_source'])
+        return {
+            'vm create': MockCommand('vm'),
+            'vm list': MockCommand('vm'),
+            'vm image list': MockCommand('vm'),
+            'vm repair run': MockCommand(ExtensionCommandSource(extension_name='vm-repair')),
+            'network vnet list': MockCommand('network'),
+            'network nat gateway list': MockCommand('natgateway')
+        }
+
+    @mock.patch('azure.cli.core.extension.get_extension_names', return_value=['vm-repair'])
+    def test_command_index_get(self, _):
+        command_index = CommandIndex(self.cli)
+        command_index.update(self._mock_command_table())
+
+        modules, extensions = command_index.get(['vm', 'create', '--name', 'foo'])
+        self.assertEqual(modules, ['vm'])
+        self.assertEqual(extensions, ['vm-repair'])
+
+        modules, extensions = command_index.get(['network', 'vnet', 'list'])
+        self.assertEqual(sorted(modules), ['natgateway', 'network'])
+        self.assertEqual(extensions, [])
+
+        self.assertIsNone(command_index.get(['storage', 'account', 'list']))
+        self.assertIsNone(command_index.get([]))
+        self.assertIsNone(command_index.get(['--version']))
+
+    def test_command_index_invalidated(self):
+        command_index = CommandIndex(self.cli)
+        with mock.patch('azure.cli.core.extension.get_extension_names', return_value=['vm-repair']):
+            command_index.update(self._mock_command_table())
+
+        # a different set of installed extensions misses the index
+        with mock.patch('azure.cli.core.extension.get_extension_names', return_value=[]):
+            self.assertIsNone(command_index.get(['vm', 'list']))
+
+        with mock.patch('azure.cli.core.extension.get_extension_names', return_value=['vm-repair']):
+            self.assertIsNotNone(command_index.get(['vm', 'list']))
+
+            # a different CLI core version misses the index
+            command_index.version = '0.0.1'
+            self.assertIsNone(command_index.get(['vm', 'list']))
+
+            command_index = CommandIndex(self.cli)
+            command_index.invalidate()
+            self.assertIsNone(command_index.get(['vm', 'list']))
+
+    def test_command_index_resolves(self):
+        command_table = self._mock_command_table()
+        group_table = {'vm': None, 'vm image': None}
+        self.assertTrue(CommandIndex.resolves(['vm', 'create', '-n', 'foo'], command_table, group_table))
+        self.assertTrue(CommandIndex.resolves(['vm', 'image', '-h'], command_table, group_table))
+        self.assertTrue(CommandIndex.resolves(['vm', 'list', 'extra-positional'], command_table, group_table))
+        self.assertFalse(CommandIndex.resolves(['storage', 'account', 'list'], command_table, group_table))
+
+    @mock.patch('azure.cli.core.extension.get_extension_names', return_value=[])
+    @mock.patch('azure.cli.core.extension.get_extensions', return_value=[])
+    def test_load_command_table_from_index(self, *_):
+
+        def _mock_load_module_command_loader(loader, args, mod):
+            loaded.append(mod)
+            command_loader = AzCommandsLoader(cli_ctx=loader.cli_ctx)
+            with command_loader.command_group(mod, operations_tmpl='{}#TestCommandRegistration.{{}}'.format(__name__)) as g:
+                g.command('show', 'sample_vm_get')
+            loader.loaders.append(command_loader)
+            return command_loader.command_table, command_loader.command_group_table
+
+        def _mock_iter_modules(_):
+            return [(None, 'hello', None), (None, 'goodbye', None)]
+
+        loaded = []
+        with mock.patch('azure.cli.core.commands._load_module_command_loader', _mock_load_module_command_loader), \
+                mock.patch('pkgutil.iter_modules', _mock_iter_modules):
+            # first invocation builds the index from a full load
+            MainCommandsLoader(self.cli).load_command_table(['hello', 'show'])
+            self.assertEqual(loaded, ['hello', 'goodbye'])
+
+            # subsequent invocations only import the owning module
+            loaded[:] = []
+            cmd_tbl = MainCommandsLoader(self.cli).load_command_table(['goodbye', 'show'])
+            self.assertEqual(loaded, ['goodbye'])
+            self.assertEqual(list(cmd_tbl), ['goodbye show'])
+
+            # an unknown command falls back to loading everything
+            loaded[:] = []
+            MainCommandsLoader(self.cli).load_command_table(['unknown', 'show'])
+            self.assertEqual(loaded, ['hello', 'goodbye'])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,131 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import time
+import unittest
+
+import mock
+
+from azure.cli.core import daemon
+
+
+def _fake_invoke_cli(args):
+    # runs in the child forked for the client, with the client's stdin and stdout
+    os.write(1, json.dumps({'argv': args, 'cwd': os.getcwd(), 'env': os.environ.get('AZ_DAEMON_TEST'),
+                            'stdin': os.read(0, 100).decode()}).encode())
+    return 3
+
+
+@unittest.skipUnless(daemon.is_daemon_supported(), 'Requires Unix domain sockets')
+class TestDaemon(unittest.TestCase):
+
+    def test_message_round_trip_with_fds(self):
+        server, client = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        read_fd, write_fd = os.pipe()
+        try:
+            daemon._send_message(client, {'argv': ['vm', 'list'], 'cwd': '/tmp'}, fds=[read_fd, write_fd, write_fd])
+            fds = []
+            message = daemon._recv_message(server, fds)
+            self.assertEqual(message, {'argv': ['vm', 'list'], 'cwd': '/tmp'})
+            self.assertEqual(len(fds), 3)
+
+            # the received descriptors refer to the same pipe
+            os.write(fds[1], b'hello')
+            self.assertEqual(os.read(read_fd, 5), b'hello')
+            for fd in fds:
+                os.close(fd)
+
+            daemon._send_message(server, {'exit_code': 3})
+            self.assertEqual(daemon._recv_message(client), {'exit_code': 3})
+        finally:
+            for fd in (read_fd, write_fd):
+                os.close(fd)
+            server.close()
+            client.close()
+
+    def test_run_client_without_daemon(self):
+        socket_path = os.path.join(tempfile.mkdtemp(), 'az.sock')
+        self.assertIsNone(daemon.run_client(['version'], socket_path=socket_path))
+
+    def _start_daemon(self, socket_path):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                with mock.patch('azure.cli.core.daemon._invoke_cli', _fake_invoke_cli):
+                    daemon.AzDaemon(socket_path, idle_timeout=60).serve_forever()
+            finally:
+                os._exit(0)  # pylint: disable=protected-access
+
+        def _stop():
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+        self.addCleanup(_stop)
+        for _ in range(100):
+            if os.path.exists(socket_path):
+                return
+            time.sleep(0.05)
+        self.fail('The daemon did not start.')
+
+    def _run_client(self, args, socket_path, stdin):
+        # the client passes its own stdin, stdout and stderr to the daemon
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        stdin_path, stdout_path = os.path.join(temp_dir, 'stdin'), os.path.join(temp_dir, 'stdout')
+        with open(stdin_path, 'w') as f:
+            f.write(stdin)
+        saved_fds = [os.dup(0), os.dup(1)]
+        cwd = os.getcwd()
+        try:
+            stdin_fd = os.open(stdin_path, os.O_RDONLY)
+            stdout_fd = os.open(stdout_path, os.O_WRONLY | os.O_CREAT)
+            os.dup2(stdin_fd, 0)
+            os.dup2(stdout_fd, 1)
+            os.close(stdin_fd)
+            os.close(stdout_fd)
+            os.chdir(temp_dir)
+            exit_code = daemon.run_client(args, socket_path=socket_path)
+        finally:
+            os.chdir(cwd)
+            for target_fd, saved_fd in enumerate(saved_fds):
+                os.dup2(saved_fd, target_fd)
+                os.close(saved_fd)
+        with open(stdout_path) as f:
+            output = f.read()
+        return exit_code, json.loads(output) if output else None, os.path.realpath(temp_dir)
+
+    def test_daemon_serves_invocation(self):
+        socket_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, socket_dir)
+        socket_path = os.path.join(socket_dir, 'az.sock')
+        with mock.patch.dict(os.environ, {'AZ_DAEMON_TEST': 'daemon'}):
+            self._start_daemon(socket_path)
+
+        with mock.patch.dict(os.environ, {'AZ_DAEMON_TEST': 'client'}):
+            exit_code, output, cwd = self._run_client(['vm', 'list'], socket_path, 'input')
+        self.assertEqual(exit_code, 3)
+        self.assertEqual(output, {'argv': ['vm', 'list'], 'cwd': cwd, 'env': 'client', 'stdin': 'input'})
+
+        # settings read when the CLI is imported can't change in the daemon, the client runs the command itself
+        with mock.patch.dict(os.environ, {'AZURE_EXTENSION_DIR': socket_dir}):
+            exit_code, output, _ = self._run_client(['vm', 'list'], socket_path, 'input')
+        self.assertIsNone(exit_code)
+        self.assertIsNone(output)
+
+    def test_recv_on_closed_connection(self):
+        server, client = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.close()
+        with self.assertRaises(daemon.DaemonError):
+            daemon._recv_message(server)
+        server.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,7 @@
 # --------------------------------------------------------------------------------------------
 import os
 import tempfile
+import time
 import unittest
 import shutil
 import zipfile
@@ -55,8 +56,11 @@ class TestExtensionsBase(unittest.TestCase):
     def setUp(self):
         self.ext_dir = tempfile.mkdtemp()
         self.ext_sys_dir = tempfile.mkdtemp()
+        self.config_dir = tempfile.mkdtemp()
         self.patchers = [mock.patch('azure.cli.core.extension.EXTENSIONS_DIR', self.ext_dir),
-                         mock.patch('azure.cli.core.extension.EXTENSIONS_SYS_DIR', self.ext_sys_dir)]
+                         mock.patch('azure.cli.core.extension.EXTENSIONS_SYS_DIR', self.ext_sys_dir),
+                         mock.patch('azure.cli.core.extension.EXTENSION_INDEX_FILE',
+                                    os.path.join(self.config_dir, 'extensionIndex.json'))]
         for patcher in self.patchers:
             patcher.start()
 
@@ -65,6 +69,7 @@ class TestExtensionsBase(unittest.TestCase):
             patcher.stop()
         shutil.rmtree(self.ext_dir, ignore_errors=True)
         shutil.rmtree(self.ext_sys_dir, ignore_errors=True)
+        shutil.rmtree(self.config_dir, ignore_errors=True)
 
 
 class TestExtensions(TestExtensionsBase):
@@ -251,6 +256,25 @@ class TestWheelExtension(TestExtensionsBase):
         # We check that we can retrieve any one of the az extension metadata values
         self.assertTrue(ext.metadata.get(EXT_METADATA_MINCLICOREVERSION))
 
+    def test_wheel_extension_index(self):
+        _install_test_extension2()
+        past = time.time() - 60
+        for path in [self.ext_dir, self.ext_sys_dir, os.path.join(self.ext_dir, EXT_NAME)]:
+            os.utime(path, (past, past))
+        exts = WheelExtension.get_all()
+        self.assertEqual(len(exts), 1)
+        self.assertTrue(os.path.isfile(os.path.join(self.config_dir, 'extensionIndex.json')))
+
+        # the extensions are read from the index while their directories are unchanged
+        with mock.patch('pkginfo.Wheel') as wheel_metadata:
+            ext = get_extension(EXT_NAME)
+            self.assertEqual(ext.version, exts[0].version)
+            self.assertTrue(ext.metadata.get(EXT_METADATA_MINCLICOREVERSION))
+            wheel_metadata.assert_not_called()
+
+        _install_test_extension3()
+        self.assertEqual(sorted(get_extension_names()), sorted([EXT_NAME, SECOND_EXT_NAME]))
+
 
 class TestWheelSystemExtension(TestExtensionsBase):
 
@@ -0,0 +1,94 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import mock
+from knack.help_files import helps
+
+from azure.cli.core._help_store import HelpStore
+from azure.cli.core.mock import DummyCli
+
+HELP_PY = '''
+from knack.help_files import helps
+
+helps['store'] = """
+type: group
+short-summary: {}
+"""
+
+helps['store alpha'] = """
+type: command
+short-summary: Alpha command.
+"""
+'''
+
+
+class TestHelpStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cli_ctx = DummyCli()
+        self.cli_ctx.config.config_dir = os.path.join(self.temp_dir, 'config')
+        os.makedirs(os.path.join(self.temp_dir, 'helpstoremod'))
+        with open(os.path.join(self.temp_dir, 'helpstoremod', '__init__.py'), 'w'):
+            pass
+        self._write_help('Store group.')
+        sys.path.insert(0, self.temp_dir)
+
+    def tearDown(self):
+        sys.path.remove(self.temp_dir)
+        for name in ['helpstoremod', 'helpstoremod._help']:
+            sys.modules.pop(name, None)
+        for key in ['store', 'store alpha']:
+            helps.pop(key, None)
+        shutil.rmtree(self.temp_dir)
+
+    def _write_help(self, summary):
+        with open(os.path.join(self.temp_dir, 'helpstoremod', '_help.py'), 'w') as f:
+            f.write(HELP_PY.format(summary))
+
+    def _reset(self):
+        # as in a new process
+        sys.modules.pop('helpstoremod._help', None)
+        for key in ['store', 'store alpha']:
+            helps.pop(key, None)
+
+    def test_help_store(self):
+        store = HelpStore(self.cli_ctx)
+        store.load_modules(['helpstoremod', 'helpstoremod.missing'])
+        self.assertEqual(store.get('store'), {'type': 'group', 'short-summary': 'Store group.'})
+        self.assertEqual(store.get('store alpha')['short-summary'], 'Alpha command.')
+        self.assertIsNone(store.get('store beta'))
+
+        # the module isn't imported again once its help is stored
+        self._reset()
+        store = HelpStore(self.cli_ctx)
+        with mock.patch('importlib.import_module') as import_module:
+            store.load_modules(['helpstoremod'])
+            import_module.assert_not_called()
+        self.assertEqual(store.get('store alpha')['short-summary'], 'Alpha command.')
+
+        # entries in helps take precedence
+        helps['store alpha'] = 'short-summary: Overridden.'
+        self.assertEqual(store.get('store alpha')['short-summary'], 'Overridden.')
+        entries = store.get_all()
+        self.assertEqual(entries['store'], {'type': 'group', 'short-summary': 'Store group.'})
+        self.assertEqual(entries['store alpha'], {'short-summary': 'Overridden.'})
+
+        # the store is rebuilt once the help changes
+        self._reset()
+        self._write_help('Updated store group.')
+        store = HelpStore(self.cli_ctx)
+        store.load_modules(['helpstoremod'])
+        self.assertEqual(store.get('store')['short-summary'], 'Updated store group.')
+
+
+if __name__ == '__main__':
+    unittest.main()
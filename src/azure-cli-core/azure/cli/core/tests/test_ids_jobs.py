@@ -0,0 +1,74 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import time
+import unittest
+
+import mock
+
+from azure.cli.core.commands import AzCliCommandInvoker
+from azure.cli.core.util import get_throttling_retry_delay
+
+
+class _ThrottledError(Exception):
+
+    def __init__(self, retry_after=None):
+        super(_ThrottledError, self).__init__('Too many requests')
+        self.response = mock.MagicMock(status_code=429, headers={'Retry-After': retry_after} if retry_after else {})
+
+
+class TestIdsJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.invoker = AzCliCommandInvoker.__new__(AzCliCommandInvoker)
+
+    def test_concurrent_jobs_keep_input_order(self):
+        ids = ['/subscriptions/sub/resourceGroups/rg/providers/p/t/r{}'.format(i) for i in range(8)]
+        jobs = [(i, None) for i in range(8)]
+
+        def _run_job(index, _):
+            # finish in reverse order of submission
+            time.sleep((8 - index) * 0.01)
+            if index in (2, 5):
+                raise ValueError('failed {}'.format(index))
+            return index
+
+        with mock.patch.object(self.invoker, '_run_job', side_effect=_run_job):
+            results, exceptions = self.invoker._run_jobs_concurrently(jobs, ids, max_workers=4)
+
+        self.assertEqual(results, [0, 1, 3, 4, 6, 7])
+        self.assertEqual([(str(ex), id_arg) for ex, id_arg in exceptions],
+                         [('failed 2', ids[2]), ('failed 5', ids[5])])
+
+    @mock.patch('time.sleep')
+    def test_throttled_jobs_are_retried(self, sleep):
+        run_job = mock.MagicMock(side_effect=[_ThrottledError(retry_after='3'), _ThrottledError(), 'done'])
+        with mock.patch.object(self.invoker, '_run_job', run_job):
+            results, exceptions = self.invoker._run_jobs_serially([(None, None)], ['id1'])
+
+        self.assertEqual(results, ['done'])
+        self.assertEqual(exceptions, [])
+        self.assertEqual(run_job.call_count, 3)
+        self.assertEqual([c[0][0] for c in sleep.call_args_list], [3.0, 4])
+
+    @mock.patch('time.sleep')
+    def test_non_throttled_failures_are_not_retried(self, _):
+        run_job = mock.MagicMock(side_effect=ValueError('bad request'))
+        with mock.patch.object(self.invoker, '_run_job', run_job):
+            results, exceptions = self.invoker._run_jobs_serially([(None, None)], ['id1'])
+
+        self.assertEqual(results, [])
+        self.assertEqual(len(exceptions), 1)
+        self.assertEqual(run_job.call_count, 1)
+
+    def test_throttling_retry_delay(self):
+        self.assertIsNone(get_throttling_retry_delay(ValueError(), 1))
+        self.assertEqual(get_throttling_retry_delay(_ThrottledError(retry_after='7'), 1), 7.0)
+        self.assertEqual(get_throttling_retry_delay(_ThrottledError(), 3), 8)
+        self.assertEqual(get_throttling_retry_delay(_ThrottledError(retry_after='3600'), 1), 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
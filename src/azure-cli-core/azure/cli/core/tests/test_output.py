@@ -41,6 +41,40 @@ class TestCoreCLIOutput(unittest.TestCase):
         yaml_output = output_producer.get_formatter('yaml')(CommandResultItem(result=OrderedDict(account_dict)))
         self.assertEqual(account_dict, yaml.safe_load(yaml_output))
 
+    def test_streaming_output_matches_regular_output(self):
+        from azure.cli.core._output import AzOutputProducer, StreamingResult
+        from azure.cli.core.mock import DummyCli
+        from knack.util import CommandResultItem
+        from six import StringIO
+
+        items = [{'name': 'vm{}'.format(i), 'tags': {'env': 'dev', 'owner': u'\u00e9'}, 'zones': [str(i)]}
+                 for i in range(7)]
+        output_producer = AzOutputProducer(DummyCli())
+        for output_type in ['json', 'tsv', 'table', 'yaml', 'none']:
+            for result in [items, []]:
+                formatter = output_producer.get_formatter(output_type)
+                expected = StringIO()
+                output_producer.out(CommandResultItem(result), formatter=formatter, out_file=expected)
+                streamed = StringIO()
+                output_producer.out(CommandResultItem(StreamingResult(iter(result), page_size=3)),
+                                    formatter=formatter, out_file=streamed)
+                self.assertEqual(expected.getvalue(), streamed.getvalue())
+
+    def test_streaming_query(self):
+        import jmespath
+        from azure.cli.core._output import StreamingResult, is_streamable_query
+
+        for query in ['[].name', '[*].name', "[?name=='vm3']", '[]', '[*].{n:name, t:tags.env}']:
+            self.assertTrue(is_streamable_query(jmespath.compile(query)), query)
+        for query in ['[0]', 'length(@)', '[].name | [0]', '@', 'sort_by(@, &name)', '[-1].name']:
+            self.assertFalse(is_streamable_query(jmespath.compile(query)), query)
+
+        items = [{'name': 'vm{}'.format(i)} for i in range(5)]
+        expression = jmespath.compile("[?name!='vm1'].name")
+        result = StreamingResult(iter(items), page_size=2)
+        result.add_transform(expression.search)
+        self.assertEqual(list(result.pages()), [['vm0'], ['vm2', 'vm3'], ['vm4']])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -7,6 +7,7 @@
 import json
 import os
 import sys
+import time
 import unittest
 import mock
 import re
@@ -1598,9 +1599,8 @@ class TestProfile(unittest.TestCase):
         self.assertEqual(creds_cache.retrieve_secret_of_service_principal(test_sp['servicePrincipalId']), None)
 
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
-    @mock.patch('os.fdopen', autospec=True)
-    @mock.patch('os.open', autospec=True)
-    def test_credscache_add_new_sp_creds(self, _, mock_open_for_write, mock_read_file):
+    @mock.patch('azure.cli.core.util.write_file_atomically', autospec=True)
+    def test_credscache_add_new_sp_creds(self, mock_write, mock_read_file):
         cli = DummyCli()
         test_sp = {
             "servicePrincipalId": "myapp",
@@ -1612,7 +1612,6 @@ class TestProfile(unittest.TestCase):
             "servicePrincipalTenant": "mytenant2",
             "accessToken": "Secret2"
         }
-        mock_open_for_write.return_value = FileHandleStub()
         mock_read_file.return_value = [self.token_entry1, test_sp]
         creds_cache = CredsCache(cli, async_persist=False)
 
@@ -1623,19 +1622,17 @@ class TestProfile(unittest.TestCase):
         token_entries = [e for _, e in creds_cache.adal_token_cache.read_items()]  # noqa: F812
         self.assertEqual(token_entries, [self.token_entry1])
         self.assertEqual(creds_cache._service_principal_creds, [test_sp, test_sp2])
-        mock_open_for_write.assert_called_with(mock.ANY, 'w+')
+        mock_write.assert_called_with(creds_cache._token_file, mock.ANY)
 
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
-    @mock.patch('os.fdopen', autospec=True)
-    @mock.patch('os.open', autospec=True)
-    def test_credscache_add_preexisting_sp_creds(self, _, mock_open_for_write, mock_read_file):
+    @mock.patch('azure.cli.core.util.write_file_atomically', autospec=True)
+    def test_credscache_add_preexisting_sp_creds(self, mock_write, mock_read_file):
         cli = DummyCli()
         test_sp = {
             "servicePrincipalId": "myapp",
             "servicePrincipalTenant": "mytenant",
             "accessToken": "Secret"
         }
-        mock_open_for_write.return_value = FileHandleStub()
         mock_read_file.return_value = [test_sp]
         creds_cache = CredsCache(cli, async_persist=False)
 
@@ -1644,19 +1641,17 @@ class TestProfile(unittest.TestCase):
 
         # assert
         self.assertEqual(creds_cache._service_principal_creds, [test_sp])
-        self.assertFalse(mock_open_for_write.called)
+        self.assertFalse(mock_write.called)
 
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
-    @mock.patch('os.fdopen', autospec=True)
-    @mock.patch('os.open', autospec=True)
-    def test_credscache_add_preexisting_sp_new_secret(self, _, mock_open_for_write, mock_read_file):
+    @mock.patch('azure.cli.core.util.write_file_atomically', autospec=True)
+    def test_credscache_add_preexisting_sp_new_secret(self, mock_write, mock_read_file):
         cli = DummyCli()
         test_sp = {
             "servicePrincipalId": "myapp",
             "servicePrincipalTenant": "mytenant",
             "accessToken": "Secret"
         }
-        mock_open_for_write.return_value = FileHandleStub()
         mock_read_file.return_value = [test_sp]
         creds_cache = CredsCache(cli, async_persist=False)
 
@@ -1667,19 +1662,17 @@ class TestProfile(unittest.TestCase):
 
         # assert
         self.assertEqual(creds_cache._service_principal_creds, [new_creds])
-        self.assertTrue(mock_open_for_write.called)
+        self.assertTrue(mock_write.called)
 
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
-    @mock.patch('os.fdopen', autospec=True)
-    @mock.patch('os.open', autospec=True)
-    def test_credscache_match_service_principal_correctly(self, _, mock_open_for_write, mock_read_file):
+    @mock.patch('azure.cli.core.util.write_file_atomically', autospec=True)
+    def test_credscache_match_service_principal_correctly(self, mock_write, mock_read_file):
         cli = DummyCli()
         test_sp = {
             "servicePrincipalId": "myapp",
             "servicePrincipalTenant": "mytenant",
             "accessToken": "Secret"
         }
-        mock_open_for_write.return_value = FileHandleStub()
         mock_read_file.return_value = [test_sp]
         factory = mock.MagicMock()
         factory.side_effect = ValueError('SP was found')
@@ -1697,16 +1690,14 @@ class TestProfile(unittest.TestCase):
                           'myapp', 'resource1', 'mytenant2', False)
 
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
-    @mock.patch('os.fdopen', autospec=True)
-    @mock.patch('os.open', autospec=True)
-    def test_credscache_remove_creds(self, _, mock_open_for_write, mock_read_file):
+    @mock.patch('azure.cli.core.util.write_file_atomically', autospec=True)
+    def test_credscache_remove_creds(self, mock_write, mock_read_file):
         cli = DummyCli()
         test_sp = {
             "servicePrincipalId": "myapp",
             "servicePrincipalTenant": "mytenant",
             "accessToken": "Secret"
         }
-        mock_open_for_write.return_value = FileHandleStub()
         mock_read_file.return_value = [self.token_entry1, test_sp]
         creds_cache = CredsCache(cli, async_persist=False)
 
@@ -1723,14 +1714,13 @@ class TestProfile(unittest.TestCase):
         # assert #2
         self.assertEqual(creds_cache._service_principal_creds, [])
 
-        mock_open_for_write.assert_called_with(mock.ANY, 'w+')
-        self.assertEqual(mock_open_for_write.call_count, 2)
+        mock_write.assert_called_with(creds_cache._token_file, mock.ANY)
+        self.assertEqual(mock_write.call_count, 2)
 
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
-    @mock.patch('os.fdopen', autospec=True)
-    @mock.patch('os.open', autospec=True)
+    @mock.patch('azure.cli.core.util.write_file_atomically', autospec=True)
     @mock.patch('adal.AuthenticationContext', autospec=True)
-    def test_credscache_new_token_added_by_adal(self, mock_adal_auth_context, _, mock_open_for_write, mock_read_file):  # pylint: disable=line-too-long
+    def test_credscache_new_token_added_by_adal(self, mock_adal_auth_context, mock_write, mock_read_file):  # pylint: disable=line-too-long
         cli = DummyCli()
         token_entry2 = {
             "accessToken": "new token",
@@ -1747,7 +1737,6 @@ class TestProfile(unittest.TestCase):
             return mock_adal_auth_context
 
         mock_adal_auth_context.acquire_token.side_effect = acquire_token_side_effect
-        mock_open_for_write.return_value = FileHandleStub()
         mock_read_file.return_value = [self.token_entry1]
         creds_cache = CredsCache(cli, auth_ctx_factory=get_auth_context, async_persist=False)
 
@@ -1761,10 +1750,102 @@ class TestProfile(unittest.TestCase):
             mock.ANY)
 
         # assert
-        mock_open_for_write.assert_called_with(mock.ANY, 'w+')
+        mock_write.assert_called_with(creds_cache._token_file, mock.ANY)
         self.assertEqual(token, 'new token')
         self.assertEqual(token_type, token_entry2['tokenType'])
 
+    @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
+    def test_credscache_service_principal_token_cached(self, mock_read_file):
+        import shutil
+        import tempfile
+        cli = DummyCli()
+        test_sp = {
+            "servicePrincipalId": "myapp",
+            "servicePrincipalTenant": "mytenant",
+            "accessToken": "Secret"
+        }
+        mock_read_file.return_value = [test_sp]
+        mock_auth_context = mock.MagicMock()
+        mock_auth_context.acquire_token_with_client_credentials.return_value = {
+            'tokenType': 'Bearer',
+            'accessToken': 'sp token',
+            'expiresIn': 3600
+        }
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        token_file = os.path.join(temp_dir, 'accessTokens.json')
+        mgmt_resource = 'https://management.core.windows.net/'
+
+        with mock.patch.dict('os.environ', {'AZURE_ACCESS_TOKEN_FILE': token_file}):
+            creds_cache = CredsCache(cli, lambda _, _1, _2: mock_auth_context, async_persist=False)
+            creds_cache.retrieve_token_for_service_principal('myapp', mgmt_resource, 'mytenant')
+            _, token, token_entry = creds_cache.retrieve_token_for_service_principal('myapp', mgmt_resource,
+                                                                                     'mytenant')
+            self.assertEqual(token, 'sp token')
+            self.assertLessEqual(token_entry['expiresIn'], 3600)
+            self.assertEqual(mock_auth_context.acquire_token_with_client_credentials.call_count, 1)
+
+            # shared with other processes
+            creds_cache = CredsCache(cli, lambda _, _1, _2: mock_auth_context, async_persist=False)
+            creds_cache.retrieve_token_for_service_principal('myapp', mgmt_resource, 'mytenant')
+            self.assertEqual(mock_auth_context.acquire_token_with_client_credentials.call_count, 1)
+            if sys.platform != 'win32':
+                self.assertEqual(os.stat(creds_cache._sp_token_file).st_mode & 0o777, 0o600)
+
+            # other tenants and resources, and tokens about to expire are acquired again
+            creds_cache.retrieve_token_for_service_principal('myapp', mgmt_resource, 'mytenant2')
+            creds_cache.retrieve_token_for_service_principal('myapp', 'https://vault.azure.net', 'mytenant')
+            self.assertEqual(mock_auth_context.acquire_token_with_client_credentials.call_count, 3)
+            with mock.patch('time.time', return_value=time.time() + 3400):
+                creds_cache.retrieve_token_for_service_principal('myapp', mgmt_resource, 'mytenant')
+            self.assertEqual(mock_auth_context.acquire_token_with_client_credentials.call_count, 4)
+
+            # logout drops the tokens
+            creds_cache.remove_cached_creds('myapp')
+            with open(creds_cache._sp_token_file) as f:
+                self.assertEqual(json.load(f), [])
+
+    def test_credscache_merge_with_concurrent_changes(self):
+        import shutil
+        import tempfile
+        cli = DummyCli()
+        test_sp = {
+            "servicePrincipalId": "myapp",
+            "servicePrincipalTenant": "mytenant",
+            "accessToken": "Secret"
+        }
+        test_sp2 = {
+            "servicePrincipalId": "myapp2",
+            "servicePrincipalTenant": "mytenant2",
+            "accessToken": "Secret2"
+        }
+        token_entry = deepcopy(self.token_entry1)
+        token_entry['expiresOn'] = '2030-01-01 00:00:00.000000'
+        refreshed_token_entry = deepcopy(token_entry)
+        refreshed_token_entry.update({'expiresOn': '2030-01-01 01:00:00.000000', 'accessToken': 'refreshed'})
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        token_file = os.path.join(temp_dir, 'accessTokens.json')
+        with open(token_file, 'w') as f:
+            json.dump([token_entry, test_sp], f)
+
+        with mock.patch.dict('os.environ', {'AZURE_ACCESS_TOKEN_FILE': token_file}):
+            # a long running process logs in another service principal, persisted when it exits
+            creds_cache = CredsCache(cli, async_persist=True)
+            creds_cache.save_service_principal_cred(test_sp2)
+
+            # meanwhile another process refreshes the token and logs out the service principal
+            other_creds_cache = CredsCache(cli, async_persist=False)
+            other_creds_cache.adal_token_cache.add([refreshed_token_entry])
+            other_creds_cache.remove_cached_creds('myapp')
+
+            creds_cache.flush_to_disk()
+            with open(token_file) as f:
+                self.assertEqual(json.load(f), [refreshed_token_entry, test_sp2])
+
+            # the other process picks up the change without persisting anything
+            self.assertEqual(other_creds_cache.retrieve_secret_of_service_principal('myapp2'), 'Secret2')
+
     @mock.patch('azure.cli.core._profile.get_file_json', autospec=True)
     def test_credscache_good_error_on_file_corruption(self, mock_read_file):
         mock_read_file.side_effect = ValueError('a bad error for you')
@@ -1831,21 +1912,36 @@ class TestProfile(unittest.TestCase):
         """
         import adal
         cli = DummyCli()
-        mock_arm_client = mock.MagicMock()
         tenant2 = "00000002-0000-0000-0000-000000000000"
-        mock_arm_client.tenants.list.return_value = [TenantStub(self.tenant_id), TenantStub(tenant2)]
 
         # same subscription but listed from another tenant
         subscription2_raw = SubscriptionStub(self.id1, self.display_name1, self.state1, self.tenant_id)
-        mock_arm_client.subscriptions.list.side_effect = [[deepcopy(self.subscription1_raw)], [subscription2_raw]]
+        # tenants are queried concurrently, so the results are keyed by the token of each tenant
+        subscriptions_by_token = {
+            'token-' + self.tenant_id: [deepcopy(self.subscription1_raw)],
+            'token-' + tenant2: [subscription2_raw]
+        }
+
+        def _create_auth_context(_, tenant, _2):
+            auth_context = mock.MagicMock()
+            auth_context.acquire_token.return_value = {'accessToken': 'token-' + tenant}
+            return auth_context
+
+        def _create_arm_client(credentials):
+            mock_arm_client = mock.MagicMock()
+            mock_arm_client.tenants.list.return_value = [TenantStub(self.tenant_id), TenantStub(tenant2)]
+            mock_arm_client.subscriptions.list.return_value = subscriptions_by_token.get(
+                credentials.token['access_token'], [])
+            return mock_arm_client
 
         mgmt_resource = 'https://management.core.windows.net/'
         token_cache = adal.TokenCache()
-        finder = SubscriptionFinder(cli, lambda _, _1, _2: mock_auth_context, token_cache, lambda _: mock_arm_client)
+        finder = SubscriptionFinder(cli, _create_auth_context, token_cache, _create_arm_client)
         all_subscriptions = finder._find_using_common_tenant(access_token="token1", resource=mgmt_resource)
 
         self.assertEqual(len(all_subscriptions), 1)
         self.assertEqual(all_subscriptions[0].tenant_id, self.tenant_id)
+        self.assertEqual(finder.tenants, [self.tenant_id, tenant2])
 
     @mock.patch('adal.AuthenticationContext', autospec=True)
     @mock.patch('azure.cli.core._profile._get_authorization_code', autospec=True)
@@ -1858,7 +1954,9 @@ class TestProfile(unittest.TestCase):
         mock_arm_client.tenants.list.return_value = [TenantStub(self.tenant_id), TenantStub(tenant2_mfa_id)]
         mock_arm_client.subscriptions.list.return_value = [deepcopy(self.subscription1_raw)]
         token_cache = adal.TokenCache()
-        finder = SubscriptionFinder(cli, lambda _, _1, _2: mock_auth_context, token_cache, lambda _: mock_arm_client)
+        auth_contexts = {self.tenant_id: mock.MagicMock(), tenant2_mfa_id: mock.MagicMock()}
+        finder = SubscriptionFinder(cli, lambda _, tenant, _2: auth_contexts[tenant], token_cache,
+                                    lambda _: mock_arm_client)
 
         adal_error_mfa = adal.AdalError(error_msg="", error_response={
             'error': 'interaction_required',
@@ -1875,8 +1973,9 @@ class TestProfile(unittest.TestCase):
             'error_uri': 'https://login.microsoftonline.com/error?code=50076',
             'suberror': 'basic_action'})
 
-        # adal_error_mfa are raised on the second call
-        mock_auth_context.acquire_token.side_effect = [self.token_entry1, adal_error_mfa]
+        # adal_error_mfa are raised for the second tenant
+        auth_contexts[self.tenant_id].acquire_token.return_value = self.token_entry1
+        auth_contexts[tenant2_mfa_id].acquire_token.side_effect = adal_error_mfa
 
         # action
         all_subscriptions = finder._find_using_common_tenant(access_token="token1",
@@ -1885,10 +1984,42 @@ class TestProfile(unittest.TestCase):
         # assert
         # subscriptions are correctly returned
         self.assertEqual(all_subscriptions, [self.subscription1])
-        self.assertEqual(mock_auth_context.acquire_token.call_count, 2)
+        self.assertEqual(sum(c.acquire_token.call_count for c in auth_contexts.values()), 2)
 
         # With pytest, use -o log_cli=True to manually check the log
 
+    def test_find_using_common_tenant_concurrently(self):
+        import adal
+        cli = DummyCli()
+        tenant_ids = ['0000000{}-0000-0000-0000-000000000000'.format(i) for i in range(6)]
+
+        def _create_auth_context(_, tenant, _2):
+            def _acquire_token(*_):
+                # finish in reverse order of the tenants
+                time.sleep((6 - tenant_ids.index(tenant)) * 0.01)
+                return {'accessToken': tenant}
+            auth_context = mock.MagicMock()
+            auth_context.acquire_token.side_effect = _acquire_token
+            return auth_context
+
+        def _create_arm_client(credentials):
+            tenant = credentials.token['access_token']
+            mock_arm_client = mock.MagicMock()
+            mock_arm_client.tenants.list.return_value = [TenantStub(t) for t in tenant_ids]
+            # every tenant can list the shared subscription, and one of its own
+            mock_arm_client.subscriptions.list.return_value = [
+                SubscriptionStub('subscriptions/shared', 'shared', self.state1, tenant_ids[0]),
+                SubscriptionStub('subscriptions/' + tenant, tenant, self.state1, tenant)]
+            return mock_arm_client
+
+        finder = SubscriptionFinder(cli, _create_auth_context, adal.TokenCache(), _create_arm_client)
+        all_subscriptions = finder._find_using_common_tenant(access_token="token1",
+                                                             resource='https://management.core.windows.net/')
+
+        self.assertEqual([(s.subscription_id, s.tenant_id) for s in all_subscriptions],
+                         [('shared', tenant_ids[0])] + [(t, t) for t in tenant_ids])
+        self.assertEqual(finder.tenants, tenant_ids)
+
     @mock.patch('adal.AuthenticationContext', autospec=True)
     @mock.patch('azure.cli.core._profile._get_authorization_code', autospec=True)
     def test_find_using_specific_tenant(self, _get_authorization_code_mock, mock_auth_context):
@@ -1941,18 +2072,6 @@ class TestProfile(unittest.TestCase):
         self.assertEqual(access_token, 'fake_access_token')
 
 
-class FileHandleStub(object):  # pylint: disable=too-few-public-methods
-
-    def write(self, content):
-        pass
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, _2, _3, _4):
-        pass
-
-
 class SubscriptionStub(Subscription):  # pylint: disable=too-few-public-methods
 
     def __init__(self, id, display_name, state, tenant_id, managed_by_tenants=[], home_tenant_id=None):  # pylint: disable=redefined-builtin
@@ -0,0 +1,78 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from azure.cli.core._session import Session
+
+
+class TestSession(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.temp_dir, 'azureProfile.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _read_file(self):
+        with open(self.filename, encoding='utf-8-sig') as f:
+            return json.load(f)
+
+    def test_concurrent_sessions_keep_each_others_changes(self):
+        session1, session2 = Session(), Session()
+        session1.load(self.filename)
+        session2.load(self.filename)
+
+        session1['installationId'] = 'id1'
+        session2['subscriptions'] = [{'id': 'sub1'}]
+        self.assertEqual(self._read_file(), {'installationId': 'id1', 'subscriptions': [{'id': 'sub1'}]})
+        # the changes of the other session were picked up while saving
+        self.assertEqual(session2.get('installationId'), 'id1')
+
+        del session1['installationId']
+        self.assertEqual(self._read_file(), {'subscriptions': [{'id': 'sub1'}]})
+
+        # an explicit save writes the whole session
+        session2.data = {'subscriptions': []}
+        session2.save()
+        self.assertEqual(self._read_file(), {'subscriptions': []})
+        self.assertFalse([f for f in os.listdir(self.temp_dir) if f.endswith('.tmp')])
+
+    def test_load_skips_unchanged_file(self):
+        session = Session()
+        session.load(self.filename)
+        session['key'] = 'value'
+
+        with mock.patch('json.load') as json_load:
+            session.load(self.filename)
+            json_load.assert_not_called()
+        self.assertEqual(session.get('key'), 'value')
+
+        other = Session()
+        other.load(self.filename)
+        other['key'] = 'other value'
+        session.load(self.filename)
+        self.assertEqual(session.get('key'), 'other value')
+
+    def test_load_expired_file(self):
+        session = Session()
+        session.load(self.filename)
+        session['key'] = 'value'
+        os.utime(self.filename, (0, 0))
+
+        session.load(self.filename, max_age=3600)
+        self.assertEqual(session.data, {})
+        self.assertEqual(self._read_file(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
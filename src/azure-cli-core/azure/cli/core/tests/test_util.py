@@ -6,6 +6,7 @@
 # pylint: disable=line-too-long
 from collections import namedtuple
 import os
+import shutil
 import sys
 import unittest
 import mock
@@ -15,7 +16,8 @@ import json
 from azure.cli.core.util import \
     (get_file_json, truncate_text, shell_safe_json_parse, b64_to_hex, hash_string, random_string,
      open_page_in_browser, can_launch_browser, handle_exception, ConfiguredDefaultSetter, send_raw_request,
-     should_disable_connection_verify, parse_proxy_resource_id, get_az_user_agent)
+     should_disable_connection_verify, parse_proxy_resource_id, get_az_user_agent, iter_file_lines,
+     get_concurrency_config)
 from azure.cli.core.mock import DummyCli
 
 
@@ -40,6 +42,37 @@ class TestUtils(unittest.TestCase):
                 self.assertTrue(str(ex).find(
                     'contains error: Expecting value: line 1 column 1 (char 0)'))
 
+    def test_iter_file_lines(self):
+        import codecs
+        from knack.util import CLIError
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        pathname = os.path.join(temp_dir, 'lines.txt')
+        text = 'first \u00e9\r\nsecond\n'
+        for bom, encoding in [(b'', 'utf-8'), (codecs.BOM_UTF8, 'utf-8'), (codecs.BOM_UTF16_LE, 'utf-16-le'),
+                              (codecs.BOM_UTF16_BE, 'utf-16-be')]:
+            with open(pathname, 'wb') as f:
+                f.write(bom + text.encode(encoding))
+            # the BOM is dropped and line endings are kept
+            self.assertEqual(list(iter_file_lines(pathname)), ['first \u00e9\r\n', 'second\n'])
+
+        with open(pathname, 'wb') as f:
+            f.write(text.encode('utf-16-le'))
+        with self.assertRaisesRegex(CLIError, 'Failed to decode file'):
+            list(iter_file_lines(pathname))
+
+    def test_get_concurrency_config(self):
+        cli_ctx = mock.MagicMock()
+        cli_ctx.config.getint.return_value = 4
+        self.assertEqual(get_concurrency_config(cli_ctx, 'core', 'max_concurrent_ids', 10), 4)
+        cli_ctx.config.getint.assert_called_once_with('core', 'max_concurrent_ids', 10)
+        cli_ctx.config.getint.return_value = 0
+        self.assertEqual(get_concurrency_config(cli_ctx, 'core', 'max_concurrent_ids', 10), 1)
+        cli_ctx.config.getint.side_effect = ValueError("invalid literal for int() with base 10: 'many'")
+        with mock.patch('azure.cli.core.util.logger') as logger:
+            self.assertEqual(get_concurrency_config(cli_ctx, 'core', 'max_concurrent_ids', 10), 10)
+            logger.warning.assert_called_once()
+
     def test_truncate_text(self):
         expected = 'stri [...]'
         actual = truncate_text('string to shorten', width=10)
@@ -15,6 +15,7 @@ import ssl
 import six
 import re
 import logging
+from contextlib import contextmanager
 
 from six.moves.urllib.request import urlopen  # pylint: disable=import-error
 
@@ -123,6 +124,32 @@ def empty_on_404(ex):
     raise ex
 
 
+def get_throttling_retry_delay(ex, attempt):
+    """ Seconds to wait before retrying a request that failed with `ex`, or None if it shouldn't be retried. Honors
+    the Retry-After header of a 429 response, up to a minute. """
+    response = getattr(ex, 'response', None)
+    status_code = getattr(ex, 'status_code', None) or getattr(response, 'status_code', None)
+    if status_code != 429:
+        return None
+    retry_after = None
+    try:
+        retry_after = float(response.headers['Retry-After'])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        pass
+    return min(retry_after if retry_after is not None else 2 ** attempt, 60)
+
+
+def get_concurrency_config(cli_ctx, section, option, default):
+    """ The number of concurrent requests configured by `[section] option`, at least 1. An invalid value is ignored
+    with a warning. """
+    try:
+        value = cli_ctx.config.getint(section, option, default)
+    except ValueError:
+        logger.warning("Ignoring '[%s] %s', it isn't an integer. Using %d.", section, option, default)
+        value = default
+    return max(1, value)
+
+
 def truncate_text(str_to_shorten, width=70, placeholder=' [...]'):
     if width <= 0:
         raise ValueError('width must be greater than 0.')
@@ -387,6 +414,83 @@ def read_file_content(file_path, allow_binary=False):
     raise CLIError('Failed to decode file {} - unknown decoding'.format(file_path))
 
 
+def iter_file_lines(file_path):
+    """ Read a text file line by line instead of as a whole, decoding it like `read_file_content` does: as UTF-16
+    when it starts with a UTF-16 BOM and as UTF-8, with or without BOM, otherwise. """
+    from codecs import BOM_UTF16_LE, BOM_UTF16_BE
+    with open(file_path, 'rb') as f:
+        bom = f.read(2)
+    encoding = 'utf-16' if bom in (BOM_UTF16_LE, BOM_UTF16_BE) else 'utf-8-sig'
+    logger.debug("reading file %s as %s", file_path, encoding)
+    try:
+        with open(file_path, 'r', encoding=encoding, newline='') as f:
+            for line in f:
+                yield line
+    except UnicodeError:
+        raise CLIError('Failed to decode file {} - unknown decoding'.format(file_path))
+
+
+def get_file_state(file_path):
+    """ Identify the content of a file by inode, modification time and size, so re-parsing it can be skipped when
+    it hasn't changed. Files written by `write_file_atomically` always get a new inode. Returns None if the file
+    doesn't exist. """
+    import os
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def write_file_atomically(file_path, content, encoding='utf-8'):
+    """ Write a file through a temp file that is renamed over it, so concurrent readers see either the old or the
+    new content. An existing file keeps its permissions; a new one is readable and writable by the owner only. """
+    import os
+    import stat
+    import tempfile
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path) or '.',
+                                     prefix=os.path.basename(file_path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding) as f:
+            f.write(content)
+        if os.path.exists(file_path):
+            os.chmod(temp_path, stat.S_IMODE(os.stat(file_path).st_mode))
+        os.replace(temp_path, file_path)
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+FILE_LOCK_TIMEOUT = 10
+
+
+@contextmanager
+def file_lock(file_path, timeout=FILE_LOCK_TIMEOUT):
+    """ Hold an advisory lock on `file_path` shared by all az processes, e.g. for a read-merge-write of the file.
+    The lock is taken on a separate `<file_path>.lock` file, so the file itself can be replaced while locked.
+    If the lock can't be taken within `timeout` seconds, carry on without it rather than failing the command. """
+    try:
+        import portalocker
+    except ImportError:
+        logger.debug("portalocker is not available, %s is not locked.", file_path)
+        yield
+        return
+    lock = portalocker.Lock(file_path + '.lock', mode='a', timeout=timeout, check_interval=0.05)
+    try:
+        lock.acquire()
+    except (portalocker.LockException, OSError, IOError) as ex:
+        logger.debug("Failed to lock %s, continuing without the lock: %s", file_path, ex)
+        lock = None
+    try:
+        yield
+    finally:
+        if lock:
+            lock.release()
+
+
 def shell_safe_json_parse(json_or_dict_string, preserve_order=False):
     """ Allows the passing of JSON or Python dictionary strings. This is needed because certain
     JSON strings in CMD shell are not received in main's argv. This allows the user to specify
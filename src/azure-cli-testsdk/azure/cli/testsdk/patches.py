@@ -104,6 +104,23 @@ def patch_get_current_system_username(unit_test):
     mock_in_unit_test(unit_test, 'azure.cli.core.local_context._get_current_system_username', _get_current_system_username)
 
 
+def patch_local_caches(unit_test):
+    # Commands keep api-versions, resolved names, image and SKU lists in the config directory. Recordings are made
+    # against different subscriptions and resources, so don't let them leak from one test into another.
+    try:
+        import unittest.mock as mock
+    except ImportError:
+        import mock
+    import os
+
+    mp = mock.patch.dict(os.environ, {'AZURE_RESOURCE_API_VERSION_CACHE_TTL': '0',
+                                      'AZURE_ROLE_CACHE_TTL': '0',
+                                      'AZURE_VM_IMAGE_CATALOG_TTL': '0',
+                                      'AZURE_VM_SKU_CATALOG_TTL': '0'})
+    mp.__enter__()
+    unit_test.addCleanup(mp.__exit__, None, None, None)
+
+
 def mock_in_unit_test(unit_test, target, replacement):
     try:
         import unittest.mock as mock
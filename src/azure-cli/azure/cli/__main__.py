@@ -11,6 +11,7 @@ from knack.completion import ARGCOMPLETE_ENV_NAME
 from knack.log import get_logger
 
 from azure.cli.core import get_default_cli
+from azure.cli.core import daemon
 
 import azure.cli.core.telemetry as telemetry
 
@@ -30,6 +31,11 @@ def cli_main(cli, args):
     return cli.invoke(args)
 
 
+if daemon.use_daemon():
+    daemon_exit_code = daemon.run_client(sys.argv[1:])
+    if daemon_exit_code is not None:
+        sys.exit(daemon_exit_code)
+
 az_cli = get_default_cli()
 
 telemetry.set_application(az_cli, ARGCOMPLETE_ENV_NAME)
@@ -19,6 +19,10 @@ from ._constants import TASK_VALID_VSTS_URLS
 logger = get_logger(__name__)
 
 
+UPLOAD_BLOCK_SIZE = 4 * 1024 * 1024
+DEFAULT_UPLOAD_MAX_CONNECTIONS = 4
+
+
 def upload_source_code(cmd, client,
                        registry_name,
                        resource_group_name,
@@ -26,20 +30,6 @@ def upload_source_code(cmd, client,
                        tar_file_path,
                        docker_file_path,
                        docker_file_in_tar):
-    _pack_source_code(source_location,
-                      tar_file_path,
-                      docker_file_path,
-                      docker_file_in_tar)
-
-    size = os.path.getsize(tar_file_path)
-    unit = 'GiB'
-    for S in ['Bytes', 'KiB', 'MiB', 'GiB']:
-        if size < 1024:
-            unit = S
-            break
-        size = size / 1024.0
-
-    logger.warning("Uploading archived source code from '%s'...", tar_file_path)
     upload_url = None
     relative_path = None
     try:
@@ -55,21 +45,114 @@ def upload_source_code(cmd, client,
 
     account_name, endpoint_suffix, container_name, blob_name, sas_token = get_blob_info(upload_url)
     BlockBlobService = get_sdk(cmd.cli_ctx, ResourceType.DATA_STORAGE, 'blob#BlockBlobService')
-    BlockBlobService(account_name=account_name,
-                     sas_token=sas_token,
-                     endpoint_suffix=endpoint_suffix).create_blob_from_path(
-                         container_name=container_name,
-                         blob_name=blob_name,
-                         file_path=tar_file_path)
+    blob_service = BlockBlobService(account_name=account_name,
+                                    sas_token=sas_token,
+                                    endpoint_suffix=endpoint_suffix)
+
+    max_connections = cmd.cli_ctx.config.getint('acr', 'upload_max_connections', DEFAULT_UPLOAD_MAX_CONNECTIONS)
+    if max_connections > 1:
+        # pack and upload at the same time: the archive is cut into blocks which are sent while packing continues
+        logger.warning("Packing and uploading source code...")
+        BlobBlock = get_sdk(cmd.cli_ctx, ResourceType.DATA_STORAGE, 'blob.models#BlobBlock')
+        size = _upload_blocks(blob_service, container_name, blob_name, BlobBlock, max_connections,
+                              lambda fileobj: _pack_source_code(source_location, tar_file_path, docker_file_path,
+                                                                docker_file_in_tar, fileobj=fileobj))
+    else:
+        _pack_source_code(source_location,
+                          tar_file_path,
+                          docker_file_path,
+                          docker_file_in_tar)
+        size = os.path.getsize(tar_file_path)
+        logger.warning("Uploading archived source code from '%s'...", tar_file_path)
+        blob_service.create_blob_from_path(container_name=container_name,
+                                           blob_name=blob_name,
+                                           file_path=tar_file_path)
+
+    unit = 'GiB'
+    for S in ['Bytes', 'KiB', 'MiB', 'GiB']:
+        if size < 1024:
+            unit = S
+            break
+        size = size / 1024.0
+
     logger.warning("Sending context ({0:.3f} {1}) to registry: {2}...".format(
         size, unit, registry_name))
     return relative_path
 
 
-def _pack_source_code(source_location, tar_file_path, docker_file_path, docker_file_in_tar):
-    logger.warning("Packing source code into tar to upload...")
+class _BlockWriter(object):
+    """ A write-only file object which cuts what is written to it into blocks of a fixed size. """
+
+    def __init__(self, put_block, block_size):
+        self._put_block = put_block
+        self._block_size = block_size
+        self._buffer = bytearray()
+        self.size = 0
+
+    def write(self, data):
+        self._buffer.extend(data)
+        self.size += len(data)
+        while len(self._buffer) >= self._block_size:
+            self._put_block(bytes(self._buffer[:self._block_size]))
+            del self._buffer[:self._block_size]
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self._buffer:
+            self._put_block(bytes(self._buffer))
+            self._buffer = bytearray()
+
+
+def _upload_blocks(blob_service, container_name, blob_name, block_type, max_connections, write):
+    """ Upload what `write` writes to the given file object as a block blob. Blocks are uploaded by a pool of
+    `max_connections` threads while `write` keeps producing, with at most twice as many blocks held in memory. """
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    block_ids = []
+    errors = []
+    slots = threading.BoundedSemaphore(max_connections * 2)
+
+    def _upload(block, block_id):
+        try:
+            if not errors:
+                blob_service.put_block(container_name, blob_name, block, block_id)
+        except Exception as ex:  # pylint: disable=broad-except
+            errors.append(ex)
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=max_connections) as executor:
+        def _put_block(block):
+            slots.acquire()
+            if errors:
+                slots.release()
+                raise errors[0]
+            # block ids of a blob must all have the same length
+            block_id = '{:08d}'.format(len(block_ids))
+            block_ids.append(block_id)
+            executor.submit(_upload, block, block_id)
+
+        writer = _BlockWriter(_put_block, UPLOAD_BLOCK_SIZE)
+        write(writer)
+        writer.close()
+
+    if errors:
+        raise errors[0]
+    blob_service.put_block_list(container_name, blob_name, [block_type(id=block_id) for block_id in block_ids])
+    logger.debug("Uploaded %d bytes of source code in %d blocks.", writer.size, len(block_ids))
+    return writer.size
+
+
+def _pack_source_code(source_location, tar_file_path, docker_file_path, docker_file_in_tar, fileobj=None):
+    if fileobj is None:
+        logger.warning("Packing source code into tar to upload...")
 
     ignore_list, ignore_list_size = _load_dockerignore_file(source_location)
+    ignore_regex = _compile_ignore_list(ignore_list)
     common_vcs_ignore_list = {'.git', '.gitignore', '.bzr', 'bzrignore', '.hg', '.hgignore', '.svn'}
 
     def _ignore_check(tarinfo, parent_ignored, parent_matching_rule_index):
@@ -83,22 +166,29 @@ def _pack_source_code(source_location, tar_file_path, docker_file_path, docker_f
             # eg, it will ignore the files under .git folder.
             return parent_ignored, parent_matching_rule_index
 
-        for index, item in enumerate(ignore_list):
-            # stop checking the remaining rules whose priorities are lower than the parent matching rule
-            # at this point, current item should just inherit from parent
-            if index >= parent_matching_rule_index:
-                break
-            if re.match(item.pattern, tarinfo.name):
-                logger.debug(".dockerignore: rule '%s' matches '%s'.",
-                             item.rule, tarinfo.name)
-                return item.ignore, index
+        # the combined regex finds the highest priority rule matching the path in a single pass
+        match = ignore_regex.match(tarinfo.name) if ignore_regex else None
+        index = int(match.lastgroup[1:]) if match else parent_matching_rule_index
+        # rules whose priorities are lower than the parent matching rule are not checked,
+        # the current item just inherits from parent
+        if index < parent_matching_rule_index:
+            item = ignore_list[index]
+            logger.debug(".dockerignore: rule '%s' matches '%s'.",
+                         item.rule, tarinfo.name)
+            return item.ignore, index
 
         logger.debug(".dockerignore: no rule for '%s'. parent ignore '%s'",
                      tarinfo.name, parent_ignored)
         # inherit from parent
         return parent_ignored, parent_matching_rule_index
 
-    with tarfile.open(tar_file_path, "w:gz") as tar:
+    if fileobj is None:
+        tar = tarfile.open(tar_file_path, "w:gz")
+    else:
+        # stream mode, the archive is written out sequentially without seeking
+        tar = tarfile.open(fileobj=fileobj, mode="w|gz")
+
+    with tar:
         # need to set arcname to empty string as the archive root path
         _archive_file_recursively(tar,
                                   source_location,
@@ -144,6 +234,13 @@ class IgnoreRule(object):  # pylint: disable=too-few-public-methods
         self.pattern += "$"
 
 
+def _compile_ignore_list(ignore_list):
+    # one alternative per rule in the order of priority, the group 'r<n>' is the n-th rule
+    if not ignore_list:
+        return None
+    return re.compile('|'.join('(?P<r{}>{})'.format(index, item.pattern) for index, item in enumerate(ignore_list)))
+
+
 def _load_dockerignore_file(source_location):
     # reference: https://docs.docker.com/engine/reference/builder/#dockerignore-file
     docker_ignore_file = os.path.join(source_location, ".dockerignore")
@@ -801,6 +801,9 @@ examples:
   - name: Show logs for the last created run in the registry that built the image 'hello-world'.
     text: >
         az acr task logs -r MyRegistry --image hello-world
+  - name: Show logs for a particular run and save them to a file.
+    text: >
+        az acr task logs -r MyRegistry --run-id runId --log-file run.log
 """
 
 helps['acr task run'] = """
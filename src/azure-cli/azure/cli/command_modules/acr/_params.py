@@ -245,6 +245,9 @@ def load_arguments(self, _):  # pylint: disable=too-many-statements
         c.argument('run_status', help='The current status of run.', arg_type=get_enum_type(RunStatus))
         c.argument('top', help='Limit the number of latest runs in the results.')
 
+    with self.argument_context('acr task logs') as c:
+        c.argument('log_file', help='The path of a file to also write the raw logs to.')
+
     with self.argument_context('acr task update-run') as c:
         c.argument('no_archive', help='Indicates whether the run should be archived.', arg_type=get_three_state_flag())
 
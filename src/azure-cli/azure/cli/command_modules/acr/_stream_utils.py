@@ -2,7 +2,6 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
-from io import BytesIO
 import time
 from random import uniform
 import colorama
@@ -16,6 +15,9 @@ from ._azure_utils import get_blob_info
 logger = get_logger(__name__)
 
 DEFAULT_CHUNK_SIZE = 1024 * 4
+MAX_CHUNK_SIZE = 1024 * 1024 * 4
+MIN_POLL_INTERVAL_IN_SEC = 0.5
+MAX_POLL_INTERVAL_IN_SEC = 15
 DEFAULT_LOG_TIMEOUT_IN_SEC = 60 * 30  # 30 minutes
 
 
@@ -24,7 +26,8 @@ def stream_logs(cmd, client,
                 registry_name,
                 resource_group_name,
                 no_format=False,
-                raise_error_on_failure=False):
+                raise_error_on_failure=False,
+                log_file=None):
     log_file_sas = None
     error_msg = "Could not get logs for ID: {}".format(run_id)
 
@@ -53,7 +56,8 @@ def stream_logs(cmd, client,
                      endpoint_suffix=endpoint_suffix),
                  container_name,
                  blob_name,
-                 raise_error_on_failure)
+                 raise_error_on_failure,
+                 log_file)
 
 
 def _stream_logs(no_format,  # pylint: disable=too-many-locals, too-many-statements, too-many-branches
@@ -62,21 +66,21 @@ def _stream_logs(no_format,  # pylint: disable=too-many-locals, too-many-stateme
                  blob_service,
                  container_name,
                  blob_name,
-                 raise_error_on_failure):
+                 raise_error_on_failure,
+                 log_file=None):
 
     if not no_format:
         colorama.init()
 
-    stream = BytesIO()
+    # bytes read but not printed yet, i.e. the last incomplete line
+    buffer = bytearray()
     metadata = {}
     start = 0
-    end = byte_size - 1
     available = 0
-    sleep_time = 1
-    max_sleep_time = 15
-    num_fails = 0
-    num_fails_for_backoff = 3
+    poll_interval = MIN_POLL_INTERVAL_IN_SEC
+    has_new_content = False
     consecutive_sleep_in_sec = 0
+    log_writer = _LogFileWriter(log_file) if log_file else None
 
     # Try to get the initial properties so there's no waiting.
     # If the storage call fails, we'll just sleep and try again after.
@@ -88,96 +92,85 @@ def _stream_logs(no_format,  # pylint: disable=too-many-locals, too-many-stateme
     except (AttributeError, AzureHttpError):
         pass
 
-    while (_blob_is_not_complete(metadata) or start < available):
-        while start < available:
-            # Success! Reset our polling backoff.
-            sleep_time = 1
-            num_fails = 0
-            consecutive_sleep_in_sec = 0
+    try:
+        while (_blob_is_not_complete(metadata) or start < available):
+            while start < available:
+                has_new_content = True
+                consecutive_sleep_in_sec = 0
+
+                # Read everything appended since the last poll, in as few requests as possible.
+                end = start + min(max(available - start, byte_size), MAX_CHUNK_SIZE) - 1
+                try:
+                    chunk = blob_service.get_blob_to_bytes(
+                        container_name=container_name,
+                        blob_name=blob_name,
+                        start_range=start,
+                        end_range=end,
+                        max_connections=1).content
+                except AzureHttpError as ae:
+                    if ae.status_code != 404:
+                        raise CLIError(ae)
+                    break
+                if not chunk:
+                    break
+                start += len(chunk)
+
+                if log_writer:
+                    log_writer.write(chunk)
+
+                # Only scan what's newly read, plus the last byte before it in case \r\n was split.
+                scan_start = max(len(buffer) - 1, 0)
+                buffer.extend(chunk)
+                index = buffer.rfind(b'\r\n', scan_start)
+                if index >= 0:
+                    print(buffer[:index + 1].decode('utf-8', errors='ignore'))  # won't print \n
+                    del buffer[:index + 2]
 
             try:
-                old_byte_size = len(stream.getvalue())
-                blob_service.get_blob_to_stream(
-                    container_name=container_name,
-                    blob_name=blob_name,
-                    start_range=start,
-                    end_range=end,
-                    stream=stream)
-
-                curr_bytes = stream.getvalue()
-                new_byte_size = len(curr_bytes)
-                amount_read = new_byte_size - old_byte_size
-                start += amount_read
-                end = start + byte_size - 1
-
-                # Only scan what's newly read. If nothing is read, default to 0.
-                min_scan_range = max(new_byte_size - amount_read - 1, 0)
-                for i in range(new_byte_size - 1, min_scan_range, -1):
-                    if curr_bytes[i - 1:i + 1] == b'\r\n':
-                        flush = curr_bytes[:i]  # won't print \n
-                        stream = BytesIO()
-                        stream.write(curr_bytes[i + 1:])
-                        print(flush.decode('utf-8', errors='ignore'))
-                        break
+                props = blob_service.get_blob_properties(
+                    container_name=container_name, blob_name=blob_name)
+                metadata = props.metadata
+                available = props.properties.content_length
             except AzureHttpError as ae:
                 if ae.status_code != 404:
                     raise CLIError(ae)
-            except KeyboardInterrupt:
-                curr_bytes = stream.getvalue()
-                if curr_bytes:
-                    print(curr_bytes.decode('utf-8', errors='ignore'))
+            except Exception as err:
+                raise CLIError(err)
+
+            if consecutive_sleep_in_sec > timeout_in_seconds:
+                # Flush anything remaining in the buffer - this would be the case
+                # if the file has expired and we weren't able to detect any \r\n
+                _flush_buffer(buffer)
+
+                logger.warning("Failed to find any new logs in %d seconds. Client will stop polling for additional "
+                               "logs.", consecutive_sleep_in_sec)
                 return
 
-        try:
-            props = blob_service.get_blob_properties(
-                container_name=container_name, blob_name=blob_name)
-            metadata = props.metadata
-            available = props.properties.content_length
-        except AzureHttpError as ae:
-            if ae.status_code != 404:
-                raise CLIError(ae)
-        except KeyboardInterrupt:
-            if curr_bytes:
-                print(curr_bytes.decode('utf-8', errors='ignore'))
-            return
-        except Exception as err:
-            raise CLIError(err)
-
-        if consecutive_sleep_in_sec > timeout_in_seconds:
-            # Flush anything remaining in the buffer - this would be the case
-            # if the file has expired and we weren't able to detect any \r\n
-            curr_bytes = stream.getvalue()
-            if curr_bytes:
-                print(curr_bytes.decode('utf-8', errors='ignore'))
-
-            logger.warning("Failed to find any new logs in %d seconds. Client will stop polling for additional logs.",
-                           consecutive_sleep_in_sec)
-            return
-
-        # If no new data available but not complete, sleep before trying to process additional data.
-        if (_blob_is_not_complete(metadata) and start >= available):
-            num_fails += 1
-
-            logger.debug(
-                "Failed to find new content %d times in a row", num_fails)
-            if num_fails >= num_fails_for_backoff:
-                num_fails = 0
-                sleep_time = min(sleep_time * 2, max_sleep_time)
-                logger.debug("Resetting failure count to %d", num_fails)
-
-            rnd = uniform(1, 2)  # 1.0 <= x < 2.0
-            total_sleep_time = sleep_time + rnd
-            consecutive_sleep_in_sec += total_sleep_time
-            logger.debug("Base sleep time: %d, random delay: %d, total: %d, consecutive: %d",
-                         sleep_time, rnd, total_sleep_time, consecutive_sleep_in_sec)
-            time.sleep(total_sleep_time)
+            # If no new data available but not complete, sleep before trying to process additional data.
+            if (_blob_is_not_complete(metadata) and start >= available):
+                # Poll more often while the log keeps growing and back off while it is idle.
+                if has_new_content:
+                    poll_interval = max(poll_interval / 2, MIN_POLL_INTERVAL_IN_SEC)
+                else:
+                    poll_interval = min(poll_interval * 2, MAX_POLL_INTERVAL_IN_SEC)
+                has_new_content = False
+
+                total_sleep_time = poll_interval * uniform(1, 1.25)
+                consecutive_sleep_in_sec += total_sleep_time
+                logger.debug("Poll interval: %.2f, total sleep time: %.2f, consecutive: %.2f",
+                             poll_interval, total_sleep_time, consecutive_sleep_in_sec)
+                time.sleep(total_sleep_time)
+    except KeyboardInterrupt:
+        _flush_buffer(buffer)
+        return
+    finally:
+        if log_writer:
+            log_writer.close()
 
     # One final check to see if there's anything in the buffer to flush
     # E.g., metadata has been set and start == available, but the log file
     # didn't end in \r\n, so we were unable to flush out the final contents.
-    curr_bytes = stream.getvalue()
-    if curr_bytes:
-        print(curr_bytes.decode('utf-8', errors='ignore'))
+    _flush_buffer(buffer)
 
     build_status = _get_run_status(metadata).lower()
     logger.debug("status was: '%s'", build_status)
@@ -191,6 +184,52 @@ def _stream_logs(no_format,  # pylint: disable=too-many-locals, too-many-stateme
             raise CLIError("Run was canceled")
 
 
+def _flush_buffer(buffer):
+    if buffer:
+        print(buffer.decode('utf-8', errors='ignore'))
+        del buffer[:]
+
+
+class _LogFileWriter(object):
+    """ Writes the raw log to a file from a background thread, so a slow disk doesn't hold up the output. """
+
+    def __init__(self, path):
+        import threading
+        from queue import Queue
+
+        self._path = path
+        try:
+            self._file = open(path, 'wb')
+        except (IOError, OSError) as ex:
+            raise CLIError("Failed to open the log file '{}': {}".format(path, ex))
+        self._queue = Queue()
+        self._error = None
+        self._thread = threading.Thread(target=self._write_chunks)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def write(self, chunk):
+        self._queue.put(chunk)
+
+    def _write_chunks(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            if self._error is None:
+                try:
+                    self._file.write(chunk)
+                except (IOError, OSError) as ex:
+                    self._error = ex
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+        if self._error is not None:
+            raise CLIError("Failed to write logs to '{}': {}".format(self._path, self._error))
+
+
 def _blob_is_not_complete(metadata):
     if not metadata:
         return True
@@ -0,0 +1,93 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import io
+import os
+import re
+import shutil
+import tarfile
+import tempfile
+import threading
+import unittest
+
+import mock
+
+from azure.cli.command_modules.acr._archive_utils import (
+    _pack_source_code, _upload_blocks, _load_dockerignore_file, _compile_ignore_list)
+
+
+class _BlobBlock(object):  # pylint: disable=too-few-public-methods
+    def __init__(self, id=None):  # pylint: disable=redefined-builtin
+        self.id = id
+
+
+class TestAcrArchiveUtils(unittest.TestCase):
+
+    def setUp(self):
+        self.source_dir = tempfile.mkdtemp()
+        for path in ['Dockerfile', 'src/app.py', 'src/app.pyc', 'docs/readme.md', 'docs/keep.md', '.git/HEAD']:
+            full_path = os.path.join(self.source_dir, path)
+            if not os.path.isdir(os.path.dirname(full_path)):
+                os.makedirs(os.path.dirname(full_path))
+            with open(full_path, 'wb') as f:
+                f.write(os.urandom(1024))
+        with open(os.path.join(self.source_dir, '.dockerignore'), 'w') as f:
+            f.write('# comment\n**/*.pyc\ndocs\n!docs/keep.md\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.source_dir)
+
+    def test_compiled_ignore_list_matches_highest_priority_rule(self):
+        ignore_list, _ = _load_dockerignore_file(self.source_dir)
+        regex = _compile_ignore_list(ignore_list)
+        for name in ['docs', 'docs/keep.md', 'docs/readme.md', 'src/app.pyc', 'src/app.py', 'a/b/c.pyc']:
+            expected = next((i for i, item in enumerate(ignore_list) if re.match(item.pattern, name)), None)
+            match = regex.match(name)
+            self.assertEqual(int(match.lastgroup[1:]) if match else None, expected, name)
+        self.assertIsNone(_compile_ignore_list([]))
+
+    def test_upload_blocks_while_packing(self):
+        tar_file_path = os.path.join(tempfile.gettempdir(), 'test_archive.tar.gz')
+        blocks = {}
+        lock = threading.Lock()
+
+        def _put_block(container_name, blob_name, block, block_id):
+            with lock:
+                blocks[block_id] = block
+
+        blob_service = mock.MagicMock()
+        blob_service.put_block.side_effect = _put_block
+        with mock.patch('azure.cli.command_modules.acr._archive_utils.UPLOAD_BLOCK_SIZE', 1000):
+            size = _upload_blocks(blob_service, 'container', 'blob', _BlobBlock, 3,
+                                  lambda fileobj: _pack_source_code(self.source_dir, tar_file_path,
+                                                                    os.path.join(self.source_dir, 'Dockerfile'),
+                                                                    'uploaded_Dockerfile', fileobj=fileobj))
+
+        self.assertFalse(os.path.exists(tar_file_path))
+        block_list = blob_service.put_block_list.call_args[0][2]
+        self.assertTrue(len(block_list) > 1)
+        content = b''.join(blocks[block.id] for block in block_list)
+        self.assertEqual(len(content), size)
+        with tarfile.open(fileobj=io.BytesIO(content), mode='r:gz') as tar:
+            names = sorted(tar.getnames())
+        self.assertEqual(names, ['', '.dockerignore', 'Dockerfile', 'docs/keep.md', 'src', 'src/app.py',
+                                 'uploaded_Dockerfile'])
+
+    def test_upload_blocks_failure(self):
+        blob_service = mock.MagicMock()
+        blob_service.put_block.side_effect = ValueError('upload failed')
+
+        def _write(fileobj):
+            for _ in range(20):
+                fileobj.write(b'0' * 1000)
+
+        with mock.patch('azure.cli.command_modules.acr._archive_utils.UPLOAD_BLOCK_SIZE', 1000):
+            with self.assertRaisesRegex(ValueError, 'upload failed'):
+                _upload_blocks(blob_service, 'container', 'blob', _BlobBlock, 2, _write)
+        blob_service.put_block_list.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
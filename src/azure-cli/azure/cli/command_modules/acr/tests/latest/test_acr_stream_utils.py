@@ -0,0 +1,87 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+from knack.util import CLIError
+
+from azure.cli.command_modules.acr._stream_utils import _stream_logs
+
+
+class _AppendBlobService(object):
+    """ Serves a log which grows by one entry of `appends` each time its properties are read. """
+
+    def __init__(self, appends, status='Succeeded'):
+        self._appends = list(appends)
+        self._status = status
+        self.content = b''
+        self.ranges = []
+
+    def get_blob_properties(self, container_name, blob_name):  # pylint: disable=unused-argument
+        if self._appends:
+            self.content += self._appends.pop(0)
+        props = mock.MagicMock()
+        props.metadata = {} if self._appends else {'Complete': self._status}
+        props.properties.content_length = len(self.content)
+        return props
+
+    def get_blob_to_bytes(self, container_name, blob_name, start_range, end_range,  # pylint: disable=unused-argument
+                          max_connections):
+        self.ranges.append((start_range, end_range))
+        blob = mock.MagicMock()
+        blob.content = self.content[start_range:end_range + 1]
+        return blob
+
+
+class TestAcrStreamUtils(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    @mock.patch('time.sleep')
+    @mock.patch('azure.cli.command_modules.acr._stream_utils.print')
+    def test_stream_logs(self, mock_print, sleep):
+        appends = [b'line 1\r\nline', b' 2\r', b'', b'', b'', b'\nline 3\r\n' + b'x' * 9000 + b'\r\n', b'', b'tail']
+        blob_service = _AppendBlobService(appends)
+        log_file = os.path.join(self.temp_dir, 'run.log')
+
+        _stream_logs(True, 1024, 60, blob_service, 'container', 'blob', True, log_file=log_file)
+
+        self.assertEqual([c[0][0] for c in mock_print.call_args_list],
+                         ['line 1\r', 'line 2\r\nline 3\r\n' + 'x' * 9000 + '\r', 'tail'])
+        # everything available is read with a single request
+        self.assertIn((15, 15 + 9011 - 1), blob_service.ranges)
+        with open(log_file, 'rb') as f:
+            self.assertEqual(f.read(), b''.join(appends))
+        # the polling interval backs off while the log is idle and shortens once it grows again
+        self.assertEqual(len(sleep.call_args_list), 4)
+        intervals = [c[0][0] for c in sleep.call_args_list]
+        self.assertTrue(intervals[0] < intervals[1] < intervals[2])
+        self.assertTrue(intervals[3] < intervals[2])
+
+    @mock.patch('time.sleep')
+    @mock.patch('azure.cli.command_modules.acr._stream_utils.print')
+    def test_stream_logs_failed_run(self, mock_print, _):
+        blob_service = _AppendBlobService([b'error\r\n'], status='Failed')
+        with self.assertRaisesRegex(CLIError, 'Run failed'):
+            _stream_logs(True, 1024, 60, blob_service, 'container', 'blob', True)
+        mock_print.assert_called_once_with('error\r')
+
+    def test_stream_logs_to_missing_directory(self):
+        blob_service = _AppendBlobService([b'line 1\r\n'])
+        log_file = os.path.join(self.temp_dir, 'missing', 'run.log')
+        with self.assertRaisesRegex(CLIError, 'Failed to open the log file'):
+            _stream_logs(True, 1024, 60, blob_service, 'container', 'blob', True, log_file=log_file)
+
+
+if __name__ == '__main__':
+    unittest.main()
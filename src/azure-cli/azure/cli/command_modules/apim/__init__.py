@@ -4,7 +4,6 @@
 # --------------------------------------------------------------------------------------------
 
 from azure.cli.core import AzCommandsLoader
-from azure.cli.command_modules.apim._help import helps  # pylint: disable=unused-import
 
 
 class ApimCommandsLoader(AzCommandsLoader):
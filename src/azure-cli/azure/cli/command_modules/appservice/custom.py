@@ -62,6 +62,11 @@ from ._constants import (FUNCTIONS_VERSION_TO_DEFAULT_RUNTIME_VERSION, FUNCTIONS
 
 logger = get_logger(__name__)
 
+# seconds
+ZIP_DEPLOY_STATUS_TIMEOUT = 900
+ZIP_DEPLOY_STATUS_MIN_POLL_INTERVAL = 1
+ZIP_DEPLOY_STATUS_MAX_POLL_INTERVAL = 8
+
 # pylint:disable=no-member,too-many-lines,too-many-locals
 
 # region "Common routines shared with quick-start extensions."
@@ -379,25 +384,66 @@ def enable_zip_deploy(cmd, resource_group_name, name, src, timeout=None, slot=No
     import requests
     import os
     from azure.cli.core.util import should_disable_connection_verify
-    # Read file content
-    with open(os.path.realpath(os.path.expanduser(src)), 'rb') as fs:
-        zip_content = fs.read()
-        logger.warning("Starting zip deployment. This operation can take a while to complete ...")
-        res = requests.post(zip_url, data=zip_content, headers=headers, verify=not should_disable_connection_verify())
-        logger.warning("Deployment endpoint responded with status code %d", res.status_code)
-
-    # check if there's an ongoing process
-    if res.status_code == 409:
-        raise CLIError("There may be an ongoing deployment or your app setting has WEBSITE_RUN_FROM_PACKAGE. "
-                       "Please track your deployment in {} and ensure the WEBSITE_RUN_FROM_PACKAGE app setting "
-                       "is removed.".format(deployment_status_url))
-
-    # check the status of async deployment
-    response = _check_zip_deployment_status(cmd, resource_group_name, name, deployment_status_url,
-                                            authorization, timeout)
+    src_path = os.path.realpath(os.path.expanduser(src))
+    with requests.Session() as session:
+        session.verify = not should_disable_connection_verify()
+        # Stream the file instead of reading it into memory, large packages don't fit on small build agents
+        with open(src_path, 'rb') as fs:
+            logger.warning("Starting zip deployment. This operation can take a while to complete ...")
+            body = _UploadStream(fs, os.path.getsize(src_path), _get_upload_progress_callback(cmd))
+            res = session.post(zip_url, data=body, headers=headers)
+            logger.warning("Deployment endpoint responded with status code %d", res.status_code)
+
+        # check if there's an ongoing process
+        if res.status_code == 409:
+            raise CLIError("There may be an ongoing deployment or your app setting has WEBSITE_RUN_FROM_PACKAGE. "
+                           "Please track your deployment in {} and ensure the WEBSITE_RUN_FROM_PACKAGE app setting "
+                           "is removed.".format(deployment_status_url))
+
+        # check the status of async deployment
+        response = _check_zip_deployment_status(cmd, resource_group_name, name, deployment_status_url,
+                                                authorization, timeout, session=session)
     return response
 
 
+class _UploadStream(object):
+    """A file-like request body which reports how much of the file was sent."""
+
+    def __init__(self, file_obj, size, progress_callback=None):
+        self._file = file_obj
+        self._size = size
+        self._sent = 0
+        self._progress_callback = progress_callback
+
+    def __len__(self):
+        # lets requests send a Content-Length header instead of a chunked body
+        return self._size
+
+    def read(self, size=-1):
+        chunk = self._file.read(size)
+        self._sent += len(chunk)
+        if chunk and self._progress_callback:
+            self._progress_callback(self._sent, self._size)
+        return chunk
+
+
+def _get_upload_progress_callback(cmd):
+    hook = cmd.cli_ctx.get_progress_controller(det=True)
+    last_percent = [-1]
+
+    def _update_progress(current, total):
+        if not total:
+            return
+        # the body is read in small blocks, only redraw when the percentage changes
+        percent = int(100 * current / total)
+        if percent != last_percent[0]:
+            last_percent[0] = percent
+            hook.add(message='Uploading', value=current, total_val=total)
+        if current >= total:
+            hook.end()
+    return _update_progress
+
+
 def add_remote_build_app_settings(cmd, resource_group_name, name, slot):
     settings = get_app_settings(cmd, resource_group_name, name, slot)
     scm_do_build_during_deployment = None
@@ -2767,22 +2813,29 @@ def list_locations(cmd, sku, linux_workers_enabled=None):
     return [geo_region for geo_region in web_client_geo_regions if geo_region.name in providers_client_locations_list]
 
 
-def _check_zip_deployment_status(cmd, rg_name, name, deployment_status_url, authorization, timeout=None):
+def _check_zip_deployment_status(cmd, rg_name, name, deployment_status_url, authorization, timeout=None,
+                                 session=None):
     import requests
     from azure.cli.core.util import should_disable_connection_verify
-    total_trials = (int(timeout) // 2) if timeout else 450
-    num_trials = 0
-    while num_trials < total_trials:
-        time.sleep(2)
-        response = requests.get(deployment_status_url, headers=authorization,
-                                verify=not should_disable_connection_verify())
+    if session is None:
+        with requests.Session() as new_session:
+            new_session.verify = not should_disable_connection_verify()
+            return _check_zip_deployment_status(cmd, rg_name, name, deployment_status_url, authorization,
+                                                timeout=timeout, session=new_session)
+
+    # Poll on one connection, quickly at first and less often as the deployment goes on
+    deadline = time.time() + (int(timeout) if timeout else ZIP_DEPLOY_STATUS_TIMEOUT)
+    delay = ZIP_DEPLOY_STATUS_MIN_POLL_INTERVAL
+    res_dict = {}
+    while time.time() < deadline:
+        time.sleep(min(delay, max(0, deadline - time.time())))
+        delay = min(delay * 2, ZIP_DEPLOY_STATUS_MAX_POLL_INTERVAL)
+        response = session.get(deployment_status_url, headers=authorization)
         try:
             res_dict = response.json()
         except json.decoder.JSONDecodeError:
             logger.warning("Deployment status endpoint %s returns malformed data. Retrying...", deployment_status_url)
             res_dict = {}
-        finally:
-            num_trials = num_trials + 1
 
         if res_dict.get('status', 0) == 3:
             _configure_default_logging(cmd, rg_name, name)
@@ -183,6 +183,63 @@ class TestFunctionappMocked(unittest.TestCase):
         get_site_credential_mock.assert_called_with(cmd_mock.cli_ctx, 'rg', 'name', None)
         get_scm_url_mock.assert_called_with(cmd_mock, 'rg', 'name', None)
 
+    @mock.patch('azure.cli.command_modules.appservice.custom._check_zip_deployment_status', return_value={'status': 4})
+    @mock.patch('azure.cli.command_modules.appservice.custom._get_site_credential', return_value=('usr', 'pwd'))
+    @mock.patch('azure.cli.command_modules.appservice.custom._get_scm_url', return_value='https://scm')
+    @mock.patch('requests.Session')
+    def test_enable_zip_deploy_streams_file(self, session_mock, get_scm_url_mock, get_site_credential_mock,
+                                           check_status_mock):
+        import tempfile
+        # prepare
+        cmd_mock = _get_test_cmd()
+        cmd_mock.cli_ctx = mock.MagicMock()
+        hook = cmd_mock.cli_ctx.get_progress_controller.return_value
+        content = os.urandom(100000)
+        with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as f:
+            f.write(content)
+        self.addCleanup(os.remove, f.name)
+        session = session_mock.return_value.__enter__.return_value
+        uploaded = []
+
+        def _post(url, data, headers):
+            self.assertEqual(len(data), len(content))
+            while True:
+                chunk = data.read(8192)
+                if not chunk:
+                    break
+                uploaded.append(chunk)
+            return mock.MagicMock(status_code=202)
+        session.post.side_effect = _post
+
+        # action
+        result = enable_zip_deploy(cmd_mock, 'rg', 'name', f.name)
+
+        # assert
+        self.assertEqual(result, {'status': 4})
+        self.assertEqual(b''.join(uploaded), content)
+        self.assertEqual(session.post.call_args[0][0], 'https://scm/api/zipdeploy?isAsync=true')
+        hook.add.assert_called_with(message='Uploading', value=len(content), total_val=len(content))
+        self.assertLessEqual(hook.add.call_count, 101)
+        hook.end.assert_called_once_with()
+        self.assertIs(check_status_mock.call_args[1]['session'], session)
+
+    @mock.patch('time.sleep')
+    def test_check_zip_deployment_status_backs_off(self, sleep_mock):
+        from azure.cli.command_modules.appservice.custom import _check_zip_deployment_status
+        # prepare
+        session = mock.MagicMock()
+        responses = [{'status': 1, 'progress': 'building'}] * 5 + [{'status': 4}]
+        session.get.side_effect = [mock.MagicMock(**{'json.return_value': r}) for r in responses]
+
+        # action
+        result = _check_zip_deployment_status(_get_test_cmd(), 'rg', 'name', 'https://scm/api/deployments/latest',
+                                              {'authorization': 'Basic abc'}, session=session)
+
+        # assert
+        self.assertEqual(result, {'status': 4})
+        self.assertEqual(session.get.call_count, 6)
+        self.assertEqual([round(c[0][0]) for c in sleep_mock.call_args_list], [1, 2, 4, 8, 8, 8])
+
     @mock.patch('azure.cli.command_modules.appservice.custom._get_app_settings_from_scm', return_value={
         'SCM_DO_BUILD_DURING_DEPLOYMENT': 'true'
     })
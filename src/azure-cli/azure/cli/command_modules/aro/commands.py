@@ -7,7 +7,6 @@ from azure.cli.core.commands import CliCommandType
 from azure.cli.command_modules.aro._client_factory import cf_aro
 from azure.cli.command_modules.aro._format import aro_show_table_format
 from azure.cli.command_modules.aro._format import aro_list_table_format
-from azure.cli.command_modules.aro._help import helps  # pylint: disable=unused-import
 
 
 def load_command_table(self, _):
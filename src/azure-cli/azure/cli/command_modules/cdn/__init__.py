@@ -2,8 +2,6 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
-# pylint: disable=unused-import
-import azure.cli.command_modules.cdn._help
 
 from azure.cli.core import AzCommandsLoader
 
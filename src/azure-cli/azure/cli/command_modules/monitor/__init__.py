@@ -6,8 +6,6 @@
 from azure.cli.core import AzCommandsLoader
 from azure.cli.core.commands import AzArgumentContext, CliCommandType
 
-from azure.cli.command_modules.monitor._help import helps  # pylint: disable=unused-import
-
 
 # pylint: disable=line-too-long
 class MonitorArgumentContext(AzArgumentContext):
@@ -8,8 +8,6 @@
 from azure.cli.core import AzCommandsLoader
 from azure.cli.core.profiles import ResourceType
 
-from ._help import helps  # pylint: disable=unused-import
-
 
 class NatGatewayCommandsLoader(AzCommandsLoader):
 
@@ -2201,6 +2201,9 @@ examples:
   - name: Export a DNS zone as a DNS zone file.
     text: >
         az network dns zone export -g MyResourceGroup -n www.mysite.com -f mysite_com_zone.txt
+  - name: Export only the A and CNAME records of a DNS zone.
+    text: >
+        az network dns zone export -g MyResourceGroup -n www.mysite.com -f mysite_com_zone.txt --record-types a cname
 """
 
 helps['network dns zone import'] = """
@@ -2210,6 +2213,9 @@ examples:
   - name: Import a local zone file into a DNS zone resource.
     text: >
         az network dns zone import -g MyResourceGroup -n MyZone -f /path/to/zone/file
+  - name: Resume an interrupted import, writing only the record sets which are missing or differ.
+    text: >
+        az network dns zone import -g MyResourceGroup -n MyZone -f /path/to/zone/file --incremental
 """
 
 helps['network dns zone list'] = """
@@ -545,9 +545,12 @@ def load_arguments(self, _):
 
     with self.argument_context('network dns zone import') as c:
         c.argument('file_name', options_list=['--file-name', '-f'], type=file_type, completer=FilesCompleter(), help='Path to the DNS zone file to import')
+        c.argument('concurrency', type=int, help='The maximum number of record sets written at the same time.')
+        c.argument('incremental', action='store_true', help='Only write the record sets which are not in the zone with the same TTL and records already, e.g. to resume an interrupted import.')
 
     with self.argument_context('network dns zone export') as c:
         c.argument('file_name', options_list=['--file-name', '-f'], type=file_type, completer=FilesCompleter(), help='Path to the DNS zone file to save')
+        c.argument('record_types', nargs='+', arg_type=get_enum_type(['a', 'aaaa', 'caa', 'cname', 'mx', 'ns', 'ptr', 'soa', 'srv', 'txt']), help='Space-separated types of the record sets to export. The SOA record is always exported.')
 
     with self.argument_context('network dns zone update') as c:
         c.ignore('if_none_match')
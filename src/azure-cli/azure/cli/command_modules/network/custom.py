@@ -4,7 +4,7 @@
 # --------------------------------------------------------------------------------------------
 from __future__ import print_function
 
-from collections import Counter, OrderedDict
+from collections import Counter
 
 from msrestazure.azure_exceptions import CloudError
 from msrestazure.tools import parse_resource_id, is_valid_resource_id, resource_id
@@ -21,12 +21,17 @@ from azure.cli.core.util import CLIError, sdk_no_wait, find_child_item, find_chi
 from azure.cli.command_modules.network._client_factory import network_client_factory
 
 from azure.cli.command_modules.network.zone_file.parse_zone_file import parse_zone_file
-from azure.cli.command_modules.network.zone_file.make_zone_file import make_zone_file
+from azure.cli.command_modules.network.zone_file.make_zone_file import (
+    write_zone_file_header, write_zone_file_records)
 from azure.cli.core.profiles import ResourceType, supported_api_version
 
 
 logger = get_logger(__name__)
 
+DNS_IMPORT_CONCURRENCY = 8
+# retries of record set writes throttled by the service
+DNS_IMPORT_THROTTLING_RETRIES = 5
+
 
 # region Utility methods
 def _log_pprint_template(template):
@@ -1569,81 +1574,155 @@ def _type_to_property_name(key):
     return type_dict[key.lower()]
 
 
-def export_zone(cmd, resource_group_name, zone_name, file_name=None):
+def export_zone(cmd, resource_group_name, zone_name, file_name=None, record_types=None):
+    import os
+    import tempfile
+    from itertools import chain
     from time import localtime, strftime
+    from six import StringIO
 
     client = get_mgmt_service_client(cmd.cli_ctx, ResourceType.MGMT_NETWORK_DNS)
-    record_sets = client.record_sets.list_by_dns_zone(resource_group_name, zone_name)
-
-    zone_obj = OrderedDict({
-        '$origin': zone_name.rstrip('.') + '.',
-        'resource-group': resource_group_name,
-        'zone-name': zone_name.rstrip('.'),
-        'datetime': strftime('%a, %d %b %Y %X %z', localtime())
-    })
-
-    for record_set in record_sets:
-        record_type = record_set.type.rsplit('/', 1)[1].lower()
-        record_set_name = record_set.name
-        record_data = getattr(record_set, _type_to_property_name(record_type), None)
-
-        # ignore empty record sets
-        if not record_data:
-            continue
+    if record_types:
+        # the SOA record is always exported
+        record_types = ['SOA'] + [record_type.upper() for record_type in record_types if record_type != 'soa']
+        record_sets = chain.from_iterable(
+            client.record_sets.list_by_type(resource_group_name, zone_name, record_type)
+            for record_type in record_types)
+    else:
+        record_sets = client.record_sets.list_by_dns_zone(resource_group_name, zone_name)
 
-        if not isinstance(record_data, list):
-            record_data = [record_data]
-
-        if record_set_name not in zone_obj:
-            zone_obj[record_set_name] = OrderedDict()
-
-        for record in record_data:
-
-            record_obj = {'ttl': record_set.ttl}
-
-            if record_type not in zone_obj[record_set_name]:
-                zone_obj[record_set_name][record_type] = []
-
-            if record_type == 'aaaa':
-                record_obj.update({'ip': record.ipv6_address})
-            elif record_type == 'a':
-                record_obj.update({'ip': record.ipv4_address})
-            elif record_type == 'caa':
-                record_obj.update({'val': record.value, 'tag': record.tag, 'flags': record.flags})
-            elif record_type == 'cname':
-                record_obj.update({'alias': record.cname.rstrip('.') + '.'})
-            elif record_type == 'mx':
-                record_obj.update({'preference': record.preference, 'host': record.exchange})
-            elif record_type == 'ns':
-                record_obj.update({'host': record.nsdname})
-            elif record_type == 'ptr':
-                record_obj.update({'host': record.ptrdname})
-            elif record_type == 'soa':
-                record_obj.update({
-                    'mname': record.host.rstrip('.') + '.',
-                    'rname': record.email.rstrip('.') + '.',
-                    'serial': int(record.serial_number), 'refresh': record.refresh_time,
-                    'retry': record.retry_time, 'expire': record.expire_time,
-                    'minimum': record.minimum_ttl
-                })
-                zone_obj['$ttl'] = record.minimum_ttl
-            elif record_type == 'srv':
-                record_obj.update({'priority': record.priority, 'weight': record.weight,
-                                   'port': record.port, 'target': record.target})
-            elif record_type == 'txt':
-                record_obj.update({'txt': ''.join(record.value)})
-
-            zone_obj[record_set_name][record_type].append(record_obj)
-
-    zone_file_content = make_zone_file(zone_obj)
-    print(zone_file_content)
+    zone_name = zone_name.rstrip('.')
+    zone_file = temp_path = None
     if file_name:
+        # the records are written to a temp file that replaces the zone file once all of them are exported
         try:
-            with open(file_name, 'w') as f:
-                f.write(zone_file_content)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file_name)),
+                                             prefix=os.path.basename(file_name) + '.', suffix='.tmp')
+            zone_file = os.fdopen(fd, 'w')
         except IOError:
             raise CLIError('Unable to export to file: {}'.format(file_name))
 
+    def _write(write_fn, *args):
+        # record sets are written one at a time as the pages of the listing arrive
+        chunk = StringIO()
+        write_fn(chunk, *args)
+        print(chunk.getvalue(), end='')
+        if zone_file:
+            try:
+                zone_file.write(chunk.getvalue())
+            except IOError:
+                raise CLIError('Unable to export to file: {}'.format(file_name))
+
+    def _write_record_set(record_set, record_type, previous_name):
+        records = _get_zone_file_records(record_set, record_type)
+        # empty record sets are ignored
+        if not records:
+            return previous_name
+        # consecutive record sets of the same name share it, as the records of a name do
+        _write(write_zone_file_records, zone_name, record_set.name, {record_type: records},
+               record_set.name != previous_name)
+        return record_set.name
+
+    try:
+        # the SOA record goes first, its minimum TTL is the default TTL of the zone file. The record sets listed
+        # before it are held back until it arrives.
+        soa_record_set = None
+        pending = []
+        previous_name = '@'
+        for record_set in record_sets:
+            record_type = record_set.type.rsplit('/', 1)[1].lower()
+            if record_type == 'soa':
+                soa_record_set = record_set
+                _write(write_zone_file_header, zone_name, resource_group_name,
+                       strftime('%a, %d %b %Y %X %z', localtime()), soa_record_set.soa_record.minimum_ttl,
+                       zone_name + '.')
+                _write(write_zone_file_records, zone_name, '@', {'soa': _get_zone_file_records(record_set, 'soa')})
+                for pending_record_set, pending_record_type in pending:
+                    previous_name = _write_record_set(pending_record_set, pending_record_type, previous_name)
+                pending = []
+            elif soa_record_set is None:
+                pending.append((record_set, record_type))
+            else:
+                previous_name = _write_record_set(record_set, record_type, previous_name)
+        if soa_record_set is None:
+            raise CLIError('Unable to export DNS zone {}: it has no SOA record.'.format(zone_name))
+
+        if zone_file:
+            try:
+                zone_file.close()
+                _set_export_file_mode(temp_path, file_name)
+                os.replace(temp_path, file_name)
+            except IOError:
+                raise CLIError('Unable to export to file: {}'.format(file_name))
+        print()
+    except BaseException:
+        # a failed or interrupted export leaves an existing zone file as it was
+        if zone_file:
+            zone_file.close()
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        raise
+
+
+def _set_export_file_mode(temp_path, file_name):
+    # temp files are private to the owner, give the zone file the mode an existing one has or open() would give it
+    import os
+    import stat
+    if os.path.exists(file_name):
+        mode = stat.S_IMODE(os.stat(file_name).st_mode)
+    else:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    os.chmod(temp_path, mode)
+
+
+def _get_zone_file_records(record_set, record_type):
+    record_data = getattr(record_set, _type_to_property_name(record_type), None)
+    if not record_data:
+        return []
+
+    if not isinstance(record_data, list):
+        record_data = [record_data]
+
+    records = []
+    for record in record_data:
+
+        record_obj = {'ttl': record_set.ttl}
+
+        if record_type == 'aaaa':
+            record_obj.update({'ip': record.ipv6_address})
+        elif record_type == 'a':
+            record_obj.update({'ip': record.ipv4_address})
+        elif record_type == 'caa':
+            record_obj.update({'val': record.value, 'tag': record.tag, 'flags': record.flags})
+        elif record_type == 'cname':
+            record_obj.update({'alias': record.cname.rstrip('.') + '.'})
+        elif record_type == 'mx':
+            record_obj.update({'preference': record.preference, 'host': record.exchange})
+        elif record_type == 'ns':
+            record_obj.update({'host': record.nsdname})
+        elif record_type == 'ptr':
+            record_obj.update({'host': record.ptrdname})
+        elif record_type == 'soa':
+            record_obj.update({
+                'mname': record.host.rstrip('.') + '.',
+                'rname': record.email.rstrip('.') + '.',
+                'serial': int(record.serial_number), 'refresh': record.refresh_time,
+                'retry': record.retry_time, 'expire': record.expire_time,
+                'minimum': record.minimum_ttl
+            })
+        elif record_type == 'srv':
+            record_obj.update({'priority': record.priority, 'weight': record.weight,
+                               'port': record.port, 'target': record.target})
+        elif record_type == 'txt':
+            record_obj.update({'txt': ''.join(record.value)})
+
+        records.append(record_obj)
+    return records
+
 
 # pylint: disable=too-many-return-statements, inconsistent-return-statements
 def _build_record(cmd, data):
@@ -1683,15 +1762,16 @@ def _build_record(cmd, data):
                        .format(record_type, data['name'], ke))
 
 
-# pylint: disable=too-many-statements
-def import_zone(cmd, resource_group_name, zone_name, file_name):
-    from azure.cli.core.util import read_file_content
+# pylint: disable=too-many-statements, too-many-locals
+def import_zone(cmd, resource_group_name, zone_name, file_name, concurrency=DNS_IMPORT_CONCURRENCY,
+                incremental=False):
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from azure.cli.core.util import iter_file_lines
     import sys
     logger.warning("In the future, zone name will be case insensitive.")
     RecordSet = cmd.get_models('RecordSet', resource_type=ResourceType.MGMT_NETWORK_DNS)
 
-    file_text = read_file_content(file_name)
-    zone_obj = parse_zone_file(file_text, zone_name)
+    zone_obj = parse_zone_file(iter_file_lines(file_name), zone_name)
 
     origin = zone_name
     record_sets = {}
@@ -1731,22 +1811,21 @@ def import_zone(cmd, resource_group_name, zone_name, file_name):
                 _add_record(record_set, record, record_set_type,
                             is_list=record_set_type.lower() not in ['soa', 'cname'])
 
-    total_records = 0
-    for key, rs in record_sets.items():
-        rs_name, rs_type = key.lower().rsplit('.', 1)
-        rs_name = rs_name[:-(len(origin) + 1)] if rs_name != origin else '@'
-        try:
-            record_count = len(getattr(rs, _type_to_property_name(rs_type)))
-        except TypeError:
-            record_count = 1
-        total_records += record_count
-    cum_records = 0
-
     client = get_mgmt_service_client(cmd.cli_ctx, ResourceType.MGMT_NETWORK_DNS)
     print('== BEGINNING ZONE IMPORT: {} ==\n'.format(zone_name), file=sys.stderr)
 
     Zone = cmd.get_models('Zone', resource_type=ResourceType.MGMT_NETWORK_DNS)
     client.zones.create_or_update(resource_group_name, zone_name, Zone(location='global'))
+
+    # with --incremental, record sets which are in the zone already are compared with a single listing of the zone
+    existing = {}
+    if incremental:
+        existing = {(rs.name.lower(), rs.type.rsplit('/', 1)[1].lower()): rs
+                    for rs in client.record_sets.list_by_dns_zone(resource_group_name, zone_name)}
+
+    total_records = 0
+    skipped_records = 0
+    imports = []
     for key, rs in record_sets.items():
 
         rs_name, rs_type = key.lower().rsplit('.', 1)
@@ -1758,6 +1837,7 @@ def import_zone(cmd, resource_group_name, zone_name, file_name):
             record_count = len(getattr(rs, _type_to_property_name(rs_type)))
         except TypeError:
             record_count = 1
+        total_records += record_count
         if rs_name == '@' and rs_type == 'soa':
             root_soa = client.record_sets.get(resource_group_name, zone_name, '@', 'SOA')
             rs.soa_record.host = root_soa.soa_record.host
@@ -1767,18 +1847,65 @@ def import_zone(cmd, resource_group_name, zone_name, file_name):
             root_ns.ttl = rs.ttl
             rs = root_ns
             rs_type = rs.type.rsplit('/', 1)[1]
-        try:
-            client.record_sets.create_or_update(
-                resource_group_name, zone_name, rs_name, rs_type, rs)
-            cum_records += record_count
-            print("({}/{}) Imported {} records of type '{}' and name '{}'"
-                  .format(cum_records, total_records, record_count, rs_type, rs_name), file=sys.stderr)
-        except CloudError as ex:
-            logger.error(ex)
+        if _record_set_matches(existing.get((rs_name, rs_type.lower())), rs, rs_type):
+            skipped_records += record_count
+            continue
+        imports.append((rs_name, rs_type, rs, record_count))
+    if incremental:
+        print('Skipping {} records already in the zone\n'.format(skipped_records), file=sys.stderr)
+
+    cum_records = skipped_records
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+        futures = {executor.submit(_create_or_update_record_set, client, resource_group_name, zone_name,
+                                   rs_name, rs_type, rs): (rs_name, rs_type, record_count)
+                   for rs_name, rs_type, rs, record_count in imports}
+        for future in as_completed(futures):
+            rs_name, rs_type, record_count = futures[future]
+            try:
+                future.result()
+                cum_records += record_count
+                print("({}/{}) Imported {} records of type '{}' and name '{}'"
+                      .format(cum_records, total_records, record_count, rs_type, rs_name), file=sys.stderr)
+            except CloudError as ex:
+                logger.error(ex)
     print("\n== {}/{} RECORDS IMPORTED SUCCESSFULLY: '{}' =="
           .format(cum_records, total_records, zone_name), file=sys.stderr)
 
 
+def _record_set_matches(existing, record_set, record_type):
+    """ Whether a record set of the zone has the TTL and records of a record set to import. Records are compared in
+    their serialized form since those built from a zone file hold numbers as strings. """
+    import json
+
+    def _records(rs):
+        records = getattr(rs, _type_to_property_name(record_type))
+        if not isinstance(records, list):
+            records = [records]
+        return sorted(json.dumps(r.serialize(), sort_keys=True) for r in records if r is not None)
+
+    return existing is not None and existing.ttl == record_set.ttl and _records(existing) == _records(record_set)
+
+
+def _create_or_update_record_set(client, resource_group_name, zone_name, record_set_name, record_type, record_set):
+    """ Write a record set, backing off while the requests are throttled by the service beyond the retries of the
+    SDK. """
+    import time
+    from azure.cli.core.util import get_throttling_retry_delay
+    attempt = 1
+    while True:
+        try:
+            return client.record_sets.create_or_update(
+                resource_group_name, zone_name, record_set_name, record_type, record_set)
+        except CloudError as ex:
+            delay = get_throttling_retry_delay(ex, attempt) if attempt <= DNS_IMPORT_THROTTLING_RETRIES else None
+            if delay is None:
+                raise
+            logger.debug("Request throttled, retrying record set '%s' of type '%s' in %.1f seconds",
+                         record_set_name, record_type, delay)
+            time.sleep(delay)
+            attempt += 1
+
+
 def add_dns_aaaa_record(cmd, resource_group_name, zone_name, record_set_name, ipv6_address,
                         ttl=3600, if_none_match=None):
     AaaaRecord = cmd.get_models('AaaaRecord', resource_type=ResourceType.MGMT_NETWORK_DNS)
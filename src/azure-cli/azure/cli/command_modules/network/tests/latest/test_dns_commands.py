@@ -618,6 +618,14 @@ class DnsParseZoneFiles(unittest.TestCase):
         ])
         self._check_a(zone, '*.' + zn, [(3600, '2.3.4.5')])
 
+    def test_zone_file_lines(self):
+        from azure.cli.core.util import iter_file_lines
+        for i in range(1, 9):
+            file_name = 'zone{}.txt'.format(i)
+            zone_name = 'zone{}.com'.format(i)
+            lines = iter_file_lines(os.path.join(TEST_DIR, 'zone_files', file_name))
+            self.assertEqual(parse_zone_file(lines, zone_name), self._get_zone_object(file_name, zone_name))
+
     def test_zone_import_errors(self):
         from knack.util import CLIError
         for f in ['fail1', 'fail2', 'fail3', 'fail4', 'fail5']:
@@ -3,6 +3,11 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import copy
+import os
+import shutil
+import tempfile
+import threading
 import unittest
 
 import mock
@@ -76,6 +81,151 @@ class TestNetworkUnitTests(unittest.TestCase):
         self.assertEqual(len(result), 2)
         self.assertEqual(result[1].value, 'noodle')
 
+    @mock.patch('time.sleep')
+    @mock.patch('azure.cli.command_modules.network.custom.get_mgmt_service_client')
+    def test_network_dns_zone_import(self, client_factory, sleep):
+        from msrestazure.azure_exceptions import CloudError
+        from azure.mgmt.dns import models
+        from azure.cli.command_modules.network.custom import import_zone
+
+        def _record_set(name, record_type, ttl, **kwargs):
+            record_set = models.RecordSet(ttl=ttl, **kwargs)
+            record_set.name = name
+            record_set.type = 'Microsoft.Network/dnszones/' + record_type
+            return record_set
+
+        def _get_models(*names, **_):
+            return getattr(models, names[0]) if len(names) == 1 else [getattr(models, n) for n in names]
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        file_name = os.path.join(temp_dir, 'zone.txt')
+        with open(file_name, 'w') as f:
+            f.write('$TTL 3600\n'
+                    '@ IN SOA ns1.example.com. admin.example.com. (\n'
+                    '  1 3600 600 86400 300 ) ; comment\n'
+                    '@ IN NS ns1.example.com.\n'
+                    '@ IN MX 10 mail.example.com.\n'
+                    'www IN A 10.0.0.1\n'
+                    '    IN A 10.0.0.2\n'
+                    'mail 300 IN A 10.0.0.3\n')
+
+        root_soa = _record_set('@', 'SOA', 3600, soa_record=models.SoaRecord(
+            host='ns1-01.azure-dns.com.', email='admin.example.com.', serial_number=1, refresh_time=3600,
+            retry_time=600, expire_time=86400, minimum_ttl=300))
+        root_ns = _record_set('@', 'NS', 172800, ns_records=[models.NsRecord(nsdname='ns1-01.azure-dns.com.')])
+        written = {}
+        lock = threading.Lock()
+
+        def _create_or_update(resource_group_name, zone_name, name, record_type, record_set):
+            with lock:
+                if (name, record_type) == ('www', 'a') and ('www', 'a') not in written:
+                    written[(name, record_type)] = None
+                    resp = mock.MagicMock(status_code=429, headers={'Retry-After': '3'})
+                    raise CloudError(resp, error='throttled')
+                written[(name, record_type)] = record_set
+
+        client = client_factory.return_value
+        client.record_sets.get.side_effect = lambda rg, zone, name, record_type: \
+            copy.deepcopy(root_soa if record_type == 'SOA' else root_ns)
+        client.record_sets.create_or_update.side_effect = _create_or_update
+        cmd = mock.MagicMock()
+        cmd.get_models.side_effect = _get_models
+
+        import_zone(cmd, 'rg', 'example.com', file_name, concurrency=3)
+        self.assertEqual(sorted(written), [('@', 'NS'), ('@', 'mx'), ('@', 'soa'), ('mail', 'a'), ('www', 'a')])
+        self.assertEqual([r.ipv4_address for r in written[('www', 'a')].arecords], ['10.0.0.1', '10.0.0.2'])
+        self.assertEqual(written[('@', 'soa')].soa_record.host, 'ns1-01.azure-dns.com.')
+        self.assertEqual(written[('@', 'NS')].ttl, 3600)
+        # the throttled write is retried after the delay the service asked for
+        sleep.assert_called_once_with(3)
+
+        # an incremental import only writes the record sets which differ from those in the zone
+        client.record_sets.list_by_dns_zone.return_value = [
+            root_soa, root_ns,
+            _record_set('@', 'MX', 3600, mx_records=[models.MxRecord(preference=10, exchange='mail.example.com.')]),
+            _record_set('www', 'A', 3600, arecords=[models.ARecord(ipv4_address='10.0.0.2'),
+                                                    models.ARecord(ipv4_address='10.0.0.1')]),
+            _record_set('mail', 'A', 3600, arecords=[models.ARecord(ipv4_address='10.0.0.3')])]
+        root_soa.soa_record.serial_number = 2
+        written.clear()
+        written[('www', 'a')] = None
+        import_zone(cmd, 'rg', 'example.com', file_name, incremental=True)
+        self.assertEqual(sorted(k for k, v in written.items() if v), [('@', 'NS'), ('@', 'soa'), ('mail', 'a')])
+
+    @mock.patch('azure.cli.command_modules.network.custom.get_mgmt_service_client')
+    def test_network_dns_zone_export(self, client_factory):
+        from msrestazure.azure_exceptions import CloudError
+        from azure.mgmt.dns import models
+        from azure.cli.command_modules.network.custom import export_zone
+        from azure.cli.command_modules.network.zone_file import parse_zone_file
+
+        def _record_set(name, record_type, ttl, **kwargs):
+            record_set = models.RecordSet(ttl=ttl, **kwargs)
+            record_set.name = name
+            record_set.type = 'Microsoft.Network/dnszones/' + record_type
+            return record_set
+
+        root_soa = _record_set('@', 'SOA', 3600, soa_record=models.SoaRecord(
+            host='ns1-01.azure-dns.com.', email='admin.example.com.', serial_number=1, refresh_time=3600,
+            retry_time=600, expire_time=86400, minimum_ttl=300))
+        record_sets = [
+            _record_set('@', 'A', 3600, arecords=[models.ARecord(ipv4_address='10.0.0.1')]),
+            _record_set('@', 'MX', 3600, mx_records=[models.MxRecord(preference=10, exchange='mail.example.com.')]),
+            root_soa,
+            _record_set('empty', 'A', 3600, arecords=[]),
+            _record_set('mail', 'A', 300, arecords=[models.ARecord(ipv4_address='10.0.0.3')]),
+        ]
+        client = client_factory.return_value
+        client.record_sets.list_by_dns_zone.return_value = iter(record_sets)
+        client.record_sets.list_by_type.side_effect = lambda rg, zone, record_type: \
+            iter([r for r in record_sets if r.type.endswith('/' + record_type)])
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        file_name = os.path.join(temp_dir, 'zone.txt')
+        with mock.patch('azure.cli.command_modules.network.custom.print') as mock_print:
+            export_zone(mock.MagicMock(), 'rg', 'example.com', file_name)
+        with open(file_name) as f:
+            content = f.read()
+        self.assertEqual(''.join(c[0][0] for c in mock_print.call_args_list if c[0]), content)
+        # records of the same name follow each other without repeating it
+        self.assertIn('@ 3600 IN SOA', content)
+        self.assertIn('\n  3600 IN A 10.0.0.1\n', content)
+        zone = parse_zone_file(content, 'example.com')
+        self.assertEqual(list(zone), ['example.com.', 'mail.example.com.'])
+        self.assertEqual(list(zone['example.com.']), ['soa', 'a', 'mx'])
+        # the SOA record comes from the listing, the record sets listed before it are held back
+        client.record_sets.get.assert_not_called()
+        client.record_sets.list_by_type.assert_not_called()
+
+        # record types are filtered by the service, the SOA record is always exported
+        export_zone(mock.MagicMock(), 'rg', 'example.com', file_name, record_types=['soa', 'a'])
+        self.assertEqual(client.record_sets.list_by_type.call_args_list,
+                         [mock.call('rg', 'example.com', 'SOA'), mock.call('rg', 'example.com', 'A')])
+        with open(file_name) as f:
+            zone = parse_zone_file(f, 'example.com')
+        self.assertEqual(list(zone['example.com.']), ['soa', 'a'])
+        self.assertEqual(zone['mail.example.com.']['a'][0]['ttl'], 300)
+
+        # a failed export leaves the zone file as it was
+        def _fail_listing(*_):
+            yield record_sets[0]
+            raise CloudError(mock.MagicMock(status_code=500), 'Internal error')
+        client.record_sets.list_by_dns_zone.side_effect = _fail_listing
+        with self.assertRaises(CloudError):
+            export_zone(mock.MagicMock(), 'rg', 'example.com', file_name)
+        with open(file_name) as f:
+            self.assertEqual(list(parse_zone_file(f, 'example.com')['example.com.']), ['soa', 'a'])
+
+        # failures of the output aren't failures of the zone file
+        client.record_sets.list_by_dns_zone.side_effect = None
+        client.record_sets.list_by_dns_zone.return_value = iter(record_sets)
+        with mock.patch('azure.cli.command_modules.network.custom.print', side_effect=BrokenPipeError):
+            with self.assertRaises(BrokenPipeError):
+                export_zone(mock.MagicMock(), 'rg', 'example.com', file_name)
+        self.assertEqual(os.listdir(temp_dir), ['zone.txt'])
+
 
 if __name__ == '__main__':
     unittest.main()
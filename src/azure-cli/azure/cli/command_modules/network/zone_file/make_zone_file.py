@@ -26,6 +26,15 @@
 # pylint: skip-file
 from __future__ import print_function
 
+HEADER = """
+; Exported zone file from Azure DNS\n\
+;      Zone name: {zone_name}\n\
+;      Resource Group Name: {resource_group}\n\
+;      Date and time (UTC): {datetime}\n\n\
+$TTL {ttl}\n\
+$ORIGIN {origin}\n\
+    """
+
 
 def make_zone_file(json_obj):
     """
@@ -49,57 +58,74 @@ def make_zone_file(json_obj):
         "uri":     [ uri records ]
     }
     """
-    import azure.cli.command_modules.network.zone_file.record_processors as record_processors
     from six import StringIO
 
     zone_file = StringIO()
 
-    HEADER = """
-; Exported zone file from Azure DNS\n\
-;      Zone name: {zone_name}\n\
-;      Resource Group Name: {resource_group}\n\
-;      Date and time (UTC): {datetime}\n\n\
-$TTL {ttl}\n\
-$ORIGIN {origin}\n\
-    """
     zone_name = json_obj.pop('zone-name')
-    print(HEADER.format(
+    write_zone_file_header(
+        zone_file,
         zone_name=zone_name,
         resource_group=json_obj.pop('resource-group'),
         datetime=json_obj.pop('datetime'),
         ttl=json_obj.pop('$ttl'),
         origin=json_obj.pop('$origin')
-    ), file=zone_file)
+    )
 
     for record_set_name in json_obj.keys():
 
         record_set = json_obj[record_set_name]
-        if record_set_name.endswith(zone_name):
-            record_set_name = record_set_name[:-(len(zone_name) + 1)]
         if isinstance(record_set, str):
             # These are handled above so we can skip them
             continue
 
-        first_line = True
-        record_set_keys = list(record_set.keys())
-        if 'soa' in record_set_keys:
-            record_set_keys.remove('soa')
-            record_set_keys = ['soa'] + record_set_keys
+        write_zone_file_records(zone_file, zone_name, record_set_name, record_set)
+
+    result = zone_file.getvalue()
+    zone_file.close()
 
-        for record_type in record_set_keys:
+    return result
 
-            record = record_set[record_type]
-            if not isinstance(record, list):
-                record = [record]
 
-            for entry in record:
-                method = 'process_{}'.format(record_type.strip('$'))
-                getattr(record_processors, method)(zone_file, entry, record_set_name, first_line)
-                first_line = False
+def write_zone_file_header(zone_file, zone_name, resource_group, datetime, ttl, origin):
+    """
+    Write the header of a zone file, with its default TTL and origin
+    """
+    print(HEADER.format(
+        zone_name=zone_name,
+        resource_group=resource_group,
+        datetime=datetime,
+        ttl=ttl,
+        origin=origin
+    ), file=zone_file)
 
-            print('', file=zone_file)
 
-    result = zone_file.getvalue()
-    zone_file.close()
+def write_zone_file_records(zone_file, zone_name, record_set_name, record_set, print_name=True):
+    """
+    Write the records of a name to a zone file. `record_set` maps record types to
+    lists of records. The name is only printed on the first record, unless
+    `print_name` is False because the previous records have the same name.
+    """
+    import azure.cli.command_modules.network.zone_file.record_processors as record_processors
 
-    return result
+    if record_set_name.endswith(zone_name):
+        record_set_name = record_set_name[:-(len(zone_name) + 1)]
+
+    first_line = print_name
+    record_set_keys = list(record_set.keys())
+    if 'soa' in record_set_keys:
+        record_set_keys.remove('soa')
+        record_set_keys = ['soa'] + record_set_keys
+
+    for record_type in record_set_keys:
+
+        record = record_set[record_type]
+        if not isinstance(record, list):
+            record = [record]
+
+        for entry in record:
+            method = 'process_{}'.format(record_type.strip('$'))
+            getattr(record_processors, method)(zone_file, entry, record_set_name, first_line)
+            first_line = False
+
+        print('', file=zone_file)
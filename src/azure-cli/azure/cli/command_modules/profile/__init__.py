@@ -9,7 +9,6 @@ from azure.cli.core.commands.parameters import get_enum_type
 
 from azure.cli.command_modules.profile._format import transform_account_list
 from ._validators import validate_tenant
-import azure.cli.command_modules.profile._help  # pylint: disable=unused-import
 
 cloud_resource_types = ["oss-rdbms", "arm", "aad-graph", "ms-graph", "batch", "media", "data-lake"]
 
@@ -7,7 +7,6 @@
 # pylint: disable=line-too-long
 
 from azure.cli.core import AzCommandsLoader
-from azure.cli.command_modules.relay._help import helps
 
 
 class RelayCommandsLoader(AzCommandsLoader):
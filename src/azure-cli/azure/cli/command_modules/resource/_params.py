@@ -73,6 +73,8 @@ def load_arguments(self, _):
         c.ignore('resource_id')
         c.argument('resource_name', resource_name_type, arg_group='Resource Id')
         c.argument('api_version', help='The api version of the resource (omit for latest)', required=False, arg_group='Resource Id')
+        c.argument('refresh_api_versions', action='store_true', arg_group='Resource Id',
+                   help='Fetch the api versions of the resource provider again instead of using the locally cached ones.')
         c.argument('resource_provider_namespace', resource_namespace_type, arg_group='Resource Id')
         c.argument('resource_type', arg_type=resource_type_type, completer=get_resource_types_completion_list, arg_group='Resource Id')
         c.argument('parent_resource_path', resource_parent_type, arg_group='Resource Id')
@@ -15,6 +15,8 @@ import platform
 import re
 import ssl
 import sys
+import threading
+import time
 import uuid
 import base64
 
@@ -48,6 +50,9 @@ from ._formatters import format_what_if_operation_result
 
 logger = get_logger(__name__)
 
+# minutes
+DEFAULT_API_VERSION_CACHE_TTL = 1440
+
 
 def _build_resource_id(**kwargs):
     from msrestazure.tools import resource_id as resource_id_from_dict
@@ -825,7 +830,8 @@ def _list_resources_odata_filter_builder(resource_group_name=None, resource_prov
 
 def _get_auth_provider_latest_api_version(cli_ctx):
     rcf = _resource_client_factory(cli_ctx)
-    api_version = _ResourceUtils.resolve_api_version(rcf, 'Microsoft.Authorization', None, 'providerOperations')
+    api_version = _ResourceUtils.resolve_api_version(rcf, 'Microsoft.Authorization', None, 'providerOperations',
+                                                     cache=_get_api_version_cache(cli_ctx, rcf))
     return api_version
 
 
@@ -1339,10 +1345,11 @@ def export_deployment_as_template(cmd, resource_group_name, deployment_name):
 def create_resource(cmd, properties,
                     resource_group_name=None, resource_provider_namespace=None,
                     parent_resource_path=None, resource_type=None, resource_name=None,
-                    resource_id=None, api_version=None, location=None, is_full_object=False):
+                    resource_id=None, api_version=None, location=None, is_full_object=False,
+                    refresh_api_versions=False):
     res = _ResourceUtils(cmd.cli_ctx, resource_group_name, resource_provider_namespace,
                          parent_resource_path, resource_type, resource_name,
-                         resource_id, api_version)
+                         resource_id, api_version, refresh_api_versions=refresh_api_versions)
     return res.create_resource(properties, location, is_full_object)
 
 
@@ -1360,7 +1367,7 @@ def _get_parsed_resource_ids(resource_ids):
     return ({'resource_id': rid} for rid in resource_ids)
 
 
-def _get_rsrc_util_from_parsed_id(cli_ctx, parsed_id, api_version):
+def _get_rsrc_util_from_parsed_id(cli_ctx, parsed_id, api_version, refresh_api_versions=False):
     return _ResourceUtils(cli_ctx,
                           parsed_id.get('resource_group', None),
                           parsed_id.get('resource_namespace', None),
@@ -1368,7 +1375,8 @@ def _get_rsrc_util_from_parsed_id(cli_ctx, parsed_id, api_version):
                           parsed_id.get('resource_type', None),
                           parsed_id.get('resource_name', None),
                           parsed_id.get('resource_id', None),
-                          api_version)
+                          api_version,
+                          refresh_api_versions=refresh_api_versions)
 
 
 def _create_parsed_id(cli_ctx, resource_group_name=None, resource_provider_namespace=None, parent_resource_path=None,
@@ -1398,7 +1406,8 @@ def _single_or_collection(obj, default=None):
 # pylint: unused-argument
 def show_resource(cmd, resource_ids=None, resource_group_name=None,
                   resource_provider_namespace=None, parent_resource_path=None, resource_type=None,
-                  resource_name=None, api_version=None, include_response_body=False):
+                  resource_name=None, api_version=None, include_response_body=False,
+                  refresh_api_versions=False):
     parsed_ids = _get_parsed_resource_ids(resource_ids) or [_create_parsed_id(cmd.cli_ctx,
                                                                               resource_group_name,
                                                                               resource_provider_namespace,
@@ -1407,14 +1416,14 @@ def show_resource(cmd, resource_ids=None, resource_group_name=None,
                                                                               resource_name)]
 
     return _single_or_collection(
-        [_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version).get_resource(
+        [_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version, refresh_api_versions).get_resource(
             include_response_body) for id_dict in parsed_ids])
 
 
 # pylint: disable=unused-argument
 def delete_resource(cmd, resource_ids=None, resource_group_name=None,
                     resource_provider_namespace=None, parent_resource_path=None, resource_type=None,
-                    resource_name=None, api_version=None):
+                    resource_name=None, api_version=None, refresh_api_versions=False):
     """
     Deletes the given resource(s).
     This function allows deletion of ids with dependencies on one another.
@@ -1426,8 +1435,8 @@ def delete_resource(cmd, resource_ids=None, resource_group_name=None,
                                                                               parent_resource_path,
                                                                               resource_type,
                                                                               resource_name)]
-    to_be_deleted = [(_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version), id_dict)
-                     for id_dict in parsed_ids]
+    to_be_deleted = [(_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version, refresh_api_versions),
+                      id_dict) for id_dict in parsed_ids]
 
     results = []
     from msrestazure.azure_exceptions import CloudError
@@ -1468,7 +1477,8 @@ def delete_resource(cmd, resource_ids=None, resource_group_name=None,
 # pylint: unused-argument
 def update_resource(cmd, parameters, resource_ids=None,
                     resource_group_name=None, resource_provider_namespace=None,
-                    parent_resource_path=None, resource_type=None, resource_name=None, api_version=None):
+                    parent_resource_path=None, resource_type=None, resource_name=None, api_version=None,
+                    refresh_api_versions=False):
     parsed_ids = _get_parsed_resource_ids(resource_ids) or [_create_parsed_id(cmd.cli_ctx,
                                                                               resource_group_name,
                                                                               resource_provider_namespace,
@@ -1477,13 +1487,14 @@ def update_resource(cmd, parameters, resource_ids=None,
                                                                               resource_name)]
 
     return _single_or_collection(
-        [_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version).update(parameters) for id_dict in parsed_ids])
+        [_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version, refresh_api_versions).update(parameters)
+         for id_dict in parsed_ids])
 
 
 # pylint: unused-argument
 def tag_resource(cmd, tags, resource_ids=None, resource_group_name=None, resource_provider_namespace=None,
                  parent_resource_path=None, resource_type=None, resource_name=None, api_version=None,
-                 is_incremental=None):
+                 is_incremental=None, refresh_api_versions=False):
     """ Updates the tags on an existing resource. To clear tags, specify the --tag option
     without anything else. """
     parsed_ids = _get_parsed_resource_ids(resource_ids) or [_create_parsed_id(cmd.cli_ctx,
@@ -1494,15 +1505,15 @@ def tag_resource(cmd, tags, resource_ids=None, resource_group_name=None, resourc
                                                                               resource_name)]
 
     return _single_or_collection(
-        [_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version).tag(tags, is_incremental)
-         for id_dict in parsed_ids])
+        [_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version, refresh_api_versions)
+         .tag(tags, is_incremental) for id_dict in parsed_ids])
 
 
 # pylint: unused-argument
 def invoke_resource_action(cmd, action, request_body=None, resource_ids=None,
                            resource_group_name=None, resource_provider_namespace=None,
                            parent_resource_path=None, resource_type=None, resource_name=None,
-                           api_version=None):
+                           api_version=None, refresh_api_versions=False):
     """ Invokes the provided action on an existing resource."""
     parsed_ids = _get_parsed_resource_ids(resource_ids) or [_create_parsed_id(cmd.cli_ctx,
                                                                               resource_group_name,
@@ -1511,7 +1522,8 @@ def invoke_resource_action(cmd, action, request_body=None, resource_ids=None,
                                                                               resource_type,
                                                                               resource_name)]
 
-    return _single_or_collection([_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version)
+    return _single_or_collection([_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version,
+                                                                refresh_api_versions)
                                   .invoke_action(action, request_body) for id_dict in parsed_ids])
 
 
@@ -2470,11 +2482,80 @@ def show_version(cmd):
     return versions
 
 
+class _ApiVersionCache(object):
+    """ The api-versions of each resource type of the providers, persisted per cloud and subscription.
+    Without a session the providers are fetched on every lookup. Entries cached before refresh_time are fetched
+    again. """
+
+    _sessions = {}
+    _lock = threading.Lock()
+
+    def __init__(self, session=None, ttl=0, refresh_time=None):
+        self.session = session
+        self.ttl = ttl
+        self.refresh_time = refresh_time
+
+    def _is_fresh(self, timestamp):
+        if self.refresh_time is not None and timestamp < self.refresh_time:
+            return False
+        return time.time() - timestamp < self.ttl
+
+    def get_resource_types(self, rcf, resource_provider_namespace, refetch=False):
+        """ Return the {resource type (lower case): api-versions} of a provider namespace and whether the
+        provider was fetched by this call. """
+        key = resource_provider_namespace.lower()
+        if self.session is not None and not refetch:
+            entry = self.session.get(key)
+            if entry and self._is_fresh(entry['timestamp']):
+                return entry['resourceTypes'], False
+
+        provider = rcf.providers.get(resource_provider_namespace)
+        resource_types = {t.resource_type.lower(): t.api_versions for t in provider.resource_types}
+        if self.session is not None:
+            with self._lock:
+                self.session[key] = {'timestamp': time.time(), 'resourceTypes': resource_types}
+        return resource_types, True
+
+
+def _get_api_version_cache(cli_ctx, rcf, refresh=False):
+    """ Return the api-version cache of the client's subscription, loaded once per process so it is shared by all
+    the resource ids of a command. '[resource] api_version_cache_ttl = 0' turns it off. """
+    from knack.util import ensure_dir
+    from azure.cli.core._session import Session
+
+    ttl = cli_ctx.config.getint('resource', 'api_version_cache_ttl', DEFAULT_API_VERSION_CACHE_TTL) * 60
+    if ttl <= 0:
+        return _ApiVersionCache()
+
+    refresh_time = None
+    if refresh:
+        # the resource ids of a command share the cutoff, so each provider is fetched once per invocation
+        invocation = cli_ctx.invocation
+        if invocation is None:
+            refresh_time = time.time()
+        else:
+            refresh_time = invocation.data['api_version_refresh_time'] or time.time()
+            invocation.data['api_version_refresh_time'] = refresh_time
+
+    subscription_id = rcf.config.subscription_id
+
+    cache_dir = os.path.join(cli_ctx.config.config_dir, 'api_version_cache', cli_ctx.cloud.name)
+    cache_file = os.path.join(cache_dir, '{}.json'.format(subscription_id.lower()))
+    with _ApiVersionCache._lock:  # pylint: disable=protected-access
+        session = _ApiVersionCache._sessions.get(cache_file)  # pylint: disable=protected-access
+        if session is None:
+            ensure_dir(cache_dir)
+            session = Session()
+            session.load(cache_file)
+            _ApiVersionCache._sessions[cache_file] = session  # pylint: disable=protected-access
+    return _ApiVersionCache(session, ttl=ttl, refresh_time=refresh_time)
+
+
 class _ResourceUtils(object):  # pylint: disable=too-many-instance-attributes
     def __init__(self, cli_ctx,
                  resource_group_name=None, resource_provider_namespace=None,
                  parent_resource_path=None, resource_type=None, resource_name=None,
-                 resource_id=None, api_version=None, rcf=None):
+                 resource_id=None, api_version=None, rcf=None, refresh_api_versions=False):
         # if the resouce_type is in format 'namespace/type' split it.
         # (we don't have to do this, but commands like 'vm show' returns such values)
         if resource_type and not resource_provider_namespace and not parent_resource_path:
@@ -2485,15 +2566,17 @@ class _ResourceUtils(object):  # pylint: disable=too-many-instance-attributes
 
         self.rcf = rcf or _resource_client_factory(cli_ctx)
         if api_version is None:
+            cache = _get_api_version_cache(cli_ctx, self.rcf, refresh=refresh_api_versions)
             if resource_id:
-                api_version = _ResourceUtils._resolve_api_version_by_id(self.rcf, resource_id)
+                api_version = _ResourceUtils._resolve_api_version_by_id(self.rcf, resource_id, cache=cache)
             else:
                 _validate_resource_inputs(resource_group_name, resource_provider_namespace,
                                           resource_type, resource_name)
                 api_version = _ResourceUtils.resolve_api_version(self.rcf,
                                                                  resource_provider_namespace,
                                                                  parent_resource_path,
-                                                                 resource_type)
+                                                                 resource_type,
+                                                                 cache=cache)
 
         self.resource_group_name = resource_group_name
         self.resource_provider_namespace = resource_provider_namespace
@@ -2695,25 +2778,28 @@ class _ResourceUtils(object):  # pylint: disable=too-many-instance-attributes
                                     self.rcf.resources.config.long_running_operation_timeout)
 
     @staticmethod
-    def resolve_api_version(rcf, resource_provider_namespace, parent_resource_path, resource_type):
-        provider = rcf.providers.get(resource_provider_namespace)
+    def resolve_api_version(rcf, resource_provider_namespace, parent_resource_path, resource_type, cache=None):
+        cache = cache or _ApiVersionCache()
 
         # If available, we will use parent resource's api-version
         resource_type_str = (parent_resource_path.split('/')[0] if parent_resource_path else resource_type)
 
-        rt = [t for t in provider.resource_types
-              if t.resource_type.lower() == resource_type_str.lower()]
-        if not rt:
+        resource_types, fetched = cache.get_resource_types(rcf, resource_provider_namespace)
+        if resource_type_str.lower() not in resource_types and not fetched:
+            # the resource type may have been registered after the provider was cached
+            resource_types, _ = cache.get_resource_types(rcf, resource_provider_namespace, refetch=True)
+        if resource_type_str.lower() not in resource_types:
             raise IncorrectUsageError('Resource type {} not found.'.format(resource_type_str))
-        if len(rt) == 1 and rt[0].api_versions:
-            npv = [v for v in rt[0].api_versions if 'preview' not in v.lower()]
-            return npv[0] if npv else rt[0].api_versions[0]
+        api_versions = resource_types[resource_type_str.lower()]
+        if api_versions:
+            npv = [v for v in api_versions if 'preview' not in v.lower()]
+            return npv[0] if npv else api_versions[0]
         raise IncorrectUsageError(
             'API version is required and could not be resolved for resource {}'
             .format(resource_type))
 
     @staticmethod
-    def _resolve_api_version_by_id(rcf, resource_id):
+    def _resolve_api_version_by_id(rcf, resource_id, cache=None):
         parts = parse_resource_id(resource_id)
 
         if len(parts) == 2 and parts['subscription'] is not None and parts['resource_group'] is not None:
@@ -2739,4 +2825,4 @@ class _ResourceUtils(object):  # pylint: disable=too-many-instance-attributes
             parent = None
             resource_type = parts['type']
 
-        return _ResourceUtils.resolve_api_version(rcf, namespace, parent, resource_type)
+        return _ResourceUtils.resolve_api_version(rcf, namespace, parent, resource_type, cache=cache)
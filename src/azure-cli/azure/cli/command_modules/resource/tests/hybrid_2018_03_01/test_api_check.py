@@ -51,8 +51,7 @@ class TestApiCheck(unittest.TestCase):
 
     def test_resolve_api_provider_backup(self):
         # Verifies provider is used as backup if api-version not specified.
-        from azure.cli.core.mock import DummyCli
-        cli = DummyCli()
+        cli = self._get_cli()
         rcf = self._get_mock_client()
         res_utils = _ResourceUtils(cli, resource_type='Mock/test', resource_name='vnet1',
                                    resource_group_name='rg', rcf=rcf)
@@ -60,8 +59,7 @@ class TestApiCheck(unittest.TestCase):
 
     def test_resolve_api_provider_with_parent_backup(self):
         # Verifies provider (with parent) is used as backup if api-version not specified.
-        from azure.cli.core.mock import DummyCli
-        cli = DummyCli()
+        cli = self._get_cli()
         rcf = self._get_mock_client()
         res_utils = _ResourceUtils(cli, parent_resource_path='foo/testfoo123', resource_group_name='rg',
                                    resource_provider_namespace='Mock', resource_type='test',
@@ -71,15 +69,25 @@ class TestApiCheck(unittest.TestCase):
 
     def test_resolve_api_all_previews(self):
         # Verifies most recent preview version returned only if there are no non-preview versions.
-        from azure.cli.core.mock import DummyCli
-        cli = DummyCli()
+        cli = self._get_cli()
         rcf = self._get_mock_client()
         res_utils = _ResourceUtils(cli, resource_type='Mock/preview', resource_name='vnet1',
                                    resource_group_name='rg', rcf=rcf)
         self.assertEqual(res_utils.api_version, "2005-01-01-preview")
 
+    def _get_cli(self):
+        import shutil
+        import tempfile
+        from azure.cli.core.mock import DummyCli
+        cli = DummyCli()
+        # keep the api-version cache out of the user's config directory
+        cli.config.config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cli.config.config_dir)
+        return cli
+
     def _get_mock_client(self):
         client = MagicMock()
+        client.config.subscription_id = '00000000-0000-0000-0000-000000000000'
         provider = MagicMock()
         provider.resource_types = [
             self._get_mock_resource_type('skip', ['2000-01-01-preview', '2000-01-01']),
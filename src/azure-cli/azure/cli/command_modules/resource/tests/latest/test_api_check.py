@@ -51,8 +51,7 @@ class TestApiCheck(unittest.TestCase):
 
     def test_resolve_api_provider_backup(self):
         # Verifies provider is used as backup if api-version not specified.
-        from azure.cli.core.mock import DummyCli
-        cli = DummyCli()
+        cli = self._get_cli()
         rcf = self._get_mock_client()
         res_utils = _ResourceUtils(cli, resource_type='Mock/test', resource_name='vnet1',
                                    resource_group_name='rg', rcf=rcf)
@@ -60,8 +59,7 @@ class TestApiCheck(unittest.TestCase):
 
     def test_resolve_api_provider_with_parent_backup(self):
         # Verifies provider (with parent) is used as backup if api-version not specified.
-        from azure.cli.core.mock import DummyCli
-        cli = DummyCli()
+        cli = self._get_cli()
         rcf = self._get_mock_client()
         res_utils = _ResourceUtils(cli, parent_resource_path='foo/testfoo123', resource_group_name='rg',
                                    resource_provider_namespace='Mock', resource_type='test',
@@ -71,15 +69,85 @@ class TestApiCheck(unittest.TestCase):
 
     def test_resolve_api_all_previews(self):
         # Verifies most recent preview version returned only if there are no non-preview versions.
-        from azure.cli.core.mock import DummyCli
-        cli = DummyCli()
+        cli = self._get_cli()
         rcf = self._get_mock_client()
         res_utils = _ResourceUtils(cli, resource_type='Mock/preview', resource_name='vnet1',
                                    resource_group_name='rg', rcf=rcf)
         self.assertEqual(res_utils.api_version, "2005-01-01-preview")
 
+    def test_resolve_api_version_cache(self):
+        import os
+        import tempfile
+        import time
+        from azure.cli.core._session import Session
+        from azure.cli.command_modules.resource.custom import _ApiVersionCache
+
+        session = Session()
+        session.load(os.path.join(tempfile.mkdtemp(), 'cache.json'))
+        rcf = self._get_mock_client()
+        cache = _ApiVersionCache(session, ttl=3600)
+        self.assertEqual(_ResourceUtils.resolve_api_version(rcf, 'Mock', None, 'test', cache=cache), '2016-01-01')
+        self.assertEqual(_ResourceUtils.resolve_api_version(rcf, 'mock', 'foo/testfoo123', 'test', cache=cache),
+                         '1999-01-01')
+        self.assertEqual(rcf.providers.get.call_count, 1)
+
+        # the provider is fetched again for resource types it didn't have when it was cached
+        rcf.providers.get.return_value.resource_types.append(self._get_mock_resource_type('new', ['2020-01-01']))
+        self.assertEqual(_ResourceUtils.resolve_api_version(rcf, 'Mock', None, 'new', cache=cache), '2020-01-01')
+        self.assertEqual(rcf.providers.get.call_count, 2)
+
+        # a new process reads the cache from disk
+        reloaded = Session()
+        reloaded.load(session.filename)
+        rcf = self._get_mock_client()
+        cache = _ApiVersionCache(reloaded, ttl=3600)
+        self.assertEqual(_ResourceUtils.resolve_api_version(rcf, 'Mock', None, 'new', cache=cache), '2020-01-01')
+        self.assertEqual(rcf.providers.get.call_count, 0)
+
+        # expired entries are ignored
+        cache = _ApiVersionCache(reloaded, ttl=0)
+        self.assertEqual(_ResourceUtils.resolve_api_version(rcf, 'Mock', None, 'test', cache=cache), '2016-01-01')
+        self.assertEqual(rcf.providers.get.call_count, 1)
+
+        # a refresh ignores entries cached before the invocation started, but only fetches each provider once
+        cache = _ApiVersionCache(reloaded, ttl=3600, refresh_time=time.time() + 1)
+        self.assertEqual(_ResourceUtils.resolve_api_version(rcf, 'Mock', None, 'test', cache=cache), '2016-01-01')
+        self.assertEqual(rcf.providers.get.call_count, 2)
+        cache.refresh_time = time.time() - 1
+        self.assertEqual(_ResourceUtils.resolve_api_version(rcf, 'Mock', None, 'test', cache=cache), '2016-01-01')
+        self.assertEqual(rcf.providers.get.call_count, 2)
+
+    def test_api_version_cache_refresh_time(self):
+        from collections import defaultdict
+        from azure.cli.command_modules.resource.custom import _get_api_version_cache
+
+        cli = self._get_cli()
+        rcf = self._get_mock_client()
+        self.assertIsNone(_get_api_version_cache(cli, rcf).refresh_time)
+
+        # the resource ids of an invocation share the cutoff of the refresh
+        cli.invocation = MagicMock(data=defaultdict(lambda: None))
+        refresh_time = _get_api_version_cache(cli, rcf, refresh=True).refresh_time
+        self.assertIsNotNone(refresh_time)
+        self.assertEqual(_get_api_version_cache(cli, rcf, refresh=True).refresh_time, refresh_time)
+
+        # a later invocation of the same process, e.g. in the daemon, refreshes from its own start
+        cli.invocation = MagicMock(data=defaultdict(lambda: None))
+        self.assertGreaterEqual(_get_api_version_cache(cli, rcf, refresh=True).refresh_time, refresh_time)
+
+    def _get_cli(self):
+        import shutil
+        import tempfile
+        from azure.cli.core.mock import DummyCli
+        cli = DummyCli()
+        # keep the api-version cache out of the user's config directory
+        cli.config.config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cli.config.config_dir)
+        return cli
+
     def _get_mock_client(self):
         client = MagicMock()
+        client.config.subscription_id = '00000000-0000-0000-0000-000000000000'
         provider = MagicMock()
         provider.resource_types = [
             self._get_mock_resource_type('skip', ['2000-01-01-preview', '2000-01-01']),
@@ -6,8 +6,6 @@
 from azure.cli.core import AzCommandsLoader
 from azure.cli.core.profiles import ResourceType
 
-import azure.cli.command_modules.role._help  # pylint: disable=unused-import
-
 
 class RoleCommandsLoader(AzCommandsLoader):
 
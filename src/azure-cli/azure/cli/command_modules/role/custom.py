@@ -10,6 +10,7 @@ import datetime
 import json
 import re
 import os
+import time
 import uuid
 import itertools
 from dateutil.relativedelta import relativedelta
@@ -39,6 +40,8 @@ logger = get_logger(__name__)
 
 # pylint: disable=too-many-lines
 
+DEFAULT_ROLE_CACHE_TTL = 60  # minutes
+
 
 def list_role_definitions(cmd, name=None, resource_group_name=None, scope=None,
                           custom_role_only=False):
@@ -102,6 +105,7 @@ def _create_update_role_definition(cmd, role_definition, for_update):
     if not for_update and 'assignableScopes' not in role_definition:
         raise CLIError("please provide 'assignableScopes'")
 
+    _DirectoryCache.clear_role_names(cmd.cli_ctx)
     return worker.create_role_definition(definitions_client, role_name, role_id, role_definition)
 
 
@@ -111,6 +115,8 @@ def delete_role_definition(cmd, name, resource_group_name=None, scope=None,
     scope = _build_role_scope(resource_group_name, scope,
                               definitions_client.config.subscription_id)
     roles = _search_role_definitions(cmd.cli_ctx, definitions_client, name, [scope], custom_role_only)
+    if roles:
+        _DirectoryCache.clear_role_names(cmd.cli_ctx)
     for r in roles:
         definitions_client.delete(role_definition_id=r.name, scope=scope)
 
@@ -154,7 +160,7 @@ def _create_role_assignment(cli_ctx, role, assignee, resource_group_name=None, s
     scope = _build_role_scope(resource_group_name, scope,
                               assignments_client.config.subscription_id)
 
-    role_id = _resolve_role_id(role, scope, definitions_client)
+    role_id = _resolve_role_id(role, scope, definitions_client, cli_ctx)
     object_id = _resolve_object_id(cli_ctx, assignee) if resolve_assignee else assignee
     worker = MultiAPIAdaptor(cli_ctx)
     return worker.create_role_assignment(assignments_client, _gen_guid(), role_id, object_id, scope,
@@ -195,10 +201,11 @@ def list_role_assignments(cmd, assignee=None, role=None, resource_group_name=Non
     # 1. fill in logic names to get things understandable.
     # (it's possible that associated roles and principals were deleted, and we just do nothing.)
     # 2. fill in role names
-    role_defs = list(definitions_client.list(
-        scope=scope or ('/subscriptions/' + definitions_client.config.subscription_id)))
     worker = MultiAPIAdaptor(cmd.cli_ctx)
-    role_dics = {i.id: worker.get_role_property(i, 'role_name') for i in role_defs}
+    role_ids = set(worker.get_role_property(i, 'roleDefinitionId') for i in results
+                   if not i.get('roleDefinitionName'))
+    role_dics = _get_role_names(cmd.cli_ctx, definitions_client,
+                                scope or ('/subscriptions/' + definitions_client.config.subscription_id), role_ids)
     for i in results:
         if not i.get('roleDefinitionName'):
             if role_dics.get(worker.get_role_property(i, 'roleDefinitionId')):
@@ -213,8 +220,7 @@ def list_role_assignments(cmd, assignee=None, role=None, resource_group_name=Non
 
     if principal_ids:
         try:
-            principals = _get_object_stubs(graph_client, principal_ids)
-            principal_dics = {i.object_id: _get_displayable_name(i) for i in principals}
+            principal_dics = _get_principal_names(cmd.cli_ctx, graph_client, principal_ids)
 
             for i in [r for r in results if not r.get('principalName')]:
                 i['principalName'] = ''
@@ -480,7 +486,7 @@ def _search_role_assignments(cli_ctx, assignments_client, definitions_client,
         )]
 
         if role:
-            role_id = _resolve_role_id(role, scope, definitions_client)
+            role_id = _resolve_role_id(role, scope, definitions_client, cli_ctx)
             assignments = [i for i in assignments if worker.get_role_property(i, 'role_definition_id') == role_id]
 
         if assignee_object_id:
@@ -504,7 +510,7 @@ def _build_role_scope(resource_group_name, scope, subscription_id):
     return scope
 
 
-def _resolve_role_id(role, scope, definitions_client):
+def _resolve_role_id(role, scope, definitions_client, cli_ctx=None):
     role_id = None
     if re.match(r'/subscriptions/.+/providers/Microsoft.Authorization/roleDefinitions/',
                 role, re.I):
@@ -513,6 +519,11 @@ def _resolve_role_id(role, scope, definitions_client):
         if _is_guid(role):
             role_id = '/subscriptions/{}/providers/Microsoft.Authorization/roleDefinitions/{}'.format(
                 definitions_client.config.subscription_id, role)
+        cache = _DirectoryCache.get(cli_ctx) if cli_ctx and scope and not role_id else None
+        if cache:  # the names of the roles at the scope might have been cached
+            role_ids = [k for k, v in (cache.get_role_names(scope) or {}).items() if v and v.lower() == role.lower()]
+            if len(role_ids) == 1:
+                role_id = role_ids[0]
         if not role_id:  # retrieve role id
             role_defs = list(definitions_client.list(scope, "roleName eq '{}'".format(role)))
             if not role_defs:
@@ -1679,6 +1690,10 @@ def _encode_custom_key_description(key_description):
 
 def _resolve_object_id(cli_ctx, assignee, fallback_to_object_id=False):
     client = _graph_client_factory(cli_ctx)
+    cache = _DirectoryCache.get(cli_ctx, client)
+    object_id = cache.get_object_id(assignee) if cache else None
+    if object_id:
+        return object_id
     result = None
     try:
         if assignee.find('@') >= 0:  # looks like a user principal name
@@ -1695,6 +1710,8 @@ def _resolve_object_id(cli_ctx, assignee, fallback_to_object_id=False):
                            "If the assignee is an appId, make sure the corresponding service principal is created "
                            "with 'az ad sp create --id {assignee}'.".format(assignee=assignee))
 
+        if cache:
+            cache.add_objects(result, assignee)
         return result[0].object_id
     except (CloudError, GraphErrorException):
         if fallback_to_object_id and _is_guid(assignee):
@@ -1720,6 +1737,106 @@ def _get_object_stubs(graph_client, assignees):
     return result
 
 
+def _get_principal_names(cli_ctx, graph_client, principal_ids):
+    cache = _DirectoryCache.get(cli_ctx, graph_client)
+    names = cache.get_names(principal_ids) if cache else {}
+    missing_ids = [i for i in principal_ids if i not in names]
+    if missing_ids:
+        principals = _get_object_stubs(graph_client, missing_ids)
+        names.update({i.object_id: _get_displayable_name(i) for i in principals})
+        if cache:
+            cache.add_objects(principals)
+    return names
+
+
+def _get_role_names(cli_ctx, definitions_client, scope, role_ids=None):
+    """ The names of the role definitions at a scope by id. The definitions are listed again when any of `role_ids`
+    isn't cached, e.g. a custom role created since. """
+    cache = _DirectoryCache.get(cli_ctx)
+    role_names = cache.get_role_names(scope) if cache else None
+    if role_names is None or any(i not in role_names for i in role_ids or []):
+        worker = MultiAPIAdaptor(cli_ctx)
+        role_names = {i.id: worker.get_role_property(i, 'role_name') for i in definitions_client.list(scope=scope)}
+        if cache:
+            cache.set_role_names(scope, role_names)
+    return role_names
+
+
+class _DirectoryCache(object):
+    """ Directory objects and role definitions resolved by earlier commands, kept in the config directory for
+    `[role] cache_ttl` minutes, so that repeated commands don't query Graph and ARM for the same principals. """
+
+    _FILE_NAME = 'roleCache.json'
+
+    def __init__(self, cli_ctx, tenant_id, ttl):
+        from azure.cli.core._session import Session
+        self._session = Session()
+        self._session.load(os.path.join(cli_ctx.config.config_dir, self._FILE_NAME))
+        self._tenant_id = (tenant_id or '').lower()
+        self._ttl = ttl
+
+    @classmethod
+    def get(cls, cli_ctx, graph_client=None):
+        """ The cache for the tenant of the graph client, or None if it is disabled. """
+        ttl = cli_ctx.config.getint('role', 'cache_ttl', DEFAULT_ROLE_CACHE_TTL)
+        if ttl <= 0:
+            return None
+        tenant_id = graph_client.config.tenant_id if graph_client else ''
+        return cls(cli_ctx, tenant_id, ttl * 60)
+
+    def _get_entries(self, key):
+        # drop what has expired
+        now = time.time()
+        return {k: v for k, v in self._session.get(key, {}).items() if now - v[-1] < self._ttl}
+
+    def _key(self, name):
+        return '{}/{}'.format(self._tenant_id, name.lower())
+
+    def get_names(self, object_ids):
+        principals = self._get_entries('principals')
+        return {i: principals[self._key(i)][0] for i in object_ids if self._key(i) in principals}
+
+    def get_object_id(self, assignee):
+        key = self._key(assignee)
+        entry = self._get_entries('assignees').get(key)
+        if entry:
+            return entry[0]
+        # an object id is only cached once it has been verified
+        return assignee if _is_guid(assignee) and key in self._get_entries('principals') else None
+
+    def add_objects(self, graph_objects, assignee=None):
+        now = time.time()
+        principals = self._get_entries('principals')
+        assignees = self._get_entries('assignees')
+        for graph_object in graph_objects:
+            principals[self._key(graph_object.object_id)] = [_get_displayable_name(graph_object), now]
+            # users and service principals can be assigned with their names too
+            for name in [getattr(graph_object, 'user_principal_name', None)] + \
+                    (getattr(graph_object, 'service_principal_names', None) or []):
+                if name:
+                    assignees[self._key(name)] = [graph_object.object_id, now]
+        if assignee and graph_objects:
+            assignees[self._key(assignee)] = [graph_objects[0].object_id, now]
+        self._session['principals'] = principals
+        self._session['assignees'] = assignees
+
+    def get_role_names(self, scope):
+        entry = self._get_entries('roleDefinitions').get(scope.lower())
+        return entry[0] if entry else None
+
+    def set_role_names(self, scope, role_names):
+        role_definitions = self._get_entries('roleDefinitions')
+        role_definitions[scope.lower()] = [role_names, time.time()]
+        self._session['roleDefinitions'] = role_definitions
+
+    @classmethod
+    def clear_role_names(cls, cli_ctx):
+        """ Forget the cached role definitions once a custom role is changed. """
+        cache = cls.get(cli_ctx)
+        if cache and cache._session.get('roleDefinitions'):
+            del cache._session['roleDefinitions']
+
+
 def _get_owner_url(cli_ctx, owner_object_id):
     if '://' in owner_object_id:
         return owner_object_id
@@ -4,6 +4,7 @@
 # --------------------------------------------------------------------------------------------
 import json
 import os
+import shutil
 import tempfile
 import unittest
 import uuid
@@ -23,6 +24,10 @@ from azure.cli.command_modules.role.custom import (create_role_definition,
                                                    list_service_principal_credentials,
                                                    update_application,
                                                    _get_object_stubs,
+                                                   _get_principal_names,
+                                                   _get_role_names,
+                                                   _resolve_object_id,
+                                                   _resolve_role_id,
                                                    list_service_principal_owners,
                                                    list_application_owners,
                                                    delete_role_assignments)
@@ -53,6 +58,13 @@ class TestRoleMocked(unittest.TestCase):
         self.create_def_invoked = False
         self.update_def_invoked = False
 
+    def _get_cli_ctx(self):
+        # keep the role cache out of the user's config directory
+        cli_ctx = DummyCli()
+        cli_ctx.config.config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cli_ctx.config.config_dir)
+        return cli_ctx
+
     @mock.patch('azure.cli.command_modules.role.custom._auth_client_factory', autospec=True)
     def test_create_role_definition(self, client_mock):
 
@@ -73,7 +85,7 @@ class TestRoleMocked(unittest.TestCase):
 
         # action
         cmd = mock.MagicMock()
-        cmd.cli_ctx = DummyCli()
+        cmd.cli_ctx = self._get_cli_ctx()
         create_role_definition(cmd, role_definition_file)
 
         # assert
@@ -105,7 +117,7 @@ class TestRoleMocked(unittest.TestCase):
 
         # action
         cmd = mock.MagicMock()
-        cmd.cli_ctx = DummyCli()
+        cmd.cli_ctx = self._get_cli_ctx()
         update_role_definition(cmd, role_definition_file)
 
         # assert
@@ -407,6 +419,61 @@ class TestRoleMocked(unittest.TestCase):
             args, _ = call
             self.assertEqual(args[0].object_ids, group)
 
+    @mock.patch('azure.cli.command_modules.role.custom._graph_client_factory', autospec=True)
+    def test_role_cache(self, graph_client_mock):
+        cli_ctx = self._get_cli_ctx()
+
+        sp_object_id = '11111111-2222-3333-4444-555555555555'
+        sp = ServicePrincipal(service_principal_names=['http://test-sp', '66666666-2222-3333-4444-555555555555'])
+        sp.object_id = sp_object_id
+        graph_client = mock.MagicMock()
+        graph_client.config.tenant_id = 'tenant1'
+        graph_client.objects.get_objects_by_object_ids.return_value = [sp]
+        graph_client_mock.return_value = graph_client
+
+        reader = RoleDefinition(role_name='Reader')
+        reader.id = self.default_scope + '/providers/Microsoft.Authorization/roleDefinitions/reader-id'
+        definitions_client = mock.MagicMock()
+        definitions_client.list.return_value = [reader]
+
+        # action
+        for _ in range(2):
+            names = _get_principal_names(cli_ctx, graph_client, [sp_object_id])
+            role_names = _get_role_names(cli_ctx, definitions_client, self.default_scope)
+
+        # assert
+        self.assertEqual(names, {sp_object_id: 'http://test-sp'})
+        self.assertEqual(role_names, {reader.id: 'Reader'})
+        graph_client.objects.get_objects_by_object_ids.assert_called_once()
+        definitions_client.list.assert_called_once()
+
+        # the principal can be assigned by any of its names without querying the graph
+        self.assertEqual(_resolve_object_id(cli_ctx, '66666666-2222-3333-4444-555555555555'), sp_object_id)
+        self.assertEqual(_resolve_object_id(cli_ctx, sp_object_id), sp_object_id)
+        graph_client.service_principals.list.assert_not_called()
+        self.assertEqual(_resolve_role_id('reader', self.default_scope, definitions_client, cli_ctx), reader.id)
+        definitions_client.list.assert_called_once()
+
+        # role definitions created since they were cached are listed again
+        custom_role = RoleDefinition(role_name='Custom')
+        custom_role.id = self.default_scope + '/providers/Microsoft.Authorization/roleDefinitions/custom-id'
+        definitions_client.list.return_value = [reader, custom_role]
+        role_names = _get_role_names(cli_ctx, definitions_client, self.default_scope, [reader.id, custom_role.id])
+        self.assertEqual(role_names, {reader.id: 'Reader', custom_role.id: 'Custom'})
+        self.assertEqual(definitions_client.list.call_count, 2)
+        _get_role_names(cli_ctx, definitions_client, self.default_scope, [custom_role.id])
+        self.assertEqual(definitions_client.list.call_count, 2)
+
+        # the cache is per tenant
+        graph_client.config.tenant_id = 'tenant2'
+        _get_principal_names(cli_ctx, graph_client, [sp_object_id])
+        self.assertEqual(graph_client.objects.get_objects_by_object_ids.call_count, 2)
+
+        # and can be turned off
+        with mock.patch.dict(os.environ, {'AZURE_ROLE_CACHE_TTL': '0'}):
+            _get_role_names(cli_ctx, definitions_client, self.default_scope)
+        self.assertEqual(definitions_client.list.call_count, 3)
+
 
 class FakedError(object):  # pylint: disable=too-few-public-methods
     def __init__(self, message):
@@ -576,6 +576,9 @@ examples:
   - name: Delete all blobs with the format 'cli-201x-xx-xx.txt' except cli-2018-xx-xx.txt' and 'cli-2019-xx-xx.txt' in a container.
     text: |
         az storage blob delete-batch -s mycontainer --pattern cli-201[!89]-??-??.txt
+  - name: Delete all the blobs in a directory named "dir", 16 at a time.
+    text: |
+        az storage blob delete-batch -s mycontainer --pattern dir/* --concurrency 16
 """
 
 helps['storage blob download-batch'] = """
@@ -609,6 +612,12 @@ examples:
   - name: Download all blobs with the format 'cli-201x-xx-xx.txt' except cli-2018-xx-xx.txt' and 'cli-2019-xx-xx.txt' in container to current path.
     text: |
         az storage blob download-batch -d . -s mycontainer --pattern cli-201[!89]-??-??.txt
+  - name: Download all blobs in container to current path, 16 blobs at a time.
+    text: |
+        az storage blob download-batch -d . -s mycontainer --concurrency 16
+  - name: Download only the blobs that are missing locally or have changed.
+    text: |
+        az storage blob download-batch -d . -s mycontainer --incremental
 """
 
 helps['storage blob exists'] = """
@@ -841,6 +850,13 @@ examples:
   - name: Upload all files with the format 'cli-201x-xx-xx.txt' except cli-2018-xx-xx.txt' and 'cli-2019-xx-xx.txt' in a container.
     text: |
         az storage blob upload-batch -d mycontainer -s <path-to-directory> --pattern cli-201[!89]-??-??.txt
+  - name: Upload all files from local path directory, 16 files at a time.
+    text: |
+        az storage blob upload-batch -d mycontainer -s <path-to-directory> --concurrency 16
+  - name: Upload only the files that are new or changed since the last upload, and show them without uploading first.
+    text: |
+        az storage blob upload-batch -d mycontainer -s <path-to-directory> --manifest ~/upload-manifest.json --dryrun
+        az storage blob upload-batch -d mycontainer -s <path-to-directory> --manifest ~/upload-manifest.json
 """
 
 helps['storage blob url'] = """
@@ -18,7 +18,7 @@ from ._validators import (get_datetime_type, validate_metadata, get_permission_v
                           validate_storage_data_plane_list, validate_azcopy_upload_destination_url,
                           validate_azcopy_remove_arguments, as_user_validator, parse_storage_account,
                           validator_delete_retention_days, validate_delete_retention_days,
-                          validate_fs_public_access)
+                          validate_fs_public_access, validate_batch_concurrency)
 
 
 def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statements, too-many-lines
@@ -71,6 +71,18 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
                                     action='store_true', validator=add_progress_callback)
     socket_timeout_type = CLIArgumentType(help='The socket timeout(secs), used by the service to regulate data flow.',
                                           type=int)
+    batch_incremental_type = CLIArgumentType(
+        action='store_true',
+        help='Only transfer the files that are new or changed. Files are compared with the blobs by size, '
+             'then by Content-MD5 when the blob has one, or by last modified time otherwise.')
+    batch_manifest_type = CLIArgumentType(
+        type=file_type,
+        help='A JSON file recording the files transferred by previous runs. Files that were not touched since are '
+             'skipped without being read. Created if it does not exist. Implies --incremental.')
+    batch_concurrency_type = CLIArgumentType(
+        type=int, default=1, validator=validate_batch_concurrency,
+        help='The number of files to transfer in parallel. Each file still uses up to --max-connections '
+             'connections.')
     num_results_type = CLIArgumentType(
         default=5000, help='Specifies the maximum number of results to return. Provide "*" to return all.',
         validator=validate_storage_data_plane_list)
@@ -555,6 +567,9 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.argument('maxsize_condition', arg_group='Content Control')
         c.argument('validate_content', action='store_true', min_api='2016-05-31', arg_group='Content Control')
         c.argument('blob_type', options_list=('--type', '-t'), arg_type=get_enum_type(get_blob_types()))
+        c.argument('concurrency', batch_concurrency_type)
+        c.argument('incremental', batch_incremental_type)
+        c.argument('manifest', batch_manifest_type)
         c.extra('no_progress', progress_type)
         c.extra('socket_timeout', socket_timeout_type)
 
@@ -575,6 +590,9 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.extra('socket_timeout', socket_timeout_type)
         c.argument('max_connections', type=int,
                    help='Maximum number of parallel connections to use when the blob size exceeds 64MB.')
+        c.argument('concurrency', batch_concurrency_type)
+        c.argument('incremental', batch_incremental_type)
+        c.argument('manifest', batch_manifest_type)
 
     with self.argument_context('storage blob delete') as c:
         from .sdkutil import get_delete_blob_snapshot_type_names
@@ -586,6 +604,7 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.argument('delete_snapshots', arg_type=get_enum_type(get_delete_blob_snapshot_type_names()),
                    help='Required if the blob has associated snapshots.')
         c.argument('lease_id', help='The active lease id for the blob.')
+        c.argument('concurrency', batch_concurrency_type, help='The number of blobs to delete in parallel.')
 
     with self.argument_context('storage blob lease') as c:
         c.argument('lease_duration', type=int)
@@ -967,6 +986,7 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
     with self.argument_context('storage file delete-batch') as c:
         from ._validators import process_file_batch_source_parameters
         c.argument('source', options_list=('--source', '-s'), validator=process_file_batch_source_parameters)
+        c.argument('concurrency', batch_concurrency_type, help='The number of files to delete in parallel.')
 
     with self.argument_context('storage file copy start') as c:
         from azure.cli.command_modules.storage._validators import validate_source_uri
@@ -102,6 +102,11 @@ def validate_bypass(namespace):
         namespace.bypass = ', '.join(namespace.bypass) if isinstance(namespace.bypass, list) else namespace.bypass
 
 
+def validate_batch_concurrency(namespace):
+    if namespace.concurrency is not None and namespace.concurrency < 1:
+        raise ValueError('incorrect usage: --concurrency must be a positive integer')
+
+
 def get_config_value(cmd, section, key, default):
     return cmd.cli_ctx.config.get(section, key, default)
 
@@ -17,7 +17,9 @@ from azure.cli.command_modules.storage.util import (create_blob_service_from_sto
                                                     create_short_lived_container_sas,
                                                     filter_none, collect_blobs, collect_blob_objects, collect_files,
                                                     mkdir_p, guess_content_type, normalize_blob_file_path,
-                                                    check_precondition_success)
+                                                    check_precondition_success, ignore_missing_on_retry, run_batch,
+                                                    raise_batch_failures, get_sync_status, load_transfer_manifest,
+                                                    get_manifest_key, record_transfer, log_sync_plan)
 from knack.log import get_logger
 from knack.util import CLIError
 
@@ -189,11 +191,13 @@ def storage_blob_copy_batch(cmd, client, source_client, container_name=None,
     raise ValueError('Fail to find source. Neither blob container or file share is specified')
 
 
-# pylint: disable=unused-argument
+# pylint: disable=unused-argument, too-many-locals
 def storage_blob_download_batch(client, source, destination, source_container_name, pattern=None, dryrun=False,
-                                progress_callback=None, max_connections=2):
+                                progress_callback=None, max_connections=2, concurrency=1, incremental=False,
+                                manifest=None):
 
-    def _download_blob(blob_service, container, destination_folder, normalized_blob_name, blob_name):
+    def _download_blob(blob_service, container, destination_folder, normalized_blob_name, blob_name,
+                       file_progress_callback):
         # TODO: try catch IO exception
         destination_path = os.path.join(destination_folder, normalized_blob_name)
         destination_folder = os.path.dirname(destination_path)
@@ -201,19 +205,37 @@ def storage_blob_download_batch(client, source, destination, source_container_na
             mkdir_p(destination_folder)
 
         blob = blob_service.get_blob_to_path(container, blob_name, destination_path, max_connections=max_connections,
-                                             progress_callback=progress_callback)
+                                             progress_callback=file_progress_callback)
+        if transfer_manifest is not None:
+            record_transfer(transfer_manifest, get_manifest_key(blob_service, container, blob_name), destination_path,
+                            blob.properties.etag)
         return blob.name
 
-    source_blobs = collect_blobs(client, source_container_name, pattern)
+    source_blobs = []
     blobs_to_download = {}
-    for blob_name in source_blobs:
+    for blob_name, blob in collect_blob_objects(client, source_container_name, pattern):
+        source_blobs.append(blob_name)
         # remove starting path seperator and normalize
         normalized_blob_name = normalize_blob_file_path(None, blob_name)
         if normalized_blob_name in blobs_to_download:
             raise CLIError('Multiple blobs with download path: `{}`. As a solution, use the `--pattern` parameter '
                            'to select for a subset of blobs to download OR utilize the `storage blob download` '
                            'command instead to download individual blobs.'.format(normalized_blob_name))
-        blobs_to_download[normalized_blob_name] = blob_name
+        blobs_to_download[normalized_blob_name] = (blob_name, blob)
+
+    # a manifest implies an incremental download
+    transfer_manifest = load_transfer_manifest(manifest, dryrun) if manifest else None
+    incremental = incremental or transfer_manifest is not None
+    changes = []
+    if incremental:
+        for blob_normed, (blob_name, blob) in list(blobs_to_download.items()):
+            manifest_entry = transfer_manifest.get(get_manifest_key(client, source_container_name, blob_name)) \
+                if transfer_manifest is not None else None
+            status = get_sync_status(os.path.join(destination, blob_normed), blob, manifest_entry, upload=False)
+            if status:
+                changes.append((status, blob_name))
+            else:
+                del blobs_to_download[blob_normed]
 
     if dryrun:
         logger = get_logger(__name__)
@@ -221,28 +243,25 @@ def storage_blob_download_batch(client, source, destination, source_container_na
         logger.warning('    pattern %s', pattern)
         logger.warning('  container %s', source_container_name)
         logger.warning('      total %d', len(source_blobs))
+        if incremental:
+            log_sync_plan(changes, len(source_blobs) - len(changes))
+            return []
         logger.warning(' operations')
         for b in source_blobs:
             logger.warning('  - %s', b)
         return []
 
-    # Tell progress reporter to reuse the same hook
-    if progress_callback:
-        progress_callback.reuse = True
-
-    results = []
-    for index, blob_normed in enumerate(blobs_to_download):
-        # add blob name and number to progress message
-        if progress_callback:
-            progress_callback.message = '{}/{}: "{}"'.format(
-                index + 1, len(blobs_to_download), blobs_to_download[blob_normed])
-        results.append(_download_blob(
-            client, source_container_name, destination, blob_normed, blobs_to_download[blob_normed]))
-
-    # end progress hook
-    if progress_callback:
-        progress_callback.hook.end()
-
+    def _download(blob_normed, file_progress_callback):
+        return _download_blob(client, source_container_name, destination, blob_normed,
+                              blobs_to_download[blob_normed][0], file_progress_callback)
+
+    results, failures = run_batch(
+        _download, [(blob_name, blob.properties.content_length or 0, blob_normed)
+                    for blob_normed, (blob_name, blob) in blobs_to_download.items()],
+        concurrency=concurrency, progress_callback=progress_callback)
+    if transfer_manifest is not None:
+        transfer_manifest.save()
+    raise_batch_failures(failures, len(blobs_to_download), noun='blobs')
     return results
 
 
@@ -252,7 +271,8 @@ def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  #
                               content_settings=None, metadata=None, validate_content=False,
                               maxsize_condition=None, max_connections=2, lease_id=None, progress_callback=None,
                               if_modified_since=None, if_unmodified_since=None, if_match=None,
-                              if_none_match=None, timeout=None, dryrun=False):
+                              if_none_match=None, timeout=None, dryrun=False, concurrency=1, incremental=False,
+                              manifest=None):
     def _create_return_result(blob_name, blob_content_settings, upload_result=None):
         blob_name = normalize_blob_file_path(destination_path, blob_name)
         return {
@@ -265,6 +285,27 @@ def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  #
     source_files = source_files or []
     t_content_settings = cmd.get_models('blob.models#ContentSettings')
 
+    # a manifest implies an incremental upload
+    transfer_manifest = load_transfer_manifest(manifest, dryrun) if manifest else None
+    if incremental or transfer_manifest is not None:
+        prefix = normalize_blob_file_path(None, destination_path) + '/' if destination_path else None
+        remote_blobs = {blob.name: blob for blob in client.list_blobs(destination_container_name, prefix=prefix)}
+        changes = []
+        files_to_upload = []
+        for src, dst in source_files:
+            blob_name = normalize_blob_file_path(destination_path, dst)
+            manifest_entry = transfer_manifest.get(get_manifest_key(client, destination_container_name, blob_name)) \
+                if transfer_manifest is not None else None
+            status = get_sync_status(src, remote_blobs.get(blob_name), manifest_entry)
+            if status:
+                changes.append((status, blob_name))
+                files_to_upload.append((src, dst))
+        if dryrun:
+            logger.warning('upload action: from %s to %s', source, destination)
+            logger.warning('      total %d', len(source_files))
+            log_sync_plan(changes, len(source_files) - len(files_to_upload))
+        source_files = files_to_upload
+
     results = []
     if dryrun:
         logger.info('upload action: from %s to %s', source, destination)
@@ -280,37 +321,38 @@ def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  #
         def _upload_blob(*args, **kwargs):
             return upload_blob(*args, **kwargs)
 
-        # Tell progress reporter to reuse the same hook
-        if progress_callback:
-            progress_callback.reuse = True
-
-        for index, source_file in enumerate(source_files):
+        def _upload(source_file, file_progress_callback):
             src, dst = source_file
             # logger.warning('uploading %s', src)
             guessed_content_settings = guess_content_type(src, content_settings, t_content_settings)
 
-            # add blob name and number to progress message
-            if progress_callback:
-                progress_callback.message = '{}/{}: "{}"'.format(
-                    index + 1, len(source_files), normalize_blob_file_path(destination_path, dst))
-
-            include, result = _upload_blob(cmd, client, destination_container_name,
-                                           normalize_blob_file_path(destination_path, dst), src,
+            blob_name = normalize_blob_file_path(destination_path, dst)
+            include, result = _upload_blob(cmd, client, destination_container_name, blob_name, src,
                                            blob_type=blob_type, content_settings=guessed_content_settings,
                                            metadata=metadata, validate_content=validate_content,
                                            maxsize_condition=maxsize_condition, max_connections=max_connections,
-                                           lease_id=lease_id, progress_callback=progress_callback,
+                                           lease_id=lease_id, progress_callback=file_progress_callback,
                                            if_modified_since=if_modified_since,
                                            if_unmodified_since=if_unmodified_since, if_match=if_match,
                                            if_none_match=if_none_match, timeout=timeout)
-            if include:
-                results.append(_create_return_result(dst, guessed_content_settings, result))
-        # end progress hook
-        if progress_callback:
-            progress_callback.hook.end()
-        num_failures = len(source_files) - len(results)
+            if not include:
+                return None
+            if transfer_manifest is not None:
+                record_transfer(transfer_manifest, get_manifest_key(client, destination_container_name, blob_name),
+                                src, result.etag)
+            return _create_return_result(dst, guessed_content_settings, result)
+
+        uploaded, failures = run_batch(
+            _upload, [(normalize_blob_file_path(destination_path, dst), os.path.getsize(src), (src, dst))
+                      for src, dst in source_files],
+            concurrency=concurrency, progress_callback=progress_callback)
+        if transfer_manifest is not None:
+            transfer_manifest.save()
+        results = list(filter_none(uploaded))
+        num_failures = len(uploaded) - len(results)
         if num_failures:
             logger.warning('%s of %s files not uploaded due to "Failed Precondition"', num_failures, len(source_files))
+        raise_batch_failures(failures, len(source_files))
     return results
 
 
@@ -472,9 +514,10 @@ def show_blob(cmd, client, container_name, blob_name, snapshot=None, lease_id=No
 
 def storage_blob_delete_batch(client, source, source_container_name, pattern=None, lease_id=None,
                               delete_snapshots=None, if_modified_since=None, if_unmodified_since=None, if_match=None,
-                              if_none_match=None, timeout=None, dryrun=False):
+                              if_none_match=None, timeout=None, dryrun=False, concurrency=1):
     @check_precondition_success
-    def _delete_blob(blob_name):
+    @ignore_missing_on_retry
+    def _delete_blob(blob_name, _=None):
         delete_blob_args = {
             'container_name': source_container_name,
             'blob_name': blob_name,
@@ -509,10 +552,12 @@ def storage_blob_delete_batch(client, source, source_container_name, pattern=Non
             logger.warning('  - %s', blob)
         return []
 
-    results = [result for include, result in (_delete_blob(blob[0]) for blob in source_blobs) if include]
-    num_failures = len(source_blobs) - len(results)
-    if num_failures:
-        logger.warning('%s of %s blobs not deleted due to "Failed Precondition"', num_failures, len(source_blobs))
+    results, failures = run_batch(_delete_blob, [(blob[0], 0, blob[0]) for blob in source_blobs],
+                                  concurrency=concurrency)
+    num_skipped = len(source_blobs) - len(failures) - len([r for include, r in results if include])
+    if num_skipped:
+        logger.warning('%s of %s blobs not deleted due to "Failed Precondition"', num_skipped, len(source_blobs))
+    raise_batch_failures(failures, len(source_blobs), action='delete', noun='blobs')
 
 
 def generate_sas_blob_uri(client, container_name, blob_name, permission=None,
@@ -209,18 +209,20 @@ def storage_file_copy_batch(cmd, client, source_client, destination_share=None,
     raise ValueError('Fail to find source. Neither blob container or file share is specified.')
 
 
-def storage_file_delete_batch(cmd, client, source, pattern=None, dryrun=False, timeout=None):
+def storage_file_delete_batch(cmd, client, source, pattern=None, dryrun=False, timeout=None, concurrency=1):
     """
     Delete files from file share in batch
     """
+    from azure.cli.command_modules.storage.util import (glob_files_remotely, run_batch, raise_batch_failures,
+                                                        ignore_missing_on_retry)
 
-    def delete_action(file_pair):
+    @ignore_missing_on_retry
+    def delete_action(file_pair, _=None):
         delete_file_args = {'share_name': source, 'directory_name': file_pair[0], 'file_name': file_pair[1],
                             'timeout': timeout}
 
         return client.delete_file(**delete_file_args)
 
-    from azure.cli.command_modules.storage.util import glob_files_remotely
     source_files = list(glob_files_remotely(cmd, client, source, pattern))
 
     if dryrun:
@@ -234,8 +236,9 @@ def storage_file_delete_batch(cmd, client, source, pattern=None, dryrun=False, t
             logger.warning('  - %s/%s', f[0], f[1])
         return []
 
-    for f in source_files:
-        delete_action(f)
+    _, failures = run_batch(delete_action, [('/'.join(f).lstrip('/'), 0, f) for f in source_files],
+                            concurrency=concurrency)
+    raise_batch_failures(failures, len(source_files), action='delete')
 
 
 def _create_file_and_directory_from_blob(file_service, blob_service, share, container, sas, blob_name,
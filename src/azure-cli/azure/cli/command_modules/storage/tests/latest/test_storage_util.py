@@ -0,0 +1,270 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import datetime
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import mock
+from azure.common import AzureException, AzureHttpError
+from knack.util import CLIError
+
+from azure.cli.command_modules.storage.util import (run_batch, raise_batch_failures, get_sync_status,
+                                                    get_file_md5, load_transfer_manifest, record_transfer,
+                                                    collect_blob_objects, glob_files_remotely, _match_path,
+                                                    _get_pattern_prefix, _pattern_may_match_under,
+                                                    ignore_missing_on_retry)
+
+
+class _ProgressCallback(object):
+
+    def __init__(self):
+        self.reports = []
+        self.hook = mock.MagicMock()
+
+    def __call__(self, current, total):
+        self.reports.append((current, total))
+
+
+class TestStorageBatchTransfer(unittest.TestCase):
+
+    def test_run_batch_concurrently(self):
+        lock = threading.Lock()
+        in_flight = [0, 0]
+
+        def _transfer(item, progress_callback):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+            # finish in reverse order of submission
+            time.sleep((10 - item) * 0.01)
+            progress_callback(item, item)
+            with lock:
+                in_flight[0] -= 1
+            if item == 3:
+                raise AzureHttpError('Forbidden', 403)
+            return 'result{}'.format(item)
+
+        progress = _ProgressCallback()
+        items = [('file{}'.format(i), i, i) for i in range(10)]
+        results, failures = run_batch(_transfer, items, concurrency=4, progress_callback=progress)
+
+        self.assertEqual(results, ['result{}'.format(i) for i in range(10) if i != 3])
+        self.assertEqual([(name, ex.status_code) for name, ex in failures], [('file3', 403)])
+        self.assertEqual(in_flight[1], 4)
+        self.assertTrue(progress.reuse)
+        self.assertEqual(progress.reports[-1], (sum(range(10)) - 3, sum(range(10))))
+        progress.hook.end.assert_called_once_with()
+
+    @mock.patch('time.sleep')
+    def test_run_batch_retries_transient_errors(self, sleep):
+        transfer = mock.MagicMock(side_effect=[AzureException('Connection reset'), AzureHttpError('Busy', 503),
+                                               'done', AzureHttpError('Not found', 404)])
+        results, failures = run_batch(transfer, [('a', 1, 'a'), ('b', 1, 'b')])
+
+        self.assertEqual(results, ['done'])
+        self.assertEqual([name for name, _ in failures], ['b'])
+        self.assertEqual(transfer.call_count, 4)
+        self.assertEqual([c[0][0] for c in sleep.call_args_list], [2, 4])
+
+    def test_raise_batch_failures(self):
+        raise_batch_failures([], 2)
+        with self.assertRaises(AzureHttpError):
+            raise_batch_failures([('a', AzureHttpError('Not found', 404))], 1)
+        with self.assertRaisesRegex(CLIError, '1 of 2 files failed'):
+            raise_batch_failures([('a', AzureHttpError('Not found', 404))], 2)
+        with self.assertRaisesRegex(CLIError, '1 of 2 files failed to delete'):
+            raise_batch_failures([('a', AzureHttpError('Not found', 404))], 2, action='delete')
+        with self.assertRaisesRegex(CLIError, '1 of 2 blobs failed to delete'):
+            raise_batch_failures([('a', AzureHttpError('Not found', 404))], 2, action='delete', noun='blobs')
+
+    @mock.patch('time.sleep')
+    def test_blob_delete_batch_concurrently(self, _):
+        from azure.cli.command_modules.storage.operations.blob import storage_blob_delete_batch
+        deleted = []
+
+        def _delete_blob(blob_name, **_):
+            if blob_name == 'b2':
+                raise AzureHttpError('Precondition failed', 412)
+            if blob_name == 'b3':
+                raise AzureHttpError('Forbidden', 403)
+            if blob_name in deleted:
+                raise AzureHttpError('Not found', 404)
+            deleted.append(blob_name)
+            if blob_name == 'b4':
+                # the blob is deleted but the response is lost
+                raise AzureException('Connection reset')
+
+        client = mock.MagicMock()
+        client.delete_blob.side_effect = _delete_blob
+        blobs = [mock.MagicMock() for _ in range(5)]
+        for i, blob in enumerate(blobs):
+            blob.name = 'b{}'.format(i)
+        client.list_blobs.return_value = blobs
+
+        with mock.patch('azure.cli.command_modules.storage.operations.blob.get_logger') as get_logger:
+            with self.assertRaisesRegex(CLIError, '1 of 5 blobs failed to delete'):
+                storage_blob_delete_batch(client, 'c', 'c', concurrency=3)
+        self.assertEqual(sorted(c[1]['blob_name'] for c in client.delete_blob.call_args_list),
+                         ['b{}'.format(i) for i in range(5)] + ['b4'])
+        self.assertIn(mock.call('%s of %s blobs not deleted due to "Failed Precondition"', 1, 5),
+                      get_logger.return_value.warning.call_args_list)
+
+    def test_ignore_missing_on_retry(self):
+        delete = mock.MagicMock(side_effect=[AzureHttpError('Not found', 404), AzureHttpError('Not found', 404)])
+        delete = ignore_missing_on_retry(delete)
+
+        # only a retry of the same item can be deleted already
+        with self.assertRaises(AzureHttpError):
+            delete('a')
+        self.assertIsNone(delete('a'))
+
+
+class TestStorageIncrementalSync(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.temp_dir, 'file.txt')
+        with open(self.file_path, 'w') as f:
+            f.write('hello')
+        os.utime(self.file_path, (1000000000, 1000000000))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    @staticmethod
+    def _get_blob(size=5, content_md5=None, last_modified=1000000000, etag='"0x1"'):
+        blob = mock.MagicMock()
+        blob.properties.content_length = size
+        blob.properties.content_settings.content_md5 = content_md5
+        blob.properties.last_modified = datetime.datetime.fromtimestamp(last_modified, tz=datetime.timezone.utc)
+        blob.properties.etag = etag
+        return blob
+
+    def test_get_sync_status(self):
+        self.assertEqual(get_sync_status(self.file_path, None), 'new')
+        self.assertEqual(get_sync_status(os.path.join(self.temp_dir, 'missing'), self._get_blob(), upload=False),
+                         'new')
+        self.assertEqual(get_sync_status(self.file_path, self._get_blob(size=6)), 'changed')
+
+        # Content-MD5 wins over timestamps
+        self.assertEqual(get_file_md5(self.file_path), 'XUFAKrxLKna5cZ2REBfFkg==')
+        blob = self._get_blob(content_md5='XUFAKrxLKna5cZ2REBfFkg==', last_modified=1)
+        self.assertIsNone(get_sync_status(self.file_path, blob))
+        blob = self._get_blob(content_md5='AAAAAAAAAAAAAAAAAAAAAA==', last_modified=2000000000)
+        self.assertEqual(get_sync_status(self.file_path, blob, upload=False), 'changed')
+
+        # without Content-MD5 the source has to be newer than the destination
+        self.assertEqual(get_sync_status(self.file_path, self._get_blob(last_modified=999999999)), 'changed')
+        self.assertIsNone(get_sync_status(self.file_path, self._get_blob(last_modified=999999999), upload=False))
+        self.assertIsNone(get_sync_status(self.file_path, self._get_blob(last_modified=1000000001)))
+        self.assertEqual(get_sync_status(self.file_path, self._get_blob(last_modified=1000000001), upload=False),
+                         'changed')
+
+    def test_manifest(self):
+        manifest_path = os.path.join(self.temp_dir, 'manifest.json')
+        # a dry run doesn't create the manifest
+        self.assertEqual(len(load_transfer_manifest(manifest_path, dryrun=True)), 0)
+        self.assertFalse(os.path.exists(manifest_path))
+        with self.assertRaisesRegex(CLIError, "manifest file .* doesn't exist"):
+            load_transfer_manifest(os.path.join(self.temp_dir, 'missing', 'manifest.json'))
+
+        manifest = load_transfer_manifest(manifest_path)
+        record_transfer(manifest, 'account/container/file.txt', self.file_path, '"0x1"')
+        manifest.save()
+
+        self.assertEqual(load_transfer_manifest(manifest_path, dryrun=True).get('account/container/file.txt'),
+                         manifest.get('account/container/file.txt'))
+        entry = load_transfer_manifest(manifest_path).get('account/container/file.txt')
+        blob = self._get_blob(content_md5='AAAAAAAAAAAAAAAAAAAAAA==')
+        with mock.patch('azure.cli.command_modules.storage.util.get_file_md5') as get_md5:
+            self.assertIsNone(get_sync_status(self.file_path, blob, entry))
+            get_md5.assert_not_called()
+
+        # the blob was overwritten by someone else since
+        blob = self._get_blob(content_md5='AAAAAAAAAAAAAAAAAAAAAA==', etag='"0x2"')
+        self.assertEqual(get_sync_status(self.file_path, blob, entry), 'changed')
+
+
+@unittest.skipUnless(os.path.normcase('A/') == 'A/', 'Patterns are case insensitive on Windows')
+class TestStoragePatternPushdown(unittest.TestCase):
+
+    def test_get_pattern_prefix(self):
+        self.assertEqual(_get_pattern_prefix(None), '')
+        self.assertEqual(_get_pattern_prefix('*.gz'), '')
+        self.assertEqual(_get_pattern_prefix('logs/2026/10/*.gz'), 'logs/2026/10/')
+        self.assertEqual(_get_pattern_prefix('logs/202?/*'), 'logs/202')
+        self.assertEqual(_get_pattern_prefix('logs/[12]/*'), 'logs/')
+        self.assertEqual(_get_pattern_prefix('a[b/*'), 'a[b/')
+        self.assertEqual(_get_pattern_prefix('/*'), '/')
+
+    def test_pattern_may_match_under(self):
+        paths = ['logs/2026/10/a.gz', 'logs/2026/11/b.gz', 'logs/2025/10/c.gz', 'data/x/y', 'data/[a]/b', 'ab/c']
+        patterns = ['logs/2026/*', 'logs/*/10/*.gz', '*.gz', 'data/?/*', 'data/[!x]/*', 'data/[[]a]/*',
+                    'logs/202[!6]/*', 'a[b/*', 'ab', 'ab/c', 'l*s/2026/1?/*']
+        for pattern in patterns:
+            for path in paths:
+                parts = path.split('/')
+                for depth in range(1, len(parts)):
+                    directory = '/'.join(parts[:depth])
+                    if _match_path(path, pattern):
+                        self.assertTrue(_pattern_may_match_under(pattern, directory), (pattern, directory))
+        self.assertFalse(_pattern_may_match_under('logs/2026/*', 'data'))
+        self.assertFalse(_pattern_may_match_under('logs/2026/*', 'logs/2025'))
+        self.assertFalse(_pattern_may_match_under('data/[!x]/*', 'data/x'))
+        self.assertFalse(_pattern_may_match_under('ab', 'ab'))
+        self.assertTrue(_pattern_may_match_under('logs/*/10/*.gz', 'logs/2025/11'))
+
+    def test_collect_blob_objects_with_prefix(self):
+        blob_service = mock.MagicMock()
+        blobs = []
+        for name in ['logs/2026/10/a.gz', 'logs/2026/10/b.txt']:
+            blob = mock.MagicMock()
+            blob.name = name
+            blobs.append(blob)
+        blob_service.list_blobs.return_value = blobs
+        self.assertEqual([name for name, _ in collect_blob_objects(blob_service, 'c', 'logs/2026/10/*.gz')],
+                         ['logs/2026/10/a.gz'])
+        blob_service.list_blobs.assert_called_once_with('c', prefix='logs/2026/10/')
+
+        next(collect_blob_objects(blob_service, 'c', '*.gz'))
+        blob_service.list_blobs.assert_called_with('c', prefix=None)
+
+    def test_glob_files_remotely_prunes_directories(self):
+        class _Directory(object):
+            def __init__(self, name):
+                self.name = name
+
+        class _File(_Directory):
+            pass
+
+        tree = {
+            '': [_Directory('logs'), _Directory('data'), _File('readme')],
+            'logs': [_Directory('2025'), _Directory('2026')],
+            'logs/2026': [_File('a.gz'), _File('b.txt'), _Directory('10')],
+            'logs/2026/10': [_File('c.gz')],
+        }
+
+        def _list(_, directory, prefix=None):
+            return [f for f in tree[directory] if not prefix or f.name.startswith(prefix)]
+
+        cmd = mock.MagicMock()
+        cmd.get_models.return_value = (_Directory, _File)
+        client = mock.MagicMock()
+        client.list_directories_and_files.side_effect = _list
+
+        self.assertEqual(sorted(glob_files_remotely(cmd, client, 'share', 'logs/2026/*.gz')),
+                         [('logs/2026', 'a.gz'), ('logs/2026/10', 'c.gz')])
+        self.assertEqual([c[0][1:] + (c[1],) for c in client.list_directories_and_files.call_args_list],
+                         [('', {'prefix': 'logs'}), ('logs', {'prefix': '2026'}), ('logs/2026', {}),
+                          ('logs/2026/10', {})])
+
+
+if __name__ == '__main__':
+    unittest.main()
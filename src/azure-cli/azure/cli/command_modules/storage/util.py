@@ -6,6 +6,9 @@
 
 import os
 
+# times the operation on a file of a batch is retried after a transient failure
+BATCH_RETRIES = 3
+
 
 def collect_blobs(blob_service, container, pattern=None):
     """
@@ -29,7 +32,8 @@ def collect_blob_objects(blob_service, container, pattern=None):
         if blob_service.exists(container, pattern):
             yield pattern, blob_service.get_blob_properties(container, pattern)
     else:
-        for blob in blob_service.list_blobs(container):
+        # only the blobs starting with the literal part of the pattern can match, let the service filter them
+        for blob in blob_service.list_blobs(container, prefix=_get_pattern_prefix(pattern) or None):
             try:
                 blob_name = blob.name.encode('utf-8') if isinstance(blob.name, unicode) else blob.name
             except NameError:
@@ -92,15 +96,24 @@ def glob_files_remotely(cmd, client, share_name, pattern):
     from collections import deque
     t_dir, t_file = cmd.get_models('file.models#Directory', 'file.models#File')
 
+    pattern_prefix = _get_pattern_prefix(pattern) if cmd.supported_api_version(min_api='2016-05-31') else ''
     queue = deque([""])
     while queue:
         current_dir = queue.pop()
-        for f in client.list_directories_and_files(share_name, current_dir):
+        list_args = {}
+        # the literal part of the pattern selects the entries of the directories it spans
+        dir_prefix = current_dir + '/' if current_dir else ''
+        if pattern_prefix.startswith(dir_prefix) and len(pattern_prefix) > len(dir_prefix):
+            list_args['prefix'] = pattern_prefix[len(dir_prefix):].split('/')[0]
+        for f in client.list_directories_and_files(share_name, current_dir, **list_args):
             if isinstance(f, t_file):
                 if not pattern or _match_path(os.path.join(current_dir, f.name), pattern):
                     yield current_dir, f.name
             elif isinstance(f, t_dir):
-                queue.appendleft(os.path.join(current_dir, f.name))
+                sub_dir = os.path.join(current_dir, f.name)
+                # skip the directories that can't contain any match
+                if not pattern or _pattern_may_match_under(pattern, sub_dir):
+                    queue.appendleft(sub_dir)
 
 
 def create_short_lived_blob_sas(cmd, account_name, account_key, container, blob):
@@ -178,6 +191,84 @@ def _match_path(path, pattern):
     return fnmatch(path, pattern)
 
 
+def _is_case_sensitive_match():
+    # fnmatch ignores case and path separators on Windows, which the service can't do
+    return os.path.normcase('A/') == 'A/'
+
+
+def _tokenize_pattern(pattern):
+    """Split an fnmatch pattern into ('*',), ('?',), ('[', character set) and ('', literal character) tokens."""
+    tokens = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c == '*':
+            if not tokens or tokens[-1] != ('*',):
+                tokens.append(('*',))
+        elif c == '?':
+            tokens.append(('?',))
+        elif c == '[':
+            # same rules as fnmatch.translate: a leading '!' or ']' belongs to the set, an unclosed '[' is a literal
+            j = i
+            if j < n and pattern[j] == '!':
+                j += 1
+            if j < n and pattern[j] == ']':
+                j += 1
+            while j < n and pattern[j] != ']':
+                j += 1
+            if j >= n:
+                tokens.append(('', c))
+            else:
+                tokens.append(('[', pattern[i - 1:j + 1]))
+                i = j + 1
+        else:
+            tokens.append(('', c))
+    return tokens
+
+
+def _get_pattern_prefix(pattern):
+    """The literal characters every path matching the pattern starts with."""
+    if not pattern or not _is_case_sensitive_match():
+        return ''
+    prefix = []
+    for token in _tokenize_pattern(pattern):
+        if token[0]:
+            break
+        prefix.append(token[1])
+    return ''.join(prefix)
+
+
+def _pattern_may_match_under(pattern, directory):
+    """Whether the pattern can match any path in the given directory or its sub-directories."""
+    from fnmatch import fnmatchcase
+    if not _is_case_sensitive_match():
+        return True
+
+    tokens = _tokenize_pattern(pattern)
+
+    def _closure(states):
+        # '*' matches the empty string as well
+        return states | {i + 1 for i in states if i < len(tokens) and tokens[i][0] == '*'}
+
+    states = _closure({0})
+    for c in directory.rstrip('/') + '/':
+        next_states = set()
+        for i in states:
+            if i == len(tokens):
+                continue
+            kind, value = tokens[i][0], tokens[i][-1]
+            if kind == '*':
+                next_states.add(i)
+            elif kind == '?' or (kind == '[' and fnmatchcase(c, value)) or (not kind and c == value):
+                next_states.add(i + 1)
+        states = _closure(next_states)
+        if not states:
+            return False
+    # paths under the directory are longer, so some of the pattern has to be left
+    return any(i < len(tokens) for i in states)
+
+
 def guess_content_type(file_path, original, settings_class):
     if original.content_encoding or original.content_type:
         return original
@@ -232,3 +323,226 @@ def check_precondition_success(func):
                 raise
             return False, None
     return wrapper
+
+
+def ignore_missing_on_retry(func):
+    """Treat a 404 on a retried delete of a batch as success: an earlier attempt deleted the item but its response
+    was lost."""
+    attempted = set()
+
+    def wrapper(item, *args, **kwargs):
+        from azure.common import AzureHttpError
+        retried = item in attempted
+        attempted.add(item)
+        try:
+            return func(item, *args, **kwargs)
+        except AzureHttpError as ex:
+            if not retried or ex.status_code != 404:
+                raise
+            return None
+    return wrapper
+
+
+def get_file_md5(file_path):
+    """Base64 encoded MD5 of a local file, in the format of the Content-MD5 of a blob."""
+    import base64
+    import hashlib
+    md5 = hashlib.md5()
+    with open(file_path, 'rb') as stream:
+        for chunk in iter(lambda: stream.read(4 * 1024 * 1024), b''):
+            md5.update(chunk)
+    return base64.b64encode(md5.digest()).decode('utf-8')
+
+
+def get_sync_status(file_path, blob, manifest_entry=None, upload=True):
+    """
+    Compare a local file with a blob for an incremental transfer in the given direction.
+    Returns 'new' when the destination doesn't exist, 'changed' when it differs from the source, or None when the
+    file can be skipped.
+    """
+    if blob is None or not os.path.isfile(file_path):
+        return 'new'
+
+    size = os.path.getsize(file_path)
+    mtime = os.path.getmtime(file_path)
+    properties = blob.properties
+    if size != properties.content_length:
+        return 'changed'
+
+    # neither side was touched since the last transfer recorded in the manifest
+    if manifest_entry and manifest_entry.get('etag') == properties.etag and \
+            manifest_entry.get('size') == size and manifest_entry.get('mtime') == mtime:
+        return None
+
+    content_md5 = getattr(properties.content_settings, 'content_md5', None)
+    if content_md5:
+        return None if content_md5 == get_file_md5(file_path) else 'changed'
+
+    if not properties.last_modified:
+        return 'changed'
+    blob_mtime = properties.last_modified.timestamp()
+    source_is_newer = mtime > blob_mtime if upload else blob_mtime > mtime
+    return 'changed' if source_is_newer else None
+
+
+def load_transfer_manifest(manifest_path, dryrun=False):
+    """The record of the files transferred by previous incremental batch commands. A dry run only reads it."""
+    import json
+    from knack.util import CLIError
+    from azure.cli.core._session import Session
+    manifest_path = os.path.abspath(os.path.expanduser(manifest_path))
+    if not os.path.isdir(os.path.dirname(manifest_path)):
+        raise CLIError("The directory of the manifest file '{}' doesn't exist.".format(manifest_path))
+    manifest = Session()
+    if dryrun:
+        try:
+            with open(manifest_path, 'r', encoding='utf-8-sig') as f:
+                manifest.data = json.load(f)
+        except (OSError, ValueError):
+            pass
+        return manifest
+    manifest.load(manifest_path)
+    return manifest
+
+
+def get_manifest_key(client, container, blob_name):
+    return '/'.join([client.account_name, container, blob_name])
+
+
+def record_transfer(manifest, key, file_path, etag):
+    # written to disk once the whole batch is done
+    manifest.data[key] = {'size': os.path.getsize(file_path), 'mtime': os.path.getmtime(file_path), 'etag': etag}
+
+
+def log_sync_plan(changes, skipped):
+    """Report the files an incremental transfer will copy and how many are skipped."""
+    from knack.log import get_logger
+    logger = get_logger(__name__)
+    logger.warning('    changes %d', len(changes))
+    for status, name in changes:
+        logger.warning('  - %-7s %s', status, name)
+    logger.warning('  unchanged %d', skipped)
+
+
+def _is_transient_error(ex):
+    from azure.common import AzureException, AzureHttpError
+    if isinstance(ex, AzureHttpError):
+        return ex.status_code >= 500 or ex.status_code in [408, 429]
+    # the SDK raises connection failures and timeouts as AzureException
+    return isinstance(ex, AzureException)
+
+
+class _BatchProgress(object):
+    """Aggregate the progress of files that are transferred concurrently into a single report."""
+
+    def __init__(self, progress_callback, total_files, total_bytes):
+        import threading
+        self._progress_callback = progress_callback
+        self._lock = threading.Lock()
+        self._total_files = total_files
+        self._total_bytes = total_bytes
+        # bytes transferred so far of the files in flight
+        self._in_flight = {}
+        self.done_files = 0
+        self.done_bytes = 0
+
+    def file_callback(self, name):
+        if not self._progress_callback:
+            return None
+
+        def _update(current, _):
+            with self._lock:
+                self._in_flight[name] = current
+                self._report(name)
+        return _update
+
+    def file_finished(self, name, size, succeeded=True):
+        with self._lock:
+            self._in_flight.pop(name, None)
+            if succeeded:
+                self.done_files += 1
+                self.done_bytes += size
+            if self._progress_callback:
+                self._report(name)
+
+    def _report(self, name):
+        self._progress_callback.message = '{}/{}: "{}"'.format(self.done_files, self._total_files, name)
+        self._progress_callback(self.done_bytes + sum(self._in_flight.values()), self._total_bytes)
+
+
+def run_batch(operation, items, concurrency=1, progress_callback=None):
+    """
+    Run an operation, e.g. a transfer or a delete, on a batch of files with at most `concurrency` of them in flight,
+    retrying transient failures per file. `operation(item, progress_callback)` handles a single file, `items` is a
+    list of (name, size in bytes, item).
+    Returns the results of the successful operations in the order of `items` and a list of (name, exception) for the
+    files that failed.
+    """
+    import time
+    import timeit
+    from knack.log import get_logger
+    logger = get_logger(__name__)
+
+    # Tell progress reporter to reuse the same hook
+    if progress_callback:
+        progress_callback.reuse = True
+    progress = _BatchProgress(progress_callback, len(items), sum(size for _, size, _ in items))
+
+    def _run(name, size, item):
+        attempt = 0
+        while True:
+            try:
+                result = operation(item, progress.file_callback(name))
+                progress.file_finished(name, size)
+                return result
+            except Exception as ex:  # pylint: disable=broad-except
+                progress.file_finished(name, size, succeeded=False)
+                attempt += 1
+                if attempt > BATCH_RETRIES or not _is_transient_error(ex):
+                    raise
+                logger.debug('"%s" failed (attempt %d), retrying: %s', name, attempt, ex)
+                time.sleep(2 ** attempt)
+
+    start_time = timeit.default_timer()
+    results, failures = [], []
+    if concurrency > 1 and len(items) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(items))) as executor:
+            futures = [(name, executor.submit(_run, name, size, item)) for name, size, item in items]
+            try:
+                for name, future in futures:
+                    try:
+                        results.append(future.result())
+                    except Exception as ex:  # pylint: disable=broad-except
+                        failures.append((name, ex))
+            except KeyboardInterrupt:
+                for _, future in futures:
+                    future.cancel()
+                raise
+    else:
+        for name, size, item in items:
+            try:
+                results.append(_run(name, size, item))
+            except Exception as ex:  # pylint: disable=broad-except
+                failures.append((name, ex))
+
+    # end progress hook
+    if progress_callback:
+        progress_callback.hook.end()
+    logger.info('Processed %d of %d files (%d bytes) in %.3f seconds.',
+                progress.done_files, len(items), progress.done_bytes, timeit.default_timer() - start_time)
+    return results, failures
+
+
+def raise_batch_failures(failures, total, action='transfer', noun='files'):
+    """Re-raise the error of a single failed item, or summarize the items that failed."""
+    from knack.log import get_logger
+    from knack.util import CLIError
+    if not failures:
+        return
+    if len(failures) == 1 and total == 1:
+        raise failures[0][1]
+    logger = get_logger(__name__)
+    for name, ex in failures:
+        logger.warning('%s: %s', name, ex)
+    raise CLIError('{} of {} {} failed to {}.'.format(len(failures), total, noun, action))
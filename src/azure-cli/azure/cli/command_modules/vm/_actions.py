@@ -4,6 +4,8 @@
 # --------------------------------------------------------------------------------------------
 
 import json
+import os
+import time
 
 from knack.util import CLIError
 from knack.log import get_logger
@@ -15,6 +17,8 @@ from ._client_factory import _compute_client_factory
 
 logger = get_logger(__name__)
 
+DEFAULT_IMAGE_CATALOG_TTL = 60  # minutes
+
 
 def _resource_not_exists(cli_ctx, resource_type):
     def _handle_resource_not_exists(namespace):
@@ -33,56 +37,127 @@ def _get_thread_count():
 
 
 def load_images_thru_services(cli_ctx, publisher, offer, sku, location):
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    all_images = []
     client = _compute_client_factory(cli_ctx)
     if location is None:
         location = get_one_of_subscription_locations(cli_ctx)
+    catalog = _get_image_catalog(cli_ctx, location)
+
+    publishers = catalog.get_publishers() if catalog else None
+    if publishers is None:
+        publishers = [p.name for p in client.virtual_machine_images.list_publishers(location)]
+        if catalog:
+            catalog.set_publishers(publishers)
+    publishers = [p for p in publishers if _matched(publisher, p)]
+
+    image_tree = {}
+    for p in publishers:
+        offers = catalog.get_offers(p) if catalog else None
+        if offers is not None:
+            image_tree[p] = offers
+    stale_publishers = [p for p in publishers if p not in image_tree]
+    if stale_publishers:
+        if catalog:
+            # load whole publishers, so later searches with other offers or skus can use the catalog
+            loaded_tree, failed_publishers = _load_image_tree(client, location, stale_publishers)
+            catalog.set_offers({p: offers for p, offers in loaded_tree.items() if p not in failed_publishers})
+        else:
+            loaded_tree, _ = _load_image_tree(client, location, stale_publishers, offer, sku)
+        image_tree.update(loaded_tree)
 
-    def _load_images_from_publisher(publisher):
-        from msrestazure.azure_exceptions import CloudError
-        try:
-            offers = client.virtual_machine_images.list_offers(location, publisher)
-        except CloudError as e:
-            logger.warning(str(e))
-            return
-        if offer:
-            offers = [o for o in offers if _matched(offer, o.name)]
-        for o in offers:
-            try:
-                skus = client.virtual_machine_images.list_skus(location, publisher, o.name)
-            except CloudError as e:
-                logger.warning(str(e))
+    all_images = []
+    for p in publishers:
+        for o, skus in image_tree[p].items():
+            if not _matched(offer, o):
                 continue
-            if sku:
-                skus = [s for s in skus if _matched(sku, s.name)]
-            for s in skus:
-                try:
-                    images = client.virtual_machine_images.list(location, publisher, o.name, s.name)
-                except CloudError as e:
-                    logger.warning(str(e))
+            for s, versions in skus.items():
+                if not _matched(sku, s):
                     continue
-                for i in images:
-                    all_images.append({
-                        'publisher': publisher,
-                        'offer': o.name,
-                        'sku': s.name,
-                        'version': i.name})
+                all_images.extend(_create_image_instance(p, o, s, v) for v in versions)
+    return all_images
 
-    publishers = client.virtual_machine_images.list_publishers(location)
-    if publisher:
-        publishers = [p for p in publishers if _matched(publisher, p.name)]
 
-    publisher_num = len(publishers)
-    if publisher_num > 1:
-        with ThreadPoolExecutor(max_workers=_get_thread_count()) as executor:
-            tasks = [executor.submit(_load_images_from_publisher, p.name) for p in publishers]
-            for t in as_completed(tasks):
-                t.result()  # don't use the result but expose exceptions from the threads
-    elif publisher_num == 1:
-        _load_images_from_publisher(publishers[0].name)
+def _load_image_tree(client, location, publishers, offer=None, sku=None):
+    """ Load the images of the publishers as {publisher: {offer: {sku: [version]}}}. Each level of the tree is
+    loaded concurrently. Also returns the publishers which couldn't be loaded completely. """
+    from concurrent.futures import ThreadPoolExecutor
+    from msrestazure.azure_exceptions import CloudError
+    images = client.virtual_machine_images
+    image_tree = {p: {} for p in publishers}
+    failed_publishers = set()
 
-    return all_images
+    def _list(operation, publisher, *args):
+        try:
+            return operation(location, publisher, *args)
+        except CloudError as e:
+            logger.warning(str(e))
+            failed_publishers.add(publisher)
+            return []
+
+    with ThreadPoolExecutor(max_workers=_get_thread_count()) as executor:
+        offer_lists = executor.map(lambda p: _list(images.list_offers, p), publishers)
+        offers = [(p, o.name) for p, offer_list in zip(publishers, offer_lists)
+                  for o in offer_list if _matched(offer, o.name)]
+        sku_lists = executor.map(lambda p_o: _list(images.list_skus, *p_o), offers)
+        skus = [(p, o, s.name) for (p, o), sku_list in zip(offers, sku_lists)
+                for s in sku_list if _matched(sku, s.name)]
+        version_lists = executor.map(lambda p_o_s: _list(images.list, *p_o_s), skus)
+        for (p, o, s), version_list in zip(skus, version_lists):
+            image_tree[p].setdefault(o, {})[s] = [v.name for v in version_list]
+    return image_tree, failed_publishers
+
+
+class _ImageCatalog(object):
+    """ The marketplace images of a location persisted in the config directory, so repeated searches don't walk the
+    whole publisher/offer/sku/version tree. Publishers are refreshed one by one once they are older than the TTL. """
+
+    def __init__(self, filename, ttl):
+        from azure.cli.core._session import Session
+        self._session = Session()
+        self._session.load(filename)
+        self._ttl = ttl
+
+    def _is_fresh(self, entry):
+        return bool(entry) and time.time() - entry.get('refreshed', 0) < self._ttl
+
+    def get_publishers(self):
+        entry = self._session.get('publishers')
+        return entry['names'] if self._is_fresh(entry) else None
+
+    def set_publishers(self, publishers):
+        self._session['publishers'] = {'refreshed': time.time(), 'names': publishers}
+
+    def get_offers(self, publisher):
+        entry = self._session.get('images', {}).get(publisher.lower())
+        return entry['offers'] if self._is_fresh(entry) else None
+
+    def set_offers(self, image_tree):
+        if not image_tree:
+            return
+        refreshed = time.time()
+        images = self._session.get('images', {})
+        images.update({p.lower(): {'refreshed': refreshed, 'offers': offers} for p, offers in image_tree.items()})
+        self._session['images'] = images
+
+    def get_versions(self, publisher, offer, sku):
+        offers = self.get_offers(publisher)
+        if offers is None:
+            return None
+        skus = next((v for k, v in offers.items() if k.lower() == offer.lower()), {})
+        return next((v for k, v in skus.items() if k.lower() == sku.lower()), None)
+
+
+def _get_image_catalog(cli_ctx, location):
+    ttl = cli_ctx.config.getint('vm', 'image_catalog_ttl', DEFAULT_IMAGE_CATALOG_TTL)
+    if ttl <= 0 or not location:
+        return None
+    catalog_dir = os.path.join(cli_ctx.config.config_dir, 'vmImageCatalogs')
+    try:
+        os.makedirs(catalog_dir)
+    except OSError:
+        if not os.path.isdir(catalog_dir):
+            return None
+    filename = '{}_{}.json'.format(cli_ctx.cloud.name, location.replace(' ', '')).lower()
+    return _ImageCatalog(os.path.join(catalog_dir, filename), ttl * 60)
 
 
 def load_images_from_aliases_doc(cli_ctx, publisher=None, offer=None, sku=None):
@@ -210,6 +285,12 @@ def _create_image_instance(publisher, offer, sku, version):
 
 
 def _get_latest_image_version(cli_ctx, location, publisher, offer, sku):
+    catalog = _get_image_catalog(cli_ctx, location)
+    versions = catalog.get_versions(publisher, offer, sku) if catalog else None
+    if versions:
+        from distutils.version import LooseVersion  # pylint: disable=no-name-in-module,import-error
+        return max(versions, key=LooseVersion)
+
     top_one = _compute_client_factory(cli_ctx).virtual_machine_images.list(location,
                                                                            publisher,
                                                                            offer,
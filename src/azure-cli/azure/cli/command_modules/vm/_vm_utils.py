@@ -6,6 +6,7 @@
 import json
 import os
 import re
+import time
 try:
     from urllib.parse import urlparse
 except ImportError:
@@ -19,6 +20,8 @@ logger = get_logger(__name__)
 
 MSI_LOCAL_ID = '[system]'
 
+DEFAULT_SKU_CATALOG_TTL = 60  # minutes
+
 
 def get_target_network_api(cli_ctx):
     """ Since most compute calls don't need advanced network functionality, we can target a supported, but not
@@ -114,19 +117,97 @@ def get_key_vault_base_url(cli_ctx, vault_name):
     return 'https://{}{}'.format(vault_name, suffix)
 
 
-def list_sku_info(cli_ctx, location=None):
+def list_sku_info(cli_ctx, location=None, resource_type=None, name=None):
     from ._client_factory import _compute_client_factory
 
     def _match_location(loc, locations):
         return next((x for x in locations if x.lower() == loc.lower()), None)
 
+    def _matched(sku):
+        return ((not location or _match_location(location, sku.locations)) and
+                (not resource_type or sku.resource_type.lower() == resource_type.lower()) and
+                (not name or sku.name.lower() == name.lower()))
+
     client = _compute_client_factory(cli_ctx)
-    result = client.resource_skus.list()
-    if location:
-        result = [r for r in result if _match_location(location, r.locations)]
+    catalog = _get_sku_catalog(cli_ctx, client)
+    result = catalog.load(location, resource_type, name) if catalog else None
+    if result is None:
+        result = list(client.resource_skus.list())
+        if catalog:
+            catalog.save(result)
+        result = [r for r in result if _matched(r)]
     return result
 
 
+class _SkuCatalog(object):
+    """ The resource SKUs of a subscription saved in the config directory with one file per location, so a lookup
+    only parses the SKUs of its location, and only deserializes those with the requested type and name. """
+
+    _INDEX_FILE_NAME = 'index.json'
+
+    def __init__(self, directory, ttl, operations):
+        self._directory = directory
+        self._ttl = ttl
+        self._operations = operations
+
+    def _get_file_path(self, location):
+        return os.path.join(self._directory, '{}.json'.format(location.lower()))
+
+    def load(self, location=None, resource_type=None, name=None):
+        try:
+            with open(os.path.join(self._directory, self._INDEX_FILE_NAME)) as f:
+                index = json.load(f)
+            if time.time() - index['refreshed'] >= self._ttl:
+                return None
+            locations = [x for x in index['locations'] if not location or x == location.lower()]
+            result = []
+            for loc in locations:
+                with open(self._get_file_path(loc)) as f:
+                    skus = json.load(f)
+                for sku in skus:
+                    sku_locations = [x.lower() for x in sku.get('locations') or ['']]
+                    # a SKU of several locations is listed once, from the file of its first location
+                    if location and location.lower() not in sku_locations:
+                        continue
+                    if not location and loc != sku_locations[0]:
+                        continue
+                    if resource_type and sku.get('resourceType', '').lower() != resource_type.lower():
+                        continue
+                    if name and sku.get('name', '').lower() != name.lower():
+                        continue
+                    result.append(self._operations._deserialize('ResourceSku', sku))  # pylint: disable=protected-access
+            return result
+        except (OSError, IOError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, skus):
+        from azure.cli.core.util import write_file_atomically
+        by_location = {}
+        for sku in skus:
+            for loc in set(x.lower() for x in sku.locations or ['']):
+                by_location.setdefault(loc, []).append(sku.serialize(keep_readonly=True))
+        try:
+            if not os.path.isdir(self._directory):
+                os.makedirs(self._directory)
+            for loc, location_skus in by_location.items():
+                write_file_atomically(self._get_file_path(loc), json.dumps(location_skus))
+            # the index is written last, so it only lists complete files
+            write_file_atomically(os.path.join(self._directory, self._INDEX_FILE_NAME),
+                                  json.dumps({'refreshed': time.time(), 'locations': sorted(by_location)}))
+        except (OSError, IOError) as ex:
+            logger.debug("Failed to save the resource SKUs to '%s': %s", self._directory, ex)
+
+
+def _get_sku_catalog(cli_ctx, client):
+    from azure.cli.core.commands.client_factory import get_subscription_id
+    ttl = cli_ctx.config.getint('vm', 'sku_catalog_ttl', DEFAULT_SKU_CATALOG_TTL)
+    if ttl <= 0:
+        return None
+    operations = client.resource_skus
+    directory = '{}_{}_{}'.format(cli_ctx.cloud.name, get_subscription_id(cli_ctx), operations.api_version).lower()
+    return _SkuCatalog(os.path.join(cli_ctx.config.config_dir, 'vmSkuCatalogs', directory), ttl * 60, operations)
+
+
 def normalize_disk_info(image_data_disks=None,
                         data_disk_sizes_gb=None, attach_data_disks=None, storage_sku=None,
                         os_disk_caching=None, data_disk_cachings=None, size='', ephemeral_os_disk=False):
@@ -25,7 +25,7 @@ from azure.cli.core.commands.validators import validate_file_or_dict
 from azure.cli.core.commands import LongRunningOperation, DeploymentOutputLongRunningOperation
 from azure.cli.core.commands.client_factory import get_mgmt_service_client, get_data_service_client
 from azure.cli.core.profiles import ResourceType
-from azure.cli.core.util import sdk_no_wait
+from azure.cli.core.util import sdk_no_wait, get_concurrency_config
 
 from ._vm_utils import read_content_if_is_file
 from ._vm_diagnostics_templates import get_default_diag_config
@@ -37,6 +37,8 @@ from ._client_factory import (_compute_client_factory, cf_public_ip_addresses, c
 
 logger = get_logger(__name__)
 
+DEFAULT_MAX_CONCURRENT_REQUESTS = 10
+
 
 # Use the same name by portal, so people can update from both cli and portal
 # (VM doesn't allow multiple handlers for the same extension)
@@ -935,28 +937,68 @@ def get_vm(cmd, resource_group_name, vm_name, expand=None):
 
 
 def get_vm_details(cmd, resource_group_name, vm_name):
-    from msrestazure.tools import parse_resource_id
     from azure.cli.command_modules.vm._vm_utils import get_target_network_api
     result = get_instance_view(cmd, resource_group_name, vm_name)
     network_client = get_mgmt_service_client(
         cmd.cli_ctx, ResourceType.MGMT_NETWORK, api_version=get_target_network_api(cmd.cli_ctx))
+    return _set_vm_details(result,
+                           _get_network_resource_getter(network_client.network_interfaces),
+                           _get_network_resource_getter(network_client.public_ip_addresses))
+
+
+def _list_vm_details(cmd, vms, resource_group_name=None):
+    from concurrent.futures import ThreadPoolExecutor
+    from azure.cli.command_modules.vm._vm_utils import get_target_network_api
+    if not vms:
+        return []
+    network_client = get_mgmt_service_client(
+        cmd.cli_ctx, ResourceType.MGMT_NETWORK, api_version=get_target_network_api(cmd.cli_ctx))
+    nics = public_ips = None
+    if not resource_group_name:
+        # List NICs and public IPs of the subscription once instead of getting those of every VM one by one
+        nics = list(network_client.network_interfaces.list_all())
+        public_ips = list(network_client.public_ip_addresses.list_all())
+    get_nic = _get_network_resource_getter(network_client.network_interfaces, nics)
+    get_public_ip = _get_network_resource_getter(network_client.public_ip_addresses, public_ips)
+
+    def _get_details(vm):
+        return _set_vm_details(get_instance_view(cmd, _parse_rg_name(vm.id)[0], vm.name), get_nic, get_public_ip)
+
+    max_workers = get_concurrency_config(cmd.cli_ctx, 'vm', 'max_concurrent_requests',
+                                         DEFAULT_MAX_CONCURRENT_REQUESTS)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_get_details, vms))
+
+
+def _get_network_resource_getter(operations, resources=None):
+    # resources missing from the given list, e.g. in another subscription, are retrieved on demand
+    from msrestazure.tools import parse_resource_id
+    lookup = {r.id.lower(): r for r in resources or []}
+
+    def _get(resource_id):
+        resource = lookup.get(resource_id.lower())
+        if resource is None:
+            parts = parse_resource_id(resource_id)
+            resource = operations.get(parts['resource_group'], parts['name'])
+        return resource
+    return _get
+
+
+def _set_vm_details(result, get_nic, get_public_ip):
     public_ips = []
     fqdns = []
     private_ips = []
     mac_addresses = []
     # pylint: disable=line-too-long,no-member
     for nic_ref in result.network_profile.network_interfaces:
-        nic_parts = parse_resource_id(nic_ref.id)
-        nic = network_client.network_interfaces.get(nic_parts['resource_group'], nic_parts['name'])
+        nic = get_nic(nic_ref.id)
         if nic.mac_address:
             mac_addresses.append(nic.mac_address)
         for ip_configuration in nic.ip_configurations:
             if ip_configuration.private_ip_address:
                 private_ips.append(ip_configuration.private_ip_address)
             if ip_configuration.public_ip_address:
-                res = parse_resource_id(ip_configuration.public_ip_address.id)
-                public_ip_info = network_client.public_ip_addresses.get(res['resource_group'],
-                                                                        res['name'])
+                public_ip_info = get_public_ip(ip_configuration.public_ip_address.id)
                 if public_ip_info.ip_address:
                     public_ips.append(public_ip_info.ip_address)
                 if public_ip_info.dns_settings:
@@ -974,12 +1016,10 @@ def get_vm_details(cmd, resource_group_name, vm_name):
 
 def list_skus(cmd, location=None, size=None, zone=None, show_all=None, resource_type=None):
     from ._vm_utils import list_sku_info
-    result = list_sku_info(cmd.cli_ctx, location)
+    result = list_sku_info(cmd.cli_ctx, location, resource_type=resource_type)
     if not show_all:
         result = [x for x in result if not [y for y in (x.restrictions or [])
                                             if y.reason_code == 'NotAvailableForSubscription']]
-    if resource_type:
-        result = [x for x in result if x.resource_type.lower() == resource_type.lower()]
     if size:
         result = [x for x in result if x.resource_type == 'virtualMachines' and size.lower() in x.name.lower()]
     if zone:
@@ -992,7 +1032,7 @@ def list_vm(cmd, resource_group_name=None, show_details=False):
     vm_list = ccf.virtual_machines.list(resource_group_name=resource_group_name) \
         if resource_group_name else ccf.virtual_machines.list_all()
     if show_details:
-        return [get_vm_details(cmd, _parse_rg_name(v.id)[0], v.name) for v in vm_list]
+        return _list_vm_details(cmd, list(vm_list), resource_group_name)
 
     return list(vm_list)
 
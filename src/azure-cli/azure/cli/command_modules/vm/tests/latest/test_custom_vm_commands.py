@@ -14,7 +14,7 @@ from azure.cli.command_modules.vm.custom import (enable_boot_diagnostics, disabl
                                                  _LINUX_ACCESS_EXT,
                                                  _WINDOWS_ACCESS_EXT,
                                                  _get_extension_instance_name,
-                                                 get_boot_log)
+                                                 get_boot_log, list_vm, list_skus)
 from azure.cli.command_modules.vm.custom import \
     (attach_unmanaged_data_disk, detach_data_disk, get_vmss_instance_view)
 
@@ -237,6 +237,89 @@ class TestVmCustom(unittest.TestCase):
         vm_client.virtual_machine_scale_set_vms.list.assert_called_once_with('rg1', 'vmss1', expand='instanceView',
                                                                              select='instanceView')
 
+    @mock.patch('azure.cli.command_modules.vm.custom.get_mgmt_service_client')
+    @mock.patch('azure.cli.command_modules.vm.custom._compute_client_factory')
+    def test_list_vm_show_details(self, compute_factory_mock, network_factory_mock):
+        rg_id = '/subscriptions/sub1/resourceGroups/rg1/providers/'
+        vms, instance_views = [], {}
+        for i in range(3):
+            vm = mock.MagicMock()
+            vm.id, vm.name = rg_id + 'Microsoft.Compute/virtualMachines/vm{}'.format(i), 'vm{}'.format(i)
+            vms.append(vm)
+            nic_ref = mock.MagicMock()
+            # the NIC of vm2 is not in the listed ones, e.g. it is in another subscription
+            nic_ref.id = rg_id + 'Microsoft.Network/networkInterfaces/NIC{}'.format(i)
+            instance_view = FakedVM(nics=[nic_ref])
+            instance_view.instance_view.statuses = [InstanceViewStatus(code='PowerState/running',
+                                                                       display_status='VM running')]
+            instance_views['vm{}'.format(i)] = instance_view
+
+        nics, public_ips = [], []
+        for i in range(3):
+            nic = mock.MagicMock()
+            nic.id, nic.mac_address = rg_id + 'Microsoft.Network/networkInterfaces/nic{}'.format(i), 'mac{}'.format(i)
+            ip_config = mock.MagicMock()
+            ip_config.private_ip_address = '10.0.0.{}'.format(i)
+            ip_config.public_ip_address.id = rg_id + 'Microsoft.Network/publicIPAddresses/ip{}'.format(i)
+            nic.ip_configurations = [ip_config]
+            nics.append(nic)
+            public_ip = mock.MagicMock()
+            public_ip.id, public_ip.ip_address = ip_config.public_ip_address.id, '1.1.1.{}'.format(i)
+            public_ip.dns_settings.fqdn = 'vm{}.westus.cloudapp.azure.com'.format(i)
+            public_ips.append(public_ip)
+
+        compute_client = compute_factory_mock.return_value
+        compute_client.virtual_machines.list_all.return_value = iter(vms)
+        compute_client.virtual_machines.get.side_effect = lambda rg, name, expand: instance_views[name]
+        network_client = network_factory_mock.return_value
+        network_client.network_interfaces.list_all.return_value = iter(nics[:2])
+        network_client.network_interfaces.get.return_value = nics[2]
+        network_client.public_ip_addresses.list_all.return_value = iter(public_ips)
+
+        result = list_vm(_get_test_cmd(), show_details=True)
+
+        self.assertEqual([(r.power_state, r.private_ips, r.public_ips, r.fqdns, r.mac_addresses) for r in result],
+                         [('VM running', '10.0.0.{}'.format(i), '1.1.1.{}'.format(i),
+                           'vm{}.westus.cloudapp.azure.com'.format(i), 'mac{}'.format(i)) for i in range(3)])
+        network_client.network_interfaces.get.assert_called_once_with('rg1', 'NIC2')
+        network_client.public_ip_addresses.get.assert_not_called()
+        self.assertEqual(compute_client.virtual_machines.get.call_count, 3)
+
+    @mock.patch('azure.cli.core.commands.client_factory.get_subscription_id', return_value='sub1')
+    @mock.patch('azure.cli.command_modules.vm._client_factory._compute_client_factory')
+    def test_list_skus_from_catalog(self, factory_mock, _):
+        import shutil
+        import tempfile
+        from msrest import Deserializer
+        from azure.mgmt.compute.v2019_04_01 import models
+        from azure.cli.command_modules.vm._vm_utils import list_sku_info
+
+        skus = []
+        for resource_type, name, location in [('virtualMachines', 'Standard_DS1_v2', 'westus'),
+                                              ('virtualMachines', 'Standard_DS2_v2', 'WestUS'),
+                                              ('virtualMachines', 'Standard_DS1_v2', 'eastus'),
+                                              ('disks', 'Premium_LRS', 'westus')]:
+            sku = models.ResourceSku()
+            sku.resource_type, sku.name, sku.locations = resource_type, name, [location]
+            skus.append(sku)
+        operations = factory_mock.return_value.resource_skus
+        operations.api_version = '2019-04-01'
+        operations.list.return_value = iter(skus)
+        operations._deserialize = Deserializer({k: v for k, v in models.__dict__.items() if isinstance(v, type)})
+
+        cmd = _get_test_cmd()
+        cmd.cli_ctx.config.config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cmd.cli_ctx.config.config_dir)
+
+        self.assertEqual([x.name for x in list_skus(cmd, location='westus', size='ds')],
+                         ['Standard_DS1_v2', 'Standard_DS2_v2'])
+        self.assertEqual(len(list_skus(cmd)), 4)
+        self.assertEqual([(x.name, x.locations) for x in list_skus(cmd, location='westus', resource_type='disks')],
+                         [('Premium_LRS', ['westus'])])
+        self.assertEqual([x.locations for x in list_sku_info(cmd.cli_ctx, 'eastus', name='standard_ds1_v2')],
+                         [['eastus']])
+        operations.list.assert_called_once_with()
+
     # pylint: disable=line-too-long
     @mock.patch('azure.cli.command_modules.vm.disk_encryption._compute_client_factory', autospec=True)
     @mock.patch('azure.cli.command_modules.vm.disk_encryption._get_keyvault_key_url', autospec=True)
@@ -4,6 +4,9 @@
 # --------------------------------------------------------------------------------------------
 
 import os.path
+import shutil
+import tempfile
+import time
 import unittest
 import mock
 
@@ -70,6 +73,53 @@ class TestVMImage(unittest.TestCase):
         self.assertEqual(images[0], {'urnAlias': 'CentOS', 'publisher': 'OpenLogic',
                                      'offer': 'CentOS', 'sku': '7.5', 'version': 'latest'})
 
+    @mock.patch('azure.cli.command_modules.vm._actions._compute_client_factory', autospec=True)
+    def test_image_catalog(self, factory_mock):
+        from azure.cli.command_modules.vm._actions import load_images_thru_services, _get_latest_image_version
+
+        def _named(*names):
+            result = []
+            for name in names:
+                item = mock.MagicMock()
+                item.name = name
+                result.append(item)
+            return result
+
+        images = factory_mock.return_value.virtual_machine_images
+        images.list_publishers.return_value = _named('Canonical', 'OpenLogic')
+        images.list_offers.side_effect = lambda location, publisher: _named(publisher + 'Server')
+        images.list_skus.side_effect = lambda location, publisher, offer: _named('1', '2')
+        images.list.side_effect = lambda location, publisher, offer, sku: _named('1.9.0', '1.10.0')
+
+        cli_ctx = DummyCli()
+        cli_ctx.config.config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cli_ctx.config.config_dir)
+
+        result = load_images_thru_services(cli_ctx, 'canon', None, '2', 'westus')
+        self.assertEqual(result, [{'publisher': 'Canonical', 'offer': 'CanonicalServer', 'sku': '2', 'version': v}
+                                  for v in ['1.9.0', '1.10.0']])
+        # the whole publisher was loaded, level by level
+        self.assertEqual(images.list.call_count, 2)
+
+        images.reset_mock()
+        result = load_images_thru_services(cli_ctx, None, 'server', '1', 'westus')
+        self.assertEqual([(i['publisher'], i['version']) for i in result],
+                         [('Canonical', '1.9.0'), ('Canonical', '1.10.0'), ('OpenLogic', '1.9.0'),
+                          ('OpenLogic', '1.10.0')])
+        # only the publisher missing from the catalog was loaded
+        images.list_publishers.assert_not_called()
+        images.list_offers.assert_called_once_with('westus', 'OpenLogic')
+
+        self.assertEqual(_get_latest_image_version(cli_ctx, 'westus', 'canonical', 'canonicalserver', '1'), '1.10.0')
+        images.list.assert_called_with('westus', 'OpenLogic', 'OpenLogicServer', '2')
+
+        # expired publishers are loaded again
+        images.reset_mock()
+        with mock.patch('time.time', return_value=time.time() + 3601):
+            load_images_thru_services(cli_ctx, 'OpenLogic', None, None, 'westus')
+        images.list_publishers.assert_called_once_with('westus')
+        images.list_offers.assert_called_once_with('westus', 'OpenLogic')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -7,7 +7,6 @@
 import sys
 import os
 import yaml
-from knack.help_files import helps
 from .linter import LinterManager
 
 
@@ -28,6 +27,7 @@ def define_arguments(parser):
 
 def main(args):
     from azure.cli.core import get_default_cli
+    from azure.cli.core._help_store import HelpStore
     from azure.cli.core.file_util import get_all_help, create_invoker_and_load_cmds_and_args
 
     print('Initializing linter with command table and help files...')
@@ -42,11 +42,11 @@ def main(args):
     # format loaded help
     loaded_help = {data.command: data for data in loaded_help if data.command}
 
-    # load yaml help
-    help_file_entries = {}
-    for entry_name, help_yaml in helps.items():
-        help_entry = yaml.safe_load(help_yaml)
-        help_file_entries[entry_name] = help_entry
+    # load yaml help of all the modules, command modules only import their help when it's requested
+    help_store = HelpStore(az_cli)
+    help_store.load_modules({loader.__class__.__module__
+                             for loaders in command_loader.cmd_to_loader_map.values() for loader in loaders})
+    help_file_entries = help_store.get_all()
 
     if not args.rule_types_to_run:
         args.rule_types_to_run = ['params', 'commands', 'command_groups', 'help_entries']